@@ -30,14 +30,29 @@
 
 from __future__ import division
 
-from python_qt_binding.QtCore import Qt, Signal
+from collections import OrderedDict
+import itertools
+from threading import Thread
+
+from python_qt_binding.QtCore import QRegExp, Signal
 try:
     from python_qt_binding.QtCore import QSortFilterProxyModel  # Qt 5
 except ImportError:
     from python_qt_binding.QtGui import QSortFilterProxyModel  # Qt 4
 
 from rqt_reconfigure import logging
-from rqt_reconfigure.treenode_qstditem import TreenodeQstdItem
+from rqt_reconfigure.gui_thread import call_in_gui_thread
+
+# Characters that make a query more than a plain substring to look for.
+_REGEXP_SPECIAL_CHARS = frozenset('\\^$.|?*+()[]{}')
+
+# Number of past queries whose hits are kept, to narrow down the candidates
+# as the query gets typed, or to restore them when it is erased again.
+_MAX_CACHED_QUERIES = 16
+
+# Queries that need this many names or more to be matched are matched on a
+# worker thread.
+_MIN_NAMES_MATCHED_IN_WORKER = 2000
 
 
 class FilterChildrenModel(QSortFilterProxyModel):
@@ -53,13 +68,25 @@ class FilterChildrenModel(QSortFilterProxyModel):
 
     Ex.
     #TODO example needed here
+
+    The source model has to provide the get_filter_* methods of
+    TreenodeItemModel. The entries that hit a query are found in one pass
+    over the source model when the query changes, and accepted along with
+    their ancestors. filterAcceptsRow just looks the result up. Rows added
+    to the source model later are matched as they come in. Large sets of
+    names are matched on a worker thread, against a snapshot taken when the
+    query changed. The rows keep showing the previous result until then.
+
+    With a ParameterNameIndex, nodes that have parameters whose name hits
+    the query are accepted as well, and the matching names are shown below
+    them. The names come from the index, nodes aren't asked for them.
     """
 
     # Emitted when parameters filtered. int indicates the order/index of
     # params displayed.
     sig_filtered = Signal(int)
 
-    def __init__(self, parent):
+    def __init__(self, parent, param_name_index=None):
         super(FilterChildrenModel, self).__init__(parent)
 
         # :Key: Internal ID of QModelIndex of each treenode.
@@ -69,6 +96,39 @@ class FilterChildrenModel(QSortFilterProxyModel):
         self._parent = parent
         self._toplv_parent_prev = None
 
+        # Text of the query, None if not filtering.
+        self._query = None
+        self._regex = None
+        # (text, regex) of the latest query set, maybe still being matched.
+        self._requested_query = (None, None)
+        # Incremented for every matching started, to drop stale results.
+        self._match_id = 0
+        self._matching = False
+        # Changes of the rows while matching on the worker thread.
+        self._inserted_while_matching = []
+        self._removed_while_matching = set()
+        # Entries that hit the current query, or have a descendant that does.
+        self._accepted = set()
+        # { str : set } entries that hit each query, most recent last.
+        self._hits = OrderedDict()
+        # { str : QRegExp } regex of each query in _hits.
+        self._hit_regexes = {}
+        self._param_name_index = param_name_index
+        # { node GRN : list of str } parameter names that hit the query.
+        self._param_hits = {}
+
+    def setSourceModel(self, model):  # noqa: N802
+        """
+        Overridden.
+
+        Our slots are connected first, so they have processed changes of the
+        rows before the base class filters them.
+        """
+        model.rowsInserted.connect(self._handle_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self._handle_rows_about_removed)
+        model.modelReset.connect(self._handle_model_reset)
+        super(FilterChildrenModel, self).setSourceModel(model)
+
     def filterAcceptsRow(self, src_row, src_parent_qmindex):
         """
         Overridden.
@@ -79,78 +139,218 @@ class FilterChildrenModel(QSortFilterProxyModel):
         :type src_row: int
         :type src_parent_qmindex: QModelIndex
         """
-        logging.debug('filerAcceptRow 1')
-        return self._filter_row_recur(src_row, src_parent_qmindex)
+        if self._query is None:
+            return True
+        _src_model = self.sourceModel()
+        entry = _src_model.get_filter_entry(
+            _src_model.index(src_row, 0, src_parent_qmindex))
+        if _src_model.get_filter_target(entry) is None:
+            # Parameter names, only shown when they hit.
+            return True
+        return entry in self._accepted
 
-    def _filter_row_recur(self, src_row, src_parent_qmindex):
+    def _set_query(self, text, regex):
         """
-        Filter row recursively.
+        Find the entries that hit a query.
 
-        :type src_row: int
-        :type src_parent_qmindex: QModelIndex
+        If the hits of the query are cached, only the parameter names are
+        matched. If a plain query extends one that was cached, only the
+        entries that hit the cached one are tested.
         """
+        self._requested_query = (text, regex)
+        self._match_id += 1
+        if not text:
+            self._matching = False
+            self._apply_matches(None, None, set(), {})
+            return
         _src_model = self.sourceModel()
-        curr_qmindex = _src_model.index(src_row, 0, src_parent_qmindex)
-        curr_qitem = _src_model.itemFromIndex(curr_qmindex)
-
-        if isinstance(curr_qitem, TreenodeQstdItem):
-            # If selectable ROS Node, get GRN name
-            nodename_fullpath = curr_qitem.get_raw_param_name()
-            text_filter_target = nodename_fullpath
-            logging.debug('   Nodename full={} '.format(nodename_fullpath))
-        else:
-            # If ReadonlyItem, this means items are the parameters, not a part
-            # of node name. So, get param name.
-            text_filter_target = curr_qitem.data(Qt.DisplayRole)
-
-        regex = self.filterRegExp()
-        pos_hit = regex.indexIn(text_filter_target)
-        if pos_hit >= 0:  # Query hit.
-            logging.debug('curr data={} row={} col={}'.format(
-                curr_qmindex.data(), curr_qmindex.row(), curr_qmindex.column()
-            ))
-
-            # Set all subsequent treenodes True
-            logging.debug(
-                ' FCModel.filterAcceptsRow'
-                ' src_row={} parent row={} data={} filterRegExp={}'.format(
-                    src_row, src_parent_qmindex.row(),
-                    src_parent_qmindex.data(), regex))
-
-            # If the index is the terminal treenode, parameters that hit
-            # the query are displayed at the root tree.
-            _child_index = curr_qmindex.child(0, 0)
-            if ((not _child_index.isValid()) and
-                    (isinstance(curr_qitem, TreenodeQstdItem))):
-                self._show_params_view(src_row, curr_qitem)
-
-            # Once we find a treenode that hits the query, no need to further
-            # traverse since what this method wants to know with the given
-            # index is whether the given index is supposed to be shown or not.
-            # Thus, just return True here.
-            return True
+        hits = self._hits.get(text)
+        targets = None
+        if hits is None:
+            candidates = self._get_cached_candidates(text)
+            if candidates is None:
+                candidates = _src_model.iter_filter_entries()
+            targets = [(entry, _src_model.get_filter_target(entry))
+                       for entry in candidates]
+        num_names = len(targets) if targets is not None else 0
+        if self._param_name_index is not None:
+            num_names += self._param_name_index.get_name_count()
+        if num_names < _MIN_NAMES_MATCHED_IN_WORKER:
+            self._matching = False
+            self._apply_matches(
+                text, regex, *self._match(regex, hits, targets))
+            return
+        self._matching = True
+        self._inserted_while_matching = []
+        self._removed_while_matching = set()
+        Thread(target=self._match_in_worker, daemon=True,
+               args=(self._match_id, text, regex, QRegExp(regex), hits,
+                     targets)).start()
+
+    def _match(self, regex, hits, targets):
+        """
+        Match names against a query, on any thread.
+
+        :param hits: cached hits, if targets is None.
+        :param targets: list of (entry, text to match).
+        :return: hits, and the parameter names that hit, see _update_param_hits
+        """
+        def hit_text(text_filter_target):
+            return regex.indexIn(text_filter_target) >= 0
+        if targets is not None:
+            hits = set(entry for entry, text_filter_target in targets
+                       if hit_text(text_filter_target))
+        param_hits = {}
+        if self._param_name_index is not None:
+            param_hits = self._param_name_index.find_nodes(hit_text)
+        return hits, param_hits
+
+    def _match_in_worker(self, match_id, text, regex, worker_regex, hits,
+                         targets):
+        # Runs on a worker thread, with a copy of the regex of its own.
+        hits, param_hits = self._match(worker_regex, hits, targets)
+        call_in_gui_thread(self._handle_matched, match_id, text, regex,
+                           hits, param_hits)
+
+    def _handle_matched(self, match_id, text, regex, hits, param_hits):
+        if match_id != self._match_id:
+            # A newer query has been set meanwhile.
+            return
+        self._matching = False
+        hits.difference_update(self._removed_while_matching)
+        inserted = self._inserted_while_matching
+        self._inserted_while_matching = []
+        self._removed_while_matching = set()
+        self._apply_matches(text, regex, hits, param_hits)
+        if inserted:
+            self._handle_entries_inserted(inserted)
+
+    def _apply_matches(self, text, regex, hits, param_hits):
+        if not text:
+            self._query = None
+            self._accepted = set()
+            self._set_param_hits({})
+            self.invalidateFilter()
+            return
+        self._query = text
+        self._regex = regex
+        self._hits.pop(text, None)
+        self._hits[text] = hits
+        self._hit_regexes[text] = regex
+        while len(self._hits) > _MAX_CACHED_QUERIES:
+            evicted, _ = self._hits.popitem(last=False)
+            del self._hit_regexes[evicted]
+        self._accepted = set()
+        self._accept(hits)
+        self._update_param_hits(param_hits)
+        self.invalidateFilter()
+        logging.debug('Query={} hits={} accepted={}'.format(
+            text, len(hits), len(self._accepted)))
+
+    def _get_cached_candidates(self, text):
+        if _REGEXP_SPECIAL_CHARS.intersection(text):
+            return None
+        text = text.lower()
+        candidates = None
+        for query, hits in self._hits.items():
+            if (not _REGEXP_SPECIAL_CHARS.intersection(query) and
+                    query.lower() in text and
+                    (candidates is None or len(hits) < len(candidates))):
+                candidates = hits
+        return candidates
+
+    def _hit(self, entry, regex=None):
+        if regex is None:
+            regex = self._regex
+        return regex.indexIn(self.sourceModel().get_filter_target(entry)) >= 0
+
+    def refresh_param_hits(self):
+        """Match the current query against the parameter names again."""
+        if self._requested_query[0]:
+            # The hits of the tree are cached, only the parameter names are
+            # matched again.
+            self._set_query(*self._requested_query)
+
+    def _update_param_hits(self, param_hits):
+        """
+        Accept the nodes with parameter names that hit the query.
+
+        :param param_hits: { node GRN : list of parameter names that hit }
+        """
+        self._set_param_hits(param_hits)
+        _src_model = self.sourceModel()
+        self._accept(
+            entry for entry in (_src_model.get_filter_entry_from_grn(grn)
+                                for grn in param_hits)
+            if entry is not None)
 
-        if not isinstance(curr_qitem, TreenodeQstdItem):
-            return False  # If parameters, no need for recursive filtering.
-
-        # Evaluate children recursively.
-        row_child = 0
-        while True:
-            child_qmindex = curr_qmindex.child(row_child, 0)
-            if child_qmindex.isValid():
-                flag = self._filter_row_recur(row_child, curr_qmindex)
-                if flag:
-                    return True
-            else:
-                return False
-            row_child += 1
-        return False
-
-    def _show_params_view(self, src_row, curr_qitem):
-        logging.debug('_show_params_view data={}'.format(
-            curr_qitem.data(Qt.DisplayRole)
-        ))
-        curr_qitem.enable_param_items()
+    def _set_param_hits(self, param_hits):
+        # The parameter names that hit are shown below their node.
+        _src_model = self.sourceModel()
+        for grn in self._param_hits:
+            if grn not in param_hits:
+                _src_model.set_param_names(grn, [])
+        for grn, param_names in param_hits.items():
+            _src_model.set_param_names(grn, sorted(param_names))
+        self._param_hits = param_hits
+
+    def _accept(self, hits):
+        """Accept entries that hit the query, and their ancestors."""
+        _src_model = self.sourceModel()
+        for entry in hits:
+            while entry is not None and entry not in self._accepted:
+                self._accepted.add(entry)
+                entry = _src_model.get_filter_parent(entry)
+
+    def _iter_subtree_entries(self, src_parent_qmindex, first, last):
+        _src_model = self.sourceModel()
+        for src_row in range(first, last + 1):
+            entry = _src_model.get_filter_entry(
+                _src_model.index(src_row, 0, src_parent_qmindex))
+            yield entry
+            for child in _src_model.iter_filter_entries(entry):
+                yield child
+
+    def _handle_rows_inserted(self, src_parent_qmindex, first, last):
+        _src_model = self.sourceModel()
+        entries = [
+            entry for entry in self._iter_subtree_entries(
+                src_parent_qmindex, first, last)
+            if _src_model.get_filter_target(entry) is not None]
+        if not entries:
+            # Only parameter names.
+            return
+        if self._matching:
+            self._inserted_while_matching.extend(entries)
+        self._handle_entries_inserted(entries)
+
+    def _handle_entries_inserted(self, entries):
+        # The cached hits of every query are kept up to date, so they can
+        # still be reused.
+        for text, hits in self._hits.items():
+            if text != self._query:
+                regex = self._hit_regexes[text]
+                hits.update(entry for entry in entries
+                            if self._hit(entry, regex))
+        if self._query is None:
+            return
+        new_hits = set(entry for entry in entries if self._hit(entry))
+        self._hits.setdefault(self._query, set()).update(new_hits)
+        self._hit_regexes.setdefault(self._query, self._regex)
+        self._accept(new_hits)
+
+    def _handle_rows_about_removed(self, src_parent_qmindex, first, last):
+        removed = set(
+            self._iter_subtree_entries(src_parent_qmindex, first, last))
+        if self._matching:
+            self._removed_while_matching.update(removed)
+        for hits in itertools.chain((self._accepted,), self._hits.values()):
+            hits.difference_update(removed)
+
+    def _handle_model_reset(self):
+        self._hits.clear()
+        self._hit_regexes.clear()
+        self._set_query(*self._requested_query)
 
     def _get_toplevel_parent_recur(self, qmindex):
         p = qmindex.parent()
@@ -176,11 +376,7 @@ class FilterChildrenModel(QSortFilterProxyModel):
     def set_filter(self, filter_):
         self._filter = filter_
 
-        # If filtered text is '' (0-length str), invalidate current
-        # filtering, in the hope of making filtering process faster.
-        if filter_.get_text == '':
-            self.invalidate()
-            logging.info('filter invalidated.')
-
-        # By calling setFilterRegExp, filterAccepts* methods get kicked.
-        self.setFilterRegExp(self._filter.get_regexp())
+        # If filtered text is '' (0-length str), every row is accepted
+        # without looking at the source model. filterAccepts* methods get
+        # kicked once the hits are known.
+        self._set_query(filter_.get_text(), filter_.get_regexp())
@@ -0,0 +1,88 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from functools import partial
+
+from python_qt_binding.QtCore import QObject, Qt, Signal
+
+from rqt_reconfigure import logging
+
+
+class _GuiThreadDispatcher(QObject):
+    """
+    Forward callables to the thread this object lives in.
+
+    The dispatcher is created from the GUI thread, so emitting its signal
+    from any other thread (e.g. the executor spinning the plugin node)
+    queues the call onto the Qt event loop.
+    """
+
+    _call_signal = Signal(object)
+
+    def __init__(self):
+        super(_GuiThreadDispatcher, self).__init__()
+        self._call_signal.connect(self._call, Qt.QueuedConnection)
+
+    def call(self, callback):
+        self._call_signal.emit(callback)
+
+    def _call(self, callback):
+        try:
+            callback()
+        except Exception as e:
+            logging.error('Callback in GUI thread failed: {}'.format(e))
+
+
+_dispatcher = None
+
+
+def init_gui_thread_dispatcher():
+    """
+    Create the dispatcher.
+
+    Must be called from the GUI thread before any other function of this
+    module is used from another thread.
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = _GuiThreadDispatcher()
+    return _dispatcher
+
+
+def call_in_gui_thread(callback, *args):
+    """Schedule ``callback(*args)`` to be run on the Qt event loop."""
+    init_gui_thread_dispatcher().call(partial(callback, *args))
+
+
+def add_gui_done_callback(future, callback):
+    """
+    Call ``callback(future)`` on the GUI thread once the future is done.
+
+    :type future: rclpy.task.Future
+    """
+    future.add_done_callback(lambda f: call_in_gui_thread(callback, f))
@@ -0,0 +1,214 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from threading import Lock
+
+# Timeout used until a round-trip time has been measured.
+DEFAULT_TIMEOUT = 1.0
+MIN_TIMEOUT = 0.2
+MAX_TIMEOUT = 5.0
+
+# Deadline of the probe of a node found by discovery. Nodes that offer the
+# parameter services but don't spin never answer, so this is kept short.
+DISCOVERY_PROBE_TIMEOUT = 0.5
+
+# Requests about more items than this are bulk requests. A healthy node may
+# take a while to answer them, so their timeout grows with their size and
+# neither their timeouts nor their round-trip times tell about the health of
+# the node.
+BULK_REQUEST_THRESHOLD = 64
+BULK_TIMEOUT_PER_ITEM = 0.002
+BULK_MIN_TIMEOUT = 2.0
+BULK_MAX_TIMEOUT = 30.0
+
+# Consecutive failures after which requests to a node fail fast.
+FAILURE_THRESHOLD = 2
+
+# Delay before the first background probe of an unresponsive node, doubled
+# for every failed probe up to the maximum.
+PROBE_INITIAL_DELAY = 2.0
+PROBE_MAX_DELAY = 30.0
+
+
+def is_bulk_request(num_items):
+    return num_items > BULK_REQUEST_THRESHOLD
+
+
+class NodeHealth(object):
+    """
+    Track how well a remote node answers parameter service calls.
+
+    Keeps a smoothed round-trip time estimate (as TCP does, RFC 6298) to
+    derive an adaptive timeout, and acts as a circuit breaker: after
+    repeated failures the node is considered unresponsive and requests fail
+    fast until a background probe succeeds again.
+    """
+
+    UNKNOWN = 'unknown'
+    HEALTHY = 'healthy'
+    UNRESPONSIVE = 'unresponsive'
+
+    def __init__(self, node_name, registry=None):
+        self._node_name = node_name
+        self._registry = registry
+        self._lock = Lock()
+        self._state = NodeHealth.UNKNOWN
+        self._srtt = None
+        self._rttvar = None
+        self._consecutive_failures = 0
+        self._probe_delay = PROBE_INITIAL_DELAY
+
+    def get_node_name(self):
+        return self._node_name
+
+    def get_state(self):
+        return self._state
+
+    def get_timeout(self, num_items=1):
+        """
+        Get the timeout to use for the next request to the node.
+
+        :param num_items: number of parameters the request is about
+        """
+        with self._lock:
+            if self._srtt is None:
+                timeout = DEFAULT_TIMEOUT
+            else:
+                timeout = self._srtt + 4 * self._rttvar
+        timeout = min(max(timeout, MIN_TIMEOUT), MAX_TIMEOUT)
+        if not is_bulk_request(num_items):
+            return timeout
+        return min(max(timeout + num_items * BULK_TIMEOUT_PER_ITEM,
+                       BULK_MIN_TIMEOUT), BULK_MAX_TIMEOUT)
+
+    def allow_request(self):
+        """Tell whether a request should be sent, or fail fast."""
+        return self._state != NodeHealth.UNRESPONSIVE
+
+    def record_success(self, rtt=None):
+        """
+        Record an answer of the node.
+
+        :param rtt: round-trip time in seconds, None if it isn't telling,
+                    e.g. of bulk requests
+        """
+        with self._lock:
+            if rtt is not None and self._srtt is None:
+                self._srtt = rtt
+                self._rttvar = rtt / 2
+            elif rtt is not None:
+                self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+                self._srtt = 0.875 * self._srtt + 0.125 * rtt
+            self._consecutive_failures = 0
+            self._probe_delay = PROBE_INITIAL_DELAY
+        self._set_state(NodeHealth.HEALTHY)
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures < FAILURE_THRESHOLD:
+                return
+        self._set_state(NodeHealth.UNRESPONSIVE)
+
+    def mark_unresponsive(self):
+        """Open the circuit right away, e.g. after a failed discovery probe."""
+        with self._lock:
+            self._consecutive_failures = max(
+                self._consecutive_failures, FAILURE_THRESHOLD)
+        self._set_state(NodeHealth.UNRESPONSIVE)
+
+    def next_probe_delay(self):
+        """Get the delay before the next probe, backing off every time."""
+        with self._lock:
+            delay = self._probe_delay
+            self._probe_delay = min(self._probe_delay * 2, PROBE_MAX_DELAY)
+        return delay
+
+    def _set_state(self, state):
+        with self._lock:
+            if self._state == state:
+                return
+            self._state = state
+        if self._registry is not None:
+            self._registry.notify(self)
+
+
+class NodeHealthRegistry(object):
+    """Hold the health of every remote node and report state changes."""
+
+    def __init__(self):
+        self._lock = Lock()
+        # { node name : NodeHealth }
+        self._health = {}
+        self._listeners = []
+
+    def get(self, node_name):
+        with self._lock:
+            health = self._health.get(node_name)
+            if health is None:
+                health = NodeHealth(node_name, self)
+                self._health[node_name] = health
+            return health
+
+    def forget(self, node_name):
+        """Drop the health of a node that left the graph."""
+        with self._lock:
+            self._health.pop(node_name, None)
+
+    def add_listener(self, callback):
+        """
+        Register a callback for state changes.
+
+        :param callback: called with the node name and its new state, from
+                         whichever thread observed the change.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def notify(self, health):
+        for callback in list(self._listeners):
+            callback(health.get_node_name(), health.get_state())
+
+
+_registry = NodeHealthRegistry()
+
+
+def get_node_health_registry():
+    return _registry
+
+
+def get_node_health(node_name):
+    """
+    Get the health of a remote node.
+
+    :rtype: NodeHealth
+    """
+    return _registry.get(node_name)
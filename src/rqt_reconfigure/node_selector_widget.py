@@ -30,88 +30,143 @@
 
 from __future__ import division
 
-from collections import OrderedDict
+from collections import deque
 
-import os
+from threading import Event, Thread
 
 import time
 
-from ament_index_python import get_resource
-
-from python_qt_binding import loadUi
-from python_qt_binding.QtCore import Qt, Signal
+from python_qt_binding.QtCore import Qt, QTimer, Signal
 try:
-    from python_qt_binding.QtCore import (  # Qt 5
-        QItemSelectionModel, QModelIndex)
+    from python_qt_binding.QtCore import QItemSelectionModel, QModelIndex  # Qt 5
 except ImportError:
-    from python_qt_binding.QtGui import (  # Qt 4
-        QItemSelectionModel, QModelIndex)
+    from python_qt_binding.QtGui import QItemSelectionModel, QModelIndex  # Qt 4
 from python_qt_binding.QtWidgets import QHeaderView, QWidget
 
 from rqt_py_common.rqt_ros_graph import RqtRosGraph
 
 from rqt_reconfigure import logging
 from rqt_reconfigure.filter_children_model import FilterChildrenModel
-from rqt_reconfigure.param_api import find_nodes_with_params
+from rqt_reconfigure.gui_thread import call_in_gui_thread
+from rqt_reconfigure.node_health import (
+    get_node_health, get_node_health_registry, NodeHealth)
+from rqt_reconfigure.param_api import (
+    find_nodes_with_params, get_entity_counts, get_parameter_event_dispatcher,
+    invalidate_parameter_store, match_node_name)
 from rqt_reconfigure.param_client_widget import ParamClientWidget
+from rqt_reconfigure.param_index import ParameterNameIndex
 from rqt_reconfigure.treenode_item_model import TreenodeItemModel
-from rqt_reconfigure.treenode_qstditem import TreenodeQstdItem
+from rqt_reconfigure.ui_cache import load_ui
 
 
 class NodeSelectorWidget(QWidget):
     _COL_NAMES = ['Node']
 
+    # Period of polling the graph for nodes that come and go.
+    _GRAPH_POLL_PERIOD_MS = 2000
+    # Changes noticed within this delay are applied at once.
+    _REFRESH_DELAY_MS = 200
+    # Treenodes inserted per event loop iteration while populating the tree.
+    _NODES_PER_CHUNK = 25
+    # Changes of parameter names within this delay are filtered at once.
+    _PARAM_NAMES_REFRESH_DELAY_MS = 500
+
     # public signal
     sig_node_selected = Signal(ParamClientWidget)
 
-    def __init__(self, parent, context, signal_msg=None):
+    def __init__(self, parent, context, signal_msg=None, namespaces=None,
+                 excludes=None):
         """
         Init node selector widget.
 
         @param signal_msg: Signal to carry a system msg that is shown on GUI.
         @type signal_msg: QtCore.Signal
+        @param namespaces: Glob patterns of the namespaces to show nodes of.
+        @param excludes: Glob patterns of the nodes to hide.
+        @type namespaces: list of str
+        @type excludes: list of str
         """
         super(NodeSelectorWidget, self).__init__()
         self._parent = parent
         self.stretch = None
         self._signal_msg = signal_msg
         self._context = context
+        self._namespaces = namespaces
+        self._excludes = excludes
 
-        _, package_path = get_resource('packages', 'rqt_reconfigure')
-        ui_file = os.path.join(package_path, 'share', 'rqt_reconfigure', 'resource',
-                               'node_selector.ui')
-        loadUi(ui_file, self)
-
-        # List of the available nodes. Since the list should be updated over
-        # time, and we don't want to create node instance per every update
-        # cycle, this list instance should better be capable of keeping track.
-        self._nodeitems = OrderedDict()
-        # Dictionary. 1st elem is node's GRN name,
-        # 2nd is TreenodeQstdItem instance.
-        # TODO: Needs updated when nodes list updated.
+        load_ui('node_selector.ui', self)
 
-        #  Setup treeview and models
-        self._item_model = TreenodeItemModel()
-        self._rootitem = self._item_model.invisibleRootItem()  # QStandardItem
+        #  Setup treeview and models. The item model keeps track of the
+        #  available nodes, see get_nodeitems.
+        self._item_model = TreenodeItemModel(self._context)
 
         self._nodes_previous = None
 
-        # Calling this method updates the list of the node.
-        # Initially done only once.
-        self._update_nodetree_pernode()
-
-        # TODO(Isaac): Needs auto-update function enabled, once another
-        #             function that updates node tree with maintaining
-        #             collapse/expansion  state. http://goo.gl/GuwYp can be a
-        #             help.
+        # Nodes waiting to be inserted into the tree, see _add_nodes_chunk.
+        self._nodes_to_add = deque()
+        self._loading = False
+        self._i_node_loaded = 0
+        self._num_nodes_loading = 0
+        self._elapsedtime_loading = 0.0
+        # Whether the first discovery has completed, until then selections
+        # and expansions from restored settings are kept pending.
+        self._discovery_done = False
+        # { grn : scroll_to }
+        self._pending_selections = {}
+        self._pending_expanded_nodes = []
+        self._loading_progress.setVisible(False)
+        self._loading_progress.setMinimum(0)
+
+        # Keep the tree in sync with the graph. Nodes coming and going are
+        # noticed by polling the graph and by parameter events from nodes
+        # not in the tree yet. Bursts of changes are batched into a single
+        # update, which only touches the nodes that changed.
+        self._discovery_running = False
+        self._discovery_pending = False
+        # Graph queries run on a single worker thread, woken up for every
+        # discovery.
+        self._discovery_requested = Event()
+        self._shutting_down = False
+        self._discovery_thread = Thread(
+            target=self._run_discovery_worker, daemon=True)
+        self._discovery_thread.start()
+        self._unseen_senders = set()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self._REFRESH_DELAY_MS)
+        self._refresh_timer.timeout.connect(self._start_discovery)
+        self._graph_poll_timer = QTimer(self)
+        self._graph_poll_timer.setInterval(self._GRAPH_POLL_PERIOD_MS)
+        self._graph_poll_timer.timeout.connect(self._schedule_refresh)
+        self._graph_poll_timer.start()
+        self._param_event_dispatcher = get_parameter_event_dispatcher(
+            self._context.node)
+        # Counters of the event filtering and of the entities created for
+        # the remote nodes, shown as tooltip of the refresh button.
+        self._statistics_text = None
+        if not self._param_event_dispatcher.is_content_filter_enabled():
+            self._param_event_dispatcher.add_sender_callback(
+                self._on_parameter_event_sender)
+
+        # The tree is populated in the background, so that the window shows
+        # up before all nodes are discovered.
+        self._start_discovery()
 
         self._collapse_button.pressed.connect(
             self._node_selector_view.collapseAll)
         self._expand_button.pressed.connect(self._node_selector_view.expandAll)
         self._refresh_button.pressed.connect(self._refresh_nodes)
 
-        # Filtering preparation.
-        self._proxy_model = FilterChildrenModel(self)
+        # Filtering preparation. Parameter names are searched in an index
+        # built in the background, see ParameterNameIndex.
+        self._param_name_index = ParameterNameIndex(self._context.node)
+        self._param_names_changed = False
+        self._param_names_timer = QTimer(self)
+        self._param_names_timer.setSingleShot(True)
+        self._param_names_timer.setInterval(self._PARAM_NAMES_REFRESH_DELAY_MS)
+        self._param_names_timer.timeout.connect(self._refresh_param_hits)
+        self._param_name_index.add_listener(self._on_param_names_changed)
+        self._proxy_model = FilterChildrenModel(self, self._param_name_index)
         self._proxy_model.setDynamicSortFilter(True)
         self._proxy_model.setSourceModel(self._item_model)
         self._node_selector_view.setModel(self._proxy_model)
@@ -135,22 +190,18 @@ class NodeSelectorWidget(QWidget):
         self.selectionModel.selectionChanged.connect(
             self._selection_changed_slot)
 
+        # Show nodes that stopped answering.
+        get_node_health_registry().add_listener(self._on_node_health_changed)
+
     def node_deselected(self, grn):
         """
         Deselect the index that corresponds to the given GRN.
 
         :type grn: str
         """
-        # Obtain all indices currently selected.
-        indexes_selected = self.selectionModel.selectedIndexes()
-        for index in indexes_selected:
-            grn_from_selectedindex = RqtRosGraph.get_upper_grn(index, '')
-            logging.debug(' Compare given grn={} from selected={}'.format(
-                grn, grn_from_selectedindex))
-            # If GRN retrieved from selected index matches the given one.
-            if grn == grn_from_selectedindex:
-                # Deselect the index.
-                self.selectionModel.select(index, QItemSelectionModel.Deselect)
+        index = self._get_index_from_grn(grn)
+        if index.isValid() and self.selectionModel.isSelected(index):
+            self.selectionModel.select(index, QItemSelectionModel.Deselect)
 
     def node_selected(self, grn, scroll_to=False):
         """
@@ -158,34 +209,54 @@ class NodeSelectorWidget(QWidget):
 
         :type grn: str
         """
-        # Iterate over all of the indexes
-        for index in self._enumerate_indexes():
-            grn_from_index = RqtRosGraph.get_upper_grn(index, '')
-            logging.debug(' Compare given grn={} from selected={}'.format(
-                grn, grn_from_index))
-            # If GRN retrieved from selected index matches the given one.
-            if grn == grn_from_index:
-                # Select the index.
-                self.selectionModel.select(index, QItemSelectionModel.Select)
-                if scroll_to:
-                    self._node_selector_view.scrollTo(index)
-                break
+        if not self._item_model.has_node(grn):
+            # Selections restored from the settings may arrive before the
+            # node has been added to the tree.
+            if self.is_loading():
+                self._pending_selections[grn] = scroll_to
+            elif scroll_to:
+                logging.warn(
+                    'Could not find a dynamic reconfigure client'
+                    " named '{}'".format(grn)
+                )
+            return
+
+        index = self._get_index_from_grn(grn)
+        if not index.isValid():
+            # Filtered out.
+            return
+        self.selectionModel.select(index, QItemSelectionModel.Select)
+        if scroll_to:
+            self._node_selector_view.scrollTo(index)
+
+    def _get_index_from_grn(self, grn):
+        """
+        Get the index in the view of a node or a namespace.
 
-    def _enumerate_indexes(self, parent=QModelIndex()):
+        :type grn: str
+        :rtype: QModelIndex of the proxy model. Invalid if the treenode isn't
+                in the tree, or doesn't pass the filter.
+        """
+        src_index = self._item_model.get_index_from_grn(grn)
+        if not src_index.isValid():
+            return src_index
+        return self._proxy_model.mapFromSource(src_index)
+
+    def _enumerate_expanded_indexes(self, parent=QModelIndex()):
         model = self.selectionModel.model()
         for row in range(0, model.rowCount(parent)):
             index = model.index(row, 0, parent)
-            yield index
-            if model.hasChildren(index):
-                for child in self._enumerate_indexes(index):
+            if self._node_selector_view.isExpanded(index):
+                yield index
+                for child in self._enumerate_expanded_indexes(index):
                     yield child
 
     def _selection_deselected(self, index_current, rosnode_name_selected):
         # Intended to be called from _selection_changed_slot.
         self.selectionModel.select(index_current, QItemSelectionModel.Deselect)
 
-        param_client_widget = self._nodeitems[
-            rosnode_name_selected].get_param_client_widget()
+        param_client_widget = self._item_model.get_item(
+            rosnode_name_selected).get_param_client_widget()
 
         # Signal to notify other pane that also contains node widget.
         self.sig_node_selected.emit(param_client_widget)
@@ -196,32 +267,16 @@ class NodeSelectorWidget(QWidget):
             index_current.row(), index_current.column(),
             index_current.data(Qt.DisplayRole)))
 
-        # Determine if it's terminal treenode.
-        found_node = False
-        for nodeitem in self._nodeitems.values():
-            name_nodeitem = nodeitem.data(Qt.DisplayRole)
-            name_rosnode_leaf = rosnode_name_selected[
-                rosnode_name_selected.rfind(RqtRosGraph.DELIM_GRN) + 1:]
-
-            # If name of the leaf in the given name & the name taken from
-            # nodeitem list matches.
-            if ((name_nodeitem == rosnode_name_selected) and
-                (name_nodeitem[
-                    name_nodeitem.rfind(RqtRosGraph.DELIM_GRN) + 1:] ==
-                    name_rosnode_leaf)):
-
-                logging.debug('terminal str {} MATCH {}'.format(
-                    name_nodeitem, name_rosnode_leaf))
-                found_node = True
-                break
-        if not found_node:  # Only when it's NOT a terminal we deselect it.
+        # Determine if it's a ROS Node rather than a namespace.
+        if not self._item_model.has_node(rosnode_name_selected):
+            # Only when it's NOT a ROS Node we deselect it.
             self.selectionModel.select(index_current,
                                        QItemSelectionModel.Deselect)
             return
 
-        # Only when it's a terminal we move forward.
+        # Only when it's a ROS Node we move forward.
 
-        item_child = self._nodeitems[rosnode_name_selected]
+        item_child = self._item_model.get_item(rosnode_name_selected)
         item_widget = item_child.get_param_client_widget()
         logging.debug('item_selected={} child={} widget={}'.format(
                       index_current, item_child, item_widget))
@@ -262,7 +317,7 @@ class NodeSelectorWidget(QWidget):
         rosnode_name_selected = RqtRosGraph.get_upper_grn(index_current, '')
 
         # If retrieved node name isn't in the list of all nodes.
-        if rosnode_name_selected not in self._nodeitems.keys():
+        if not self._item_model.has_node(rosnode_name_selected):
             # De-select the selected item.
             self.selectionModel.select(index_current,
                                        QItemSelectionModel.Deselect)
@@ -289,192 +344,289 @@ class NodeSelectorWidget(QWidget):
                 self._signal_msg.emit(e)
                 logging.error(e)
 
+    def shutdown(self):
+        get_node_health_registry().remove_listener(self._on_node_health_changed)
+        self._param_event_dispatcher.remove_sender_callback(
+            self._on_parameter_event_sender)
+        self._graph_poll_timer.stop()
+        self._refresh_timer.stop()
+        self._shutting_down = True
+        self._discovery_requested.set()
+        self._param_name_index.remove_listener(self._on_param_names_changed)
+        self._param_name_index.close()
+        self._param_names_timer.stop()
+
+    def _on_param_names_changed(self, node_name):
+        # Called from the executor thread, possibly for every parameter event.
+        if self._param_names_changed:
+            return
+        self._param_names_changed = True
+        call_in_gui_thread(self._param_names_timer.start)
+
+    def _refresh_param_hits(self):
+        self._param_names_changed = False
+        self._proxy_model.refresh_param_hits()
+
+    def _on_parameter_event_sender(self, node_name):
+        # Called on the executor thread for every parameter event. Only
+        # senders that aren't in the tree are handed to the GUI thread.
+        if (self._item_model.has_node(node_name) or
+                not match_node_name(node_name, self._namespaces,
+                                    self._excludes)):
+            return
+        call_in_gui_thread(self._handle_unseen_sender, node_name)
+
+    def _handle_unseen_sender(self, node_name):
+        if (self._item_model.has_node(node_name) or
+                node_name in self._unseen_senders):
+            return
+        self._unseen_senders.add(node_name)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start()
+
+    def _start_discovery(self):
+        if self._discovery_running:
+            self._discovery_pending = True
+            return
+        self._discovery_running = True
+        self._discovery_requested.set()
+
+    def _find_nodes(self):
+        return find_nodes_with_params(
+            self._context.node, self._namespaces, self._excludes)
+
+    def _run_discovery_worker(self):
+        # Keeps graph queries off the GUI thread.
+        while True:
+            self._discovery_requested.wait()
+            self._discovery_requested.clear()
+            if self._shutting_down:
+                return
+            try:
+                nodes = self._find_nodes()
+            except Exception as e:
+                logging.error('Failed to discover nodes: {}'.format(e))
+                nodes = None
+            call_in_gui_thread(self._handle_nodes_discovered, nodes)
+
+    def _handle_nodes_discovered(self, nodes):
+        self._discovery_running = False
+        self._update_statistics()
+        if nodes is not None:
+            self._unseen_senders.clear()
+            known_nodes = set(self._item_model.get_node_names())
+            if set(nodes) != known_nodes:
+                # A client may still be kept for nodes that reappeared,
+                # with parameters of the previous run.
+                for node_name in set(nodes) - known_nodes:
+                    invalidate_parameter_store(self._context.node, node_name)
+                self._apply_nodes(nodes)
+                # Nodes that didn't answer may have been restarted.
+                self._param_name_index.relist_unanswered()
+        if not self._discovery_done and not self._loading:
+            # The first discovery found no nodes to load.
+            self._handle_loading_finished()
+        if self._discovery_pending:
+            self._discovery_pending = False
+            self._schedule_refresh()
+
+    def _update_statistics(self):
+        text = (
+            'Parameter events: {received} received, {dispatched} dispatched, '
+            '{dropped_in_python} dropped in Python\n'
+            'Nodes with events filtered by the middleware: '
+            '{content_filtered_nodes}, in Python: {fallback_nodes}').format(
+                **self._param_event_dispatcher.get_statistics())
+        text += '\nService clients: {clients}, subscriptions: {subscriptions}'.format(
+            **get_entity_counts())
+        if text == self._statistics_text:
+            return
+        self._statistics_text = text
+        self._refresh_button.setToolTip(text)
+        logging.debug(text.replace('\n', '; '))
+
+    def _apply_nodes(self, nodes):
+        """
+        Bring the tree in line with the given nodes.
+
+        Only nodes that appeared or disappeared are touched, so expansion,
+        selection and open editors of the others are kept.
+        """
+        self._node_selector_view.setUpdatesEnabled(False)
+        try:
+            self._prune_nodetree_pernode(nodes)
+            self._update_nodetree_pernode(nodes)
+        finally:
+            self._node_selector_view.setUpdatesEnabled(True)
+
+    def _on_node_health_changed(self, node_name, state):
+        # Called from whichever thread observed the change.
+        call_in_gui_thread(self._update_node_health, node_name, state)
+
+    def _update_node_health(self, grn, state=None):
+        """
+        Reflect the health of a node on its treenode.
+
+        :param state: state of the node, see NodeHealth. Looked up if None.
+        """
+        if not self._item_model.has_node(grn):
+            return
+        if state is None:
+            state = get_node_health(grn).get_state()
+        self._item_model.set_node_unresponsive(
+            grn, state == NodeHealth.UNRESPONSIVE)
+
     def get_nodeitems(self):
         """
-        Get node items.
+        Get the GRNs of the nodes in the tree.
 
-        :rtype: OrderedDict 1st elem is node's GRN name,
-                2nd is TreenodeQstdItem instance
+        :rtype: collection of str
         """
-        return self._nodeitems
+        return self._item_model.get_node_names()
 
-    def _update_nodetree_pernode(self):
+    def _update_nodetree_pernode(self, nodes=None):
+        """
+        Add treenodes for the nodes that aren't in the tree yet.
 
+        Treenodes are inserted in chunks across event loop iterations, so
+        the GUI stays responsive while a large tree fills in.
+
+        :param nodes: names of the nodes with parameters, discovered anew
+                      if None.
+        """
         # TODO(Isaac): 11/25/2012 dynamic_reconfigure only returns params that
         #             are associated with nodes. In order to handle independent
         #             params, different approach needs taken.
-        try:
-            nodes = find_nodes_with_params(self._context.node)
-        except Exception as e:
-            logging.error(e)
-            # TODO: print to sysmsg pane
-            raise e  # TODO Make sure 'raise' here returns or finalizes  func.
+        if nodes is None:
+            try:
+                nodes = self._find_nodes()
+            except Exception as e:
+                logging.error(e)
+                # TODO: print to sysmsg pane
+                raise e  # TODO Make sure 'raise' here returns or finalizes  func.
 
         if not nodes == self._nodes_previous:
-            i_node_curr = 1
-            num_nodes = len(nodes)
-            elapsedtime_overall = 0.0
+            self._nodes_previous = nodes
+            queued = set(self._nodes_to_add)
             for node_name_grn in nodes:
                 # Skip this grn if we already have it
-                if node_name_grn in self._nodeitems:
-                    i_node_curr += 1
+                if (self._item_model.has_node(node_name_grn) or
+                        node_name_grn in queued):
                     continue
+                self._nodes_to_add.append(node_name_grn)
+            self._num_nodes_loading = len(self._nodes_to_add) + self._i_node_loaded
+            if self._nodes_to_add and not self._loading:
+                self._loading = True
+                self._elapsedtime_loading = 0.0
+                self._loading_progress.setVisible(True)
+                QTimer.singleShot(0, self._add_nodes_chunk)
+
+    def _add_nodes_chunk(self):
+        for _ in range(self._NODES_PER_CHUNK):
+            if not self._nodes_to_add:
+                break
+            node_name_grn = self._nodes_to_add.popleft()
+            self._i_node_loaded += 1
+            if self._item_model.has_node(node_name_grn):
+                continue
+
+            time_siglenode_loop = time.time()
 
-                time_siglenode_loop = time.time()
+            self._add_children_treenode(node_name_grn)
 
-                # (Begin) For DEBUG ONLY; skip some dynreconf creation
-                # if i_node_curr % 2 != 0:
-                #     i_node_curr += 1
-                #     continue
-                # (End) For DEBUG ONLY. ####
+            time_siglenode_loop = time.time() - time_siglenode_loop
+            self._elapsedtime_loading += time_siglenode_loop
 
-                # Instantiate QStandardItem. Inside, dyn_reconf client will
-                # be generated too.
-                treenodeitem_toplevel = TreenodeQstdItem(
-                    self._context, node_name_grn,
-                    TreenodeQstdItem.NODE_FULLPATH
+            _str_progress = 'reconf ' + \
+                'loading #{}/{} {} / {}sec node={}'.format(
+                    self._i_node_loaded, self._num_nodes_loading,
+                    round(time_siglenode_loop, 2),
+                    round(self._elapsedtime_loading, 2), node_name_grn
                 )
-                _treenode_names = treenodeitem_toplevel.get_treenode_names()
 
-                # Using OrderedDict here is a workaround for StdItemModel
-                # not returning corresponding item to index.
-                self._nodeitems[node_name_grn] = treenodeitem_toplevel
+            # NOT a debug print - please DO NOT remove. This print works
+            # as progress notification when loading takes long time.
+            logging.debug(_str_progress)
 
-                self._add_children_treenode(treenodeitem_toplevel,
-                                            self._rootitem, _treenode_names)
+            if node_name_grn in self._pending_selections:
+                self.node_selected(
+                    node_name_grn, self._pending_selections.pop(node_name_grn))
 
-                time_siglenode_loop = time.time() - time_siglenode_loop
-                elapsedtime_overall += time_siglenode_loop
+        self._loading_progress.setMaximum(self._num_nodes_loading)
+        self._loading_progress.setValue(self._i_node_loaded)
 
-                _str_progress = 'reconf ' + \
-                    'loading #{}/{} {} / {}sec node={}'.format(
-                        i_node_curr, num_nodes, round(time_siglenode_loop, 2),
-                        round(elapsedtime_overall, 2), node_name_grn
-                    )
+        if self._nodes_to_add:
+            QTimer.singleShot(0, self._add_nodes_chunk)
+        else:
+            self._handle_loading_finished()
+
+    def _handle_loading_finished(self):
+        self._loading = False
+        self._i_node_loaded = 0
+        self._loading_progress.setVisible(False)
+        self._discovery_done = True
+        self._restore_expanded_nodes()
+        for grn, explicit in self._pending_selections.items():
+            if explicit:
+                logging.warn(
+                    'Could not find a dynamic reconfigure client'
+                    " named '{}'".format(grn)
+                )
+        self._pending_selections.clear()
 
-                # NOT a debug print - please DO NOT remove. This print works
-                # as progress notification when loading takes long time.
-                logging.debug(_str_progress)
-                i_node_curr += 1
+    def is_loading(self):
+        """Tell whether the tree is still being populated."""
+        return not self._discovery_done or self._loading
 
-    def _add_children_treenode(self, treenodeitem_toplevel,
-                               treenodeitem_parent, child_names_left):
+    def _add_children_treenode(self, grn):
         """
-        Add children treenode.
-
-        Evaluate current treenode and the previous treenode at the same depth.
-        If the name of both nodes is the same, current node instance is
-        ignored (that means children will be added to the same parent). If not,
-        the current node gets added to the same parent node. At the end, this
-        function gets called recursively going 1 level deeper.
-
-        :type treenodeitem_toplevel: TreenodeQstdItem
-        :type treenodeitem_parent: TreenodeQstdItem
-        :type child_names_left: List of str
-        :param child_names_left: List of strings that is sorted in hierarchical order.
-        """
-        # TODO(Isaac): Consider moving this method to rqt_py_common.
+        Add the treenode of a node, and of the namespaces it is in.
 
-        name_currentnode = child_names_left.pop(0)
-        grn_curr = treenodeitem_toplevel.get_raw_param_name()
-        stditem_currentnode = TreenodeQstdItem(self._context, grn_curr,
-                                               TreenodeQstdItem.NODE_FULLPATH)
+        Treenodes of namespaces are shared with the nodes already in them.
+        The dyn_reconf client of the node is only generated once the node
+        gets selected.
 
-        for i in range(treenodeitem_parent.rowCount()):
-            if treenodeitem_parent.child(i).text() == name_currentnode:
-                row_index_parent = i
-                break
-        else:
-            # Item at the bottom is your most recent node
-            row_index_parent = treenodeitem_parent.rowCount() - 1
-
-        # Obtain and instantiate prev node in the same depth.
-        name_prev = ''
-        stditem_prev = None
-        if treenodeitem_parent.child(row_index_parent):
-            stditem_prev = treenodeitem_parent.child(row_index_parent)
-            name_prev = stditem_prev.text()
-
-        # If the name of both nodes is the same, current node instance is
-        # ignored (that means children will be added to the same parent)
-        if name_prev != name_currentnode:
-            stditem_currentnode.setText(name_currentnode)
-
-            # Arrange alphabetically by display name
-            insert_index = 0
-            while (insert_index < treenodeitem_parent.rowCount() and
-                    treenodeitem_parent.child(insert_index)
-                    .text() < name_currentnode):
-                insert_index += 1
-
-            treenodeitem_parent.insertRow(insert_index, stditem_currentnode)
-            stditem = stditem_currentnode
-        else:
-            stditem = stditem_prev
-
-        if child_names_left:
-            # TODO: Model is closely bound to a certain type of view (treeview)
-            # here. Ideally isolate those two. Maybe we should split into 2
-            # class, 1 handles view, the other does model.
-            self._add_children_treenode(treenodeitem_toplevel, stditem,
-                                        child_names_left)
-        else:  # Selectable ROS Node.
-            # TODO: Accept even non-terminal treenode as long as it's ROS Node.
-            self._item_model.set_item_from_index(grn_curr, stditem.index())
-
-    def _remove_children_treenode(self, treenodeitem_toplevel,
-                                  treenodeitem_parent, child_names_left):
+        :type grn: str
         """
-        Remove child treenode.
+        self._item_model.add_node(grn)
+        self._param_name_index.add_node(grn)
+        self._update_node_health(grn)
 
-        :type treenodeitem_toplevel: TreenodeQstdItem
-        :type treenodeitem_parent: TreenodeQstdItem
-        :type child_names_left: List of str
-        :param child_names_left: List of strings that is sorted in hierarchical order.
+    def _remove_children_treenode(self, grn):
         """
-        name_currentnode = child_names_left.pop(0)
+        Remove the treenode of a node, and of the namespaces left empty.
 
-        for i in range(treenodeitem_parent.rowCount()):
-            if treenodeitem_parent.child(i).text() == name_currentnode:
-                row_index_parent = i
-                break
-        else:
-            grn_curr = treenodeitem_toplevel.get_raw_param_name()
-            raise RuntimeError(
-                f'Failed to remove node {grn_curr}: No treenode {name_currentnode}')
-
-        if not child_names_left:  # Leaf node
-            treenodeitem_parent.removeRow(row_index_parent)
-            return
-
-        self._remove_children_treenode(treenodeitem_toplevel,
-                                       treenodeitem_parent.child(row_index_parent),
-                                       child_names_left)
-
-        # After a child has been removed, if none is left, remove the parent as well
-        if treenodeitem_parent.child(row_index_parent).rowCount() == 0:
-            treenodeitem_parent.removeRow(row_index_parent)
+        :type grn: str
+        """
+        self._param_name_index.remove_node(grn)
+        # A node showing up again under the same name starts afresh.
+        get_node_health_registry().forget(grn)
+        if not self._item_model.remove_node(grn):
+            raise RuntimeError(f'Failed to remove node {grn}: No treenode')
 
-    def _prune_nodetree_pernode(self):
-        try:
-            nodes = find_nodes_with_params(self._context.node)
-        except Exception as e:
-            logging.error('Reconfigure GUI cannot connect to master.')
-            raise e  # TODO Make sure 'raise' here returns or finalizes func.
+    def _prune_nodetree_pernode(self, nodes):
+        """
+        Remove the treenodes of nodes that are gone.
 
-        for candidate_for_removal in list(self._nodeitems.keys()):
+        :param nodes: names of the nodes with parameters.
+        """
+        nodes = set(nodes)
+        self._nodes_to_add = deque(n for n in self._nodes_to_add if n in nodes)
+        for candidate_for_removal in list(self._item_model.get_node_names()):
             if candidate_for_removal in nodes:
                 continue
             logging.debug(f'Removing {candidate_for_removal} because '
                           'the server is no longer available.')
-            treenode = self._nodeitems[candidate_for_removal]
-            treenode_names = treenode.get_treenode_names()
-            self._remove_children_treenode(treenode, self._rootitem, treenode_names)
-            self._nodeitems.pop(candidate_for_removal).reset()
+            self._remove_children_treenode(candidate_for_removal)
 
     def _refresh_nodes(self):
-        self._prune_nodetree_pernode()
-        self._update_nodetree_pernode()
+        # The graph is queried on a worker thread, like for automatic
+        # refreshes.
+        self._refresh_timer.stop()
+        self._start_discovery()
 
     def set_filter(self, filter_):
         """
@@ -488,7 +640,6 @@ class NodeSelectorWidget(QWidget):
         # Method for Debug only.
 
         # index_current = self.selectionModel.currentIndex()
-        src_model = self._item_model
         index_current = None
         index_deselected = None
         index_parent = None
@@ -496,11 +647,11 @@ class NodeSelectorWidget(QWidget):
         if selected.indexes():
             index_current = selected.indexes()[0]
             index_parent = index_current.parent()
-            curr_qstd_item = src_model.itemFromIndex(index_current)
+            curr_qstd_item = index_current.internalPointer()
         elif deselected.indexes():
             index_deselected = deselected.indexes()[0]
             index_parent = index_deselected.parent()
-            curr_qstd_item = src_model.itemFromIndex(index_deselected)
+            curr_qstd_item = index_deselected.internalPointer()
 
         if selected.indexes() > 0:
             logging.debug(
@@ -524,16 +675,21 @@ class NodeSelectorWidget(QWidget):
 
     def save_settings(self, instance_settings):
         expanded_nodes = []
-        for index in self._enumerate_indexes():
-            if self._node_selector_view.isExpanded(index):
-                grn = RqtRosGraph.get_upper_grn(index, '')
-                if grn:
-                    expanded_nodes.append(grn)
+        for index in self._enumerate_expanded_indexes():
+            grn = RqtRosGraph.get_upper_grn(index, '')
+            if grn:
+                expanded_nodes.append(grn)
         instance_settings.set_value('expanded_nodes', expanded_nodes)
 
     def restore_settings(self, instance_settings):
-        expanded_nodes = instance_settings.value('expanded_nodes', [])
-        if expanded_nodes:
-            for index in self._enumerate_indexes():
-                if RqtRosGraph.get_upper_grn(index, '') in expanded_nodes:
-                    self._node_selector_view.setExpanded(index, True)
+        self._pending_expanded_nodes = instance_settings.value('expanded_nodes', [])
+        if self._discovery_done and not self._loading:
+            self._restore_expanded_nodes()
+
+    def _restore_expanded_nodes(self):
+        expanded_nodes = self._pending_expanded_nodes
+        self._pending_expanded_nodes = []
+        for grn in expanded_nodes:
+            index = self._get_index_from_grn(grn)
+            if index.isValid():
+                self._node_selector_view.setExpanded(index, True)
@@ -26,7 +26,11 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-from threading import Event
+from fnmatch import fnmatchcase
+import heapq
+import itertools
+from threading import Condition, Event, Lock, Thread
+import time
 
 from rcl_interfaces.msg import Parameter as ParameterMsg
 from rcl_interfaces.msg import ParameterEvent
@@ -34,9 +38,45 @@ from rcl_interfaces.srv import DescribeParameters
 from rcl_interfaces.srv import GetParameters
 from rcl_interfaces.srv import ListParameters
 from rcl_interfaces.srv import SetParameters
+from rcl_interfaces.srv import SetParametersAtomically
 
 from rclpy.parameter import Parameter
 from rclpy.qos import qos_profile_parameter_events
+try:
+    from rclpy.subscription import ContentFilterOptions
+except ImportError:  # rclpy without content filtered topics support
+    ContentFilterOptions = None
+from rclpy.task import Future
+
+from rqt_reconfigure import logging
+from rqt_reconfigure.node_health import (
+    DISCOVERY_PROBE_TIMEOUT, get_node_health, get_node_health_registry,
+    is_bulk_request, MAX_TIMEOUT, NodeHealth)
+from rqt_reconfigure.param_store import ParameterStore
+
+# How often a pending asynchronous call checks whether the remote service
+# became available.
+_SERVICE_POLL_PERIOD = 0.05
+
+# Upper bound of parameter names sent in a single DescribeParameters request.
+# Larger sets are split in chunks that are requested in parallel.
+_MAX_NAMES_PER_DESCRIBE_REQUEST = 512
+
+# Upper bound of parameters set in a single request when loading parameters
+# from a file. Sets up to this size are applied all-or-nothing.
+_MAX_PARAMETERS_PER_LOAD_REQUEST = 8192
+
+# Seconds to wait for the reply to a bulk load, which may take the remote
+# node a while to validate.
+_LOAD_TIMEOUT = 10.0
+
+# Seconds to wait for SetParametersAtomically to show up when loading before
+# falling back to SetParameters. The service is either offered by the node
+# along with the others or not at all, so there's no point in waiting long.
+_LOAD_ATOMIC_WAIT_TIMEOUT = 1.0
+
+# Seconds after which an unused service client is destroyed.
+DEFAULT_CLIENT_IDLE_TIMEOUT = 60.0
 
 
 class AsyncServiceCallFailed(Exception):
@@ -46,113 +86,1197 @@ class AsyncServiceCallFailed(Exception):
         super().__init__(self.message)
 
 
+class ServiceNotAvailable(AsyncServiceCallFailed):
+
+    def __init__(self, message='asynchronous service call failed',
+                 hint='timed out waiting for service'):
+        super().__init__(message, hint)
+
+
+class _CallLaterThread(Thread):
+    """
+    Run callbacks after a delay on a single background thread.
+
+    Used to implement timeouts and service availability polling for
+    asynchronous service calls without blocking the caller or spawning a
+    thread per call.
+    """
+
+    def __init__(self):
+        super().__init__(name='rqt_reconfigure_call_later', daemon=True)
+        self._condition = Condition()
+        self._queue = []
+        self._counter = itertools.count()
+        # Handles of queued callbacks that are not to be run anymore.
+        self._cancelled = set()
+
+    def call_later(self, delay, callback):
+        """
+        Queue a callback.
+
+        :return: handle to pass to cancel
+        """
+        with self._condition:
+            handle = next(self._counter)
+            heapq.heappush(
+                self._queue, (time.monotonic() + delay, handle, callback))
+            self._condition.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self._condition:
+            if any(queued_handle == handle for _, queued_handle, _ in self._queue):
+                self._cancelled.add(handle)
+
+    def run(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                deadline, handle, callback = self._queue[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                heapq.heappop(self._queue)
+                if handle in self._cancelled:
+                    self._cancelled.discard(handle)
+                    continue
+            try:
+                callback()
+            except Exception as e:
+                logging.error('Delayed callback failed: {}'.format(e))
+
+
+_call_later_thread = None
+_call_later_lock = Lock()
+
+
+def _call_later(delay, callback):
+    """
+    Run a callback after a delay on the background thread.
+
+    :return: handle to pass to _cancel_call_later
+    """
+    global _call_later_thread
+    with _call_later_lock:
+        if _call_later_thread is None:
+            _call_later_thread = _CallLaterThread()
+            _call_later_thread.start()
+    return _call_later_thread.call_later(delay, callback)
+
+
+def _cancel_call_later(handle):
+    """Drop a callback queued by _call_later, unless it already ran."""
+    with _call_later_lock:
+        call_later_thread = _call_later_thread
+    if call_later_thread is not None:
+        call_later_thread.cancel(handle)
+
+
+def _chain_future(source, target, transform=None):
+    """Resolve ``target`` with the outcome of ``source`` once it is done."""
+    def _on_done(future):
+        try:
+            result = future.result()
+            target.set_result(transform(result) if transform else result)
+        except Exception as e:
+            target.set_exception(e)
+    source.add_done_callback(_on_done)
+
+
+# Number of RMW entities created by this module, to keep an eye on the
+# footprint on the graph.
+_entity_counts = {'clients': 0, 'subscriptions': 0}
+_entity_counts_lock = Lock()
+
+
+def _count_entity(kind, delta):
+    with _entity_counts_lock:
+        _entity_counts[kind] += delta
+
+
+def get_entity_counts():
+    """
+    Get the number of service clients and subscriptions currently alive.
+
+    :rtype: dict
+    """
+    with _entity_counts_lock:
+        return dict(_entity_counts)
+
+
+def _gather_futures(futures):
+    """
+    Combine futures into one resolving to the list of their results.
+
+    The combined future fails with the first exception raised by any of them.
+    """
+    result_future = Future()
+    results = [None] * len(futures)
+    remaining = [len(futures)]
+    lock = Lock()
+
+    def _on_done(index, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            with lock:
+                if result_future.done():
+                    return
+                remaining[0] = -1
+            result_future.set_exception(e)
+            return
+        with lock:
+            if remaining[0] < 0:
+                return
+            results[index] = result
+            remaining[0] -= 1
+            if remaining[0] != 0:
+                return
+        result_future.set_result(results)
+
+    if not futures:
+        result_future.set_result(results)
+    for index, future in enumerate(futures):
+        future.add_done_callback(lambda f, index=index: _on_done(index, f))
+    return result_future
+
+
+def _call_service_with_deadlines(client, request, timeout, wait_timeout,
+                                 on_success=None, on_timeout=None):
+    """
+    Call a service without blocking, with deadlines for each step.
+
+    :param wait_timeout: seconds to wait for the service to show up
+    :param timeout: seconds to wait for the response once the request is sent
+    :param on_success: called with the round-trip time in seconds when the
+                       service answered in time, e.g. to record the health
+                       of the node.
+    :param on_timeout: called when the service didn't answer in time.
+    :rtype: rclpy.task.Future resolving to the response, or failing with
+            ServiceNotAvailable if the service didn't show up and with
+            AsyncServiceCallFailed if it didn't answer.
+    """
+    result_future = Future()
+    lock = Lock()
+    completed = []
+    wait_deadline = time.monotonic() + wait_timeout
+
+    def _complete(result=None, exception=None):
+        with lock:
+            if completed:
+                return
+            completed.append(True)
+        if exception is not None:
+            result_future.set_exception(exception)
+        else:
+            result_future.set_result(result)
+
+    def _on_response(send_time, future):
+        try:
+            response = future.result()
+            if response is None:
+                raise AsyncServiceCallFailed(hint='no response received')
+        except Exception as e:
+            _complete(exception=e)
+            return
+        if not completed and on_success is not None:
+            on_success(time.monotonic() - send_time)
+        _complete(result=response)
+
+    def _on_timeout(future):
+        if future.done():
+            return
+        # It is possible that a node has the parameter services but is
+        # not spinning. In that is the case, the client call will time out.
+        _complete(exception=AsyncServiceCallFailed(
+            hint='the target node may not be spinning'))
+        remove_pending_request = getattr(client, 'remove_pending_request', None)
+        if remove_pending_request is not None:
+            remove_pending_request(future)
+        if on_timeout is not None:
+            on_timeout()
+
+    def _send():
+        if completed:
+            return
+        if not client.service_is_ready():
+            if time.monotonic() >= wait_deadline:
+                _complete(exception=ServiceNotAvailable())
+            else:
+                _call_later(_SERVICE_POLL_PERIOD, _send)
+            return
+        send_time = time.monotonic()
+        try:
+            future = client.call_async(request)
+        except Exception as e:
+            _complete(exception=AsyncServiceCallFailed(hint=str(e)))
+            return
+        future.add_done_callback(lambda f: _on_response(send_time, f))
+        _call_later(timeout, lambda: _on_timeout(future))
+
+    _send()
+    return result_future
+
+
+class ParameterEventDispatcher(object):
+    """
+    Share a single /parameter_events subscription between all clients.
+
+    Events are routed by the name of the node that sent them. Messages are
+    only converted to Parameter objects for nodes somebody listens to.
+
+    With content filtering enabled, a subscription filtered on the ``node``
+    field is created per remote node instead, so the middleware drops the
+    events of all other nodes. If the RMW implementation doesn't support
+    content filtering the shared subscription is used as a fallback.
+    """
+
+    def __init__(self, node, content_filter=False):
+        self._node = node
+        self._content_filter = content_filter
+        self._lock = Lock()
+        # { remote node name : [callback, ...] }
+        self._callbacks = {}
+        self._subscription = None
+        # { remote node name : content filtered subscription }
+        self._filtered_subscriptions = {}
+        self._sender_callbacks = []
+        self._event_callbacks = []
+        self._statistics = {
+            # Events that reached Python, through any subscription.
+            'received': 0,
+            # Events handed to at least one callback.
+            'dispatched': 0,
+            # Events discarded by the node name check in Python.
+            'dropped_in_python': 0,
+        }
+
+    def set_content_filter(self, enabled):
+        """
+        Enable or disable content filtered subscriptions.
+
+        Only affects nodes registered after the call.
+        """
+        self._content_filter = enabled
+
+    def get_statistics(self):
+        """
+        Get counters showing at which layer events were filtered.
+
+        Events dropped by the middleware never reach Python and can't be
+        counted; ``content_filtered_nodes`` tells for how many nodes that
+        happens, ``fallback_nodes`` how many rely on the Python-side check.
+
+        :rtype: dict
+        """
+        with self._lock:
+            statistics = dict(self._statistics)
+            statistics['content_filtered_nodes'] = len(self._filtered_subscriptions)
+            statistics['fallback_nodes'] = \
+                len(self._callbacks) - len(self._filtered_subscriptions)
+        return statistics
+
+    def add_callback(self, remote_node_name, callback):
+        """
+        Register a callback for the events of the given node.
+
+        :param callback: called with the lists of new, changed and deleted
+                         parameters, on the executor thread.
+        """
+        with self._lock:
+            is_new_node = remote_node_name not in self._callbacks
+            self._callbacks.setdefault(remote_node_name, []).append(callback)
+            if not is_new_node:
+                return
+            if self._content_filter:
+                self._create_filtered_subscription(remote_node_name)
+            self._update_shared_subscription()
+
+    def remove_callback(self, remote_node_name, callback):
+        with self._lock:
+            callbacks = self._callbacks.get(remote_node_name, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._callbacks.pop(remote_node_name, None)
+                subscription = self._filtered_subscriptions.pop(remote_node_name, None)
+                if subscription is not None:
+                    self._node.destroy_subscription(subscription)
+                    _count_entity('subscriptions', -1)
+            self._update_shared_subscription()
+
+    def is_content_filter_enabled(self):
+        return self._content_filter
+
+    def add_sender_callback(self, callback):
+        """
+        Register a callback for the names of all nodes sending events.
+
+        This keeps the shared subscription alive, so the middleware can't
+        filter events anymore.
+
+        :param callback: called with the node name of every event received
+                         on the shared subscription, on the executor thread.
+        """
+        with self._lock:
+            self._sender_callbacks.append(callback)
+            self._update_shared_subscription()
+
+    def remove_sender_callback(self, callback):
+        with self._lock:
+            if callback in self._sender_callbacks:
+                self._sender_callbacks.remove(callback)
+            self._update_shared_subscription()
+
+    def add_event_callback(self, callback):
+        """
+        Register a callback for the events of all nodes.
+
+        Like add_sender_callback, this keeps the shared subscription alive.
+
+        :param callback: called with every ParameterEvent message received on
+                         the shared subscription, unconverted, on the executor
+                         thread.
+        """
+        with self._lock:
+            self._event_callbacks.append(callback)
+            self._update_shared_subscription()
+
+    def remove_event_callback(self, callback):
+        with self._lock:
+            if callback in self._event_callbacks:
+                self._event_callbacks.remove(callback)
+            self._update_shared_subscription()
+
+    def _update_shared_subscription(self):
+        # Called with _lock held. The shared subscription is needed for nodes
+        # without a content filtered one and to report senders and events.
+        needed = len(self._callbacks) > len(self._filtered_subscriptions) or \
+            bool(self._sender_callbacks) or bool(self._event_callbacks)
+        if needed and self._subscription is None:
+            self._subscription = self._node.create_subscription(
+                ParameterEvent, '/parameter_events',
+                self._on_parameter_event, qos_profile_parameter_events
+            )
+            _count_entity('subscriptions', 1)
+        elif not needed and self._subscription is not None:
+            self._node.destroy_subscription(self._subscription)
+            _count_entity('subscriptions', -1)
+            self._subscription = None
+
+    def _create_filtered_subscription(self, remote_node_name):
+        if ContentFilterOptions is None:
+            return False
+        try:
+            subscription = self._node.create_subscription(
+                ParameterEvent, '/parameter_events',
+                self._on_filtered_parameter_event, qos_profile_parameter_events,
+                content_filter_options=ContentFilterOptions(
+                    filter_expression='node = %0',
+                    expression_parameters=["'{}'".format(remote_node_name)])
+            )
+        except Exception as e:
+            logging.debug('Content filtering is not available: {}'.format(e))
+            return False
+        if not subscription.is_cftopic_enabled():
+            self._node.destroy_subscription(subscription)
+            return False
+        _count_entity('subscriptions', 1)
+        self._filtered_subscriptions[remote_node_name] = subscription
+        return True
+
+    def _on_parameter_event(self, event):
+        self._statistics['received'] += 1
+        for callback in list(self._sender_callbacks):
+            callback(event.node)
+        for callback in list(self._event_callbacks):
+            callback(event)
+        # Nodes with a content filtered subscription get their events there.
+        if event.node in self._filtered_subscriptions:
+            self._statistics['dropped_in_python'] += 1
+            return
+        self._dispatch(event)
+
+    def _on_filtered_parameter_event(self, event):
+        self._statistics['received'] += 1
+        self._dispatch(event)
+
+    def _dispatch(self, event):
+        callbacks = self._callbacks.get(event.node)
+        if not callbacks:
+            self._statistics['dropped_in_python'] += 1
+            return
+        self._statistics['dispatched'] += 1
+        new_parameters = [Parameter.from_parameter_msg(p) for p in event.new_parameters]
+        changed_parameters = [
+            Parameter.from_parameter_msg(p) for p in event.changed_parameters]
+        deleted_parameters = [
+            Parameter.from_parameter_msg(p) for p in event.deleted_parameters]
+        for callback in list(callbacks):
+            callback(new_parameters, changed_parameters, deleted_parameters)
+
+
+# { rclpy node : ParameterEventDispatcher }
+_parameter_event_dispatchers = {}
+_parameter_event_dispatchers_lock = Lock()
+
+
+def get_parameter_event_dispatcher(node):
+    """Get the dispatcher owning the /parameter_events subscription of a node."""
+    with _parameter_event_dispatchers_lock:
+        dispatcher = _parameter_event_dispatchers.get(node)
+        if dispatcher is None:
+            dispatcher = ParameterEventDispatcher(node)
+            _parameter_event_dispatchers[node] = dispatcher
+        return dispatcher
+
+
+_SERVICE_TYPES = {
+    'describe_parameters': DescribeParameters,
+    'get_parameters': GetParameters,
+    'list_parameters': ListParameters,
+    'set_parameters': SetParameters,
+    'set_parameters_atomically': SetParametersAtomically,
+}
+
+
+class _ServiceClientEntry(object):
+
+    def __init__(self, client):
+        self.client = client
+        # Number of calls waiting for a response.
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+
+class _ParameterWriteQueue(object):
+    """
+    Coalesce writes to the parameters of one remote node.
+
+    While a SetParameters request is in flight, newer values replace older
+    pending ones per parameter name, and pending changes to different
+    parameters are merged into the next request. At most one request per
+    node is in flight at any time.
+    """
+
+    def __init__(self, param_client):
+        self._param_client = param_client
+        self._lock = Lock()
+        # { name : Parameter }
+        self._pending = {}
+        # Resolved once the request carrying the pending values is answered.
+        self._pending_future = None
+        self._in_flight = False
+
+    def enqueue(self, parameters):
+        """
+        Queue the parameters to be set.
+
+        :rtype: rclpy.task.Future resolving to a dict mapping the names of
+                the parameters of the request to their SetParametersResult
+        """
+        with self._lock:
+            for parameter in parameters:
+                self._pending[parameter.name] = parameter
+            if self._pending_future is None:
+                self._pending_future = Future()
+            future = self._pending_future
+            if self._in_flight:
+                return future
+            self._in_flight = True
+        self._send_pending()
+        return future
+
+    def _send_pending(self):
+        with self._lock:
+            if not self._pending:
+                self._in_flight = False
+                return
+            parameters = list(self._pending.values())
+            batch_future = self._pending_future
+            self._pending = {}
+            self._pending_future = None
+        self._param_client.set_parameters_async(parameters).add_done_callback(
+            lambda future: self._handle_response(parameters, batch_future, future))
+
+    def _handle_response(self, parameters, batch_future, future):
+        try:
+            response = future.result()
+            batch_future.set_result({
+                parameter.name: result
+                for parameter, result in zip(parameters, response.results)})
+        except Exception as e:
+            batch_future.set_exception(e)
+        self._send_pending()
+
+
 class ParamClient(object):
 
-    def __init__(self, node, remote_node_name, param_change_callback=None):
+    def __init__(self, node, remote_node_name, param_change_callback=None,
+                 client_idle_timeout=DEFAULT_CLIENT_IDLE_TIMEOUT):
+        """
+        Create a client for the parameter services of a remote node.
+
+        Service clients are created on first use and destroyed again once
+        they haven't been used for ``client_idle_timeout`` seconds.
 
+        :param client_idle_timeout: None to never destroy idle clients.
+        """
         self._node = node
         self._remote_node_name = remote_node_name
-        self._get_params_client = self._node.create_client(
-            GetParameters, '{remote_node_name}/get_parameters'.format_map(locals())
-        )
-        self._set_params_client = self._node.create_client(
-            SetParameters, '{remote_node_name}/set_parameters'.format_map(locals())
-        )
-        self._list_params_client = self._node.create_client(
-            ListParameters, '{remote_node_name}/list_parameters'.format_map(locals())
-        )
-        self._describe_params_client = self._node.create_client(
-            DescribeParameters, '{remote_node_name}/describe_parameters'.format_map(locals())
-        )
-        self._param_events_subscription = self._node.create_subscription(
-            ParameterEvent, '/parameter_events', self._on_parameter_event,
-            qos_profile_parameter_events
-        )
-        self._param_change_callback = param_change_callback
+        self._client_idle_timeout = client_idle_timeout
+        self._closed = False
+        self._service_clients_lock = Lock()
+        # { service name : _ServiceClientEntry }
+        self._service_clients = {}
+        self._eviction_scheduled = False
+        self._health = get_node_health(remote_node_name)
+        self._health_state = self._health.get_state()
+        self._probe_scheduled = False
+        self._param_change_callbacks = []
+        if param_change_callback is not None:
+            self._param_change_callbacks.append(param_change_callback)
+        self._parameter_store = ParameterStore(self)
+        self._write_queue = _ParameterWriteQueue(self)
+        get_parameter_event_dispatcher(self._node).add_callback(
+            self._remote_node_name, self._on_parameter_event)
+        get_node_health_registry().add_listener(self._on_node_health_changed)
 
-    def _on_parameter_event(self, event):
-        if event.node != self._remote_node_name:
+    def _on_node_health_changed(self, node_name, state):
+        # Called from whichever thread observed the change.
+        if node_name != self._remote_node_name:
             return
-        if self._param_change_callback is not None:
-            self._param_change_callback(
-                [Parameter.from_parameter_msg(p) for p in event.new_parameters],
-                [Parameter.from_parameter_msg(p) for p in event.changed_parameters],
-                [Parameter.from_parameter_msg(p) for p in event.deleted_parameters]
-            )
+        previous_state = self._health_state
+        self._health_state = state
+        if (previous_state == NodeHealth.UNRESPONSIVE and
+                state == NodeHealth.HEALTHY and
+                self._parameter_store.is_synced()):
+            # Parameter events may have been missed meanwhile.
+            self._parameter_store.resync_async()
 
-    def list_parameters(self):
+    def _on_parameter_event(self, new_parameters, changed_parameters, deleted_parameters):
+        self._parameter_store.apply_event(
+            new_parameters, changed_parameters, deleted_parameters)
+        for callback in list(self._param_change_callbacks):
+            callback(new_parameters, changed_parameters, deleted_parameters)
+
+    def get_remote_node_name(self):
+        return self._remote_node_name
+
+    def add_param_change_callback(self, callback):
+        self._param_change_callbacks.append(callback)
+
+    def remove_param_change_callback(self, callback):
+        if callback in self._param_change_callbacks:
+            self._param_change_callbacks.remove(callback)
+
+    def get_parameter_store(self):
+        """
+        Get the local copy of the parameters of the remote node.
+
+        :rtype: rqt_reconfigure.param_store.ParameterStore
+        """
+        return self._parameter_store
+
+    def list_parameters_async(self):
+        """
+        List the parameter names of the remote node.
+
+        :rtype: rclpy.task.Future resolving to a list of str
+        """
         list_params_request = ListParameters.Request()
-        list_params_response = self._call_service(self._list_params_client, list_params_request)
-        return list_params_response.result.names
+        return self._call_service_async(
+            'list_parameters', list_params_request,
+            lambda response: response.result.names)
 
-    def get_parameters(self, names):
+    def get_parameters_async(self, names):
+        """
+        Get the values of the given parameters.
+
+        :rtype: rclpy.task.Future resolving to a list of Parameter
+        """
+        names = list(names)
         get_params_request = GetParameters.Request()
         get_params_request.names = names
-        get_params_response = self._call_service(self._get_params_client, get_params_request)
-        return [
-            Parameter.from_parameter_msg(ParameterMsg(name=name, value=value))
-            for name, value in zip(names, get_params_response.values)
-        ]
+        return self._call_service_async(
+            'get_parameters', get_params_request,
+            lambda response: [
+                Parameter.from_parameter_msg(ParameterMsg(name=name, value=value))
+                for name, value in zip(names, response.values)
+            ], num_items=len(names))
 
-    def describe_parameters(self, names):
+    def describe_parameters_async(self, names):
+        """
+        Get the descriptors of the given parameters.
+
+        Large sets of names are split into a few bounded requests.
+
+        :rtype: rclpy.task.Future resolving to a list of ParameterDescriptor
+        """
+        names = list(names)
+        chunk_size = _MAX_NAMES_PER_DESCRIBE_REQUEST
+        if len(names) <= chunk_size:
+            return self._describe_parameters_chunk_async(names)
+        result_future = Future()
+        _chain_future(
+            _gather_futures([
+                self._describe_parameters_chunk_async(names[i:i + chunk_size])
+                for i in range(0, len(names), chunk_size)
+            ]),
+            result_future,
+            lambda chunks: [d for chunk in chunks for d in chunk])
+        return result_future
+
+    def _describe_parameters_chunk_async(self, names):
         describe_params_request = DescribeParameters.Request()
         describe_params_request.names = names
-        describe_params_response = self._call_service(self._describe_params_client,
-                                                      describe_params_request)
-        return describe_params_response.descriptors
+        return self._call_service_async(
+            'describe_parameters', describe_params_request,
+            lambda response: response.descriptors, num_items=len(names))
 
-    def set_parameters(self, parameters):
+    def set_parameters_async(self, parameters):
+        """
+        Set the given parameters on the remote node.
+
+        :rtype: rclpy.task.Future resolving to a SetParameters.Response
+        """
         set_params_request = SetParameters.Request()
         set_params_request.parameters = [p.to_parameter_msg() for p in parameters]
-        return self._call_service(self._set_params_client, set_params_request)
+        return self._call_service_async(
+            'set_parameters', set_params_request,
+            num_items=len(set_params_request.parameters))
+
+    def set_parameters_atomically_async(self, parameters, timeout=None,
+                                        wait_timeout=None):
+        """
+        Set the given parameters on the remote node, all or none of them.
+
+        :param wait_timeout: seconds to wait for the service to show up, None
+                             to wait as long as for the response.
+        :rtype: rclpy.task.Future resolving to a SetParametersResult
+        """
+        set_params_request = SetParametersAtomically.Request()
+        set_params_request.parameters = [p.to_parameter_msg() for p in parameters]
+        return self._call_service_async(
+            'set_parameters_atomically', set_params_request,
+            lambda response: response.result, timeout=timeout,
+            wait_timeout=wait_timeout,
+            num_items=len(set_params_request.parameters))
+
+    def load_parameters_async(self, parameters,
+                              chunk_size=_MAX_PARAMETERS_PER_LOAD_REQUEST):
+        """
+        Set a large number of parameters, e.g. loaded from a file.
+
+        Parameters are sent in chunks of at most ``chunk_size`` through
+        SetParametersAtomically, one chunk after the other. Loading stops at
+        the first chunk the node rejects, so a set that fits in one chunk is
+        applied all-or-nothing. If the node doesn't offer the atomic service,
+        the chunks are sent in parallel through SetParameters instead.
+
+        :rtype: rclpy.task.Future resolving to a dict mapping the names of
+                the parameters that were sent to their SetParametersResult.
+                All parameters of an atomically sent chunk share the same
+                result. Parameters of chunks after a rejected one are
+                missing.
+        """
+        parameters = list(parameters)
+        chunks = [parameters[i:i + chunk_size]
+                  for i in range(0, len(parameters), chunk_size)]
+        result_future = Future()
+        results = {}
+
+        def _send_atomically(index):
+            if index == len(chunks):
+                result_future.set_result(results)
+                return
+            self.set_parameters_atomically_async(
+                chunks[index], timeout=_LOAD_TIMEOUT,
+                wait_timeout=_LOAD_ATOMIC_WAIT_TIMEOUT).add_done_callback(
+                    lambda future: _handle_atomic_result(index, future))
+
+        def _handle_atomic_result(index, future):
+            try:
+                result = future.result()
+            except ServiceNotAvailable as e:
+                if index == 0:
+                    logging.debug('Falling back to non-atomic loading: {}'.format(e))
+                    _send_in_parallel()
+                else:
+                    result_future.set_exception(e)
+                return
+            except Exception as e:
+                result_future.set_exception(e)
+                return
+            for parameter in chunks[index]:
+                results[parameter.name] = result
+            if not result.successful:
+                result_future.set_result(results)
+                return
+            _send_atomically(index + 1)
+
+        def _send_in_parallel():
+            _chain_future(
+                _gather_futures([
+                    self._call_service_async(
+                        'set_parameters',
+                        SetParameters.Request(
+                            parameters=[p.to_parameter_msg() for p in chunk]),
+                        timeout=_LOAD_TIMEOUT, num_items=len(chunk))
+                    for chunk in chunks
+                ]),
+                result_future,
+                lambda responses: {
+                    parameter.name: result
+                    for chunk, response in zip(chunks, responses)
+                    for parameter, result in zip(chunk, response.results)})
+
+        _send_atomically(0)
+        return result_future
+
+    def get_all_parameters_async(self):
+        """
+        List the parameters of the remote node and get all of their values.
+
+        :rtype: rclpy.task.Future resolving to a list of Parameter
+        """
+        result_future = Future()
+
+        def _on_names(future):
+            try:
+                names = future.result()
+            except Exception as e:
+                result_future.set_exception(e)
+                return
+            _chain_future(self.get_parameters_async(names), result_future)
+
+        self.list_parameters_async().add_done_callback(_on_names)
+        return result_future
+
+    def queue_set_parameters(self, parameters):
+        """
+        Set parameters, keeping only the newest value while a write is pending.
+
+        Prefer this over set_parameters_async for interactive edits.
+
+        :rtype: rclpy.task.Future resolving to a dict mapping parameter names
+                to their SetParametersResult
+        """
+        return self._write_queue.enqueue(parameters)
+
+    def list_parameters(self):
+        return self._wait_for_future(self.list_parameters_async())
+
+    def get_parameters(self, names):
+        return self._wait_for_future(self.get_parameters_async(names))
+
+    def describe_parameters(self, names):
+        return self._wait_for_future(self.describe_parameters_async(names))
+
+    def set_parameters(self, parameters):
+        return self._wait_for_future(self.set_parameters_async(parameters))
 
     def close(self):
-        self._node.destroy_subscription(self._param_events_subscription)
-        self._node.destroy_client(self._describe_params_client)
-        self._node.destroy_client(self._list_params_client)
-        self._node.destroy_client(self._set_params_client)
-        self._node.destroy_client(self._get_params_client)
+        get_parameter_event_dispatcher(self._node).remove_callback(
+            self._remote_node_name, self._on_parameter_event)
+        get_node_health_registry().remove_listener(self._on_node_health_changed)
+        with self._service_clients_lock:
+            self._closed = True
+            entries = list(self._service_clients.values())
+            self._service_clients.clear()
+        for entry in entries:
+            self._destroy_service_client(entry)
 
-    def _call_service(self, client, request, timeout=1.0):
-        if not client.service_is_ready():
-            if not client.wait_for_service(timeout):
-                raise AsyncServiceCallFailed(hint='timed out waiting for service')
+    def _acquire_service_client(self, service_name):
+        with self._service_clients_lock:
+            if self._closed:
+                return None
+            entry = self._service_clients.get(service_name)
+            if entry is None:
+                client = self._node.create_client(
+                    _SERVICE_TYPES[service_name],
+                    '{}/{}'.format(self._remote_node_name, service_name))
+                _count_entity('clients', 1)
+                entry = _ServiceClientEntry(client)
+                self._service_clients[service_name] = entry
+                self._schedule_eviction()
+            entry.in_flight += 1
+            entry.last_used = time.monotonic()
+            return entry
+
+    def _release_service_client(self, entry):
+        with self._service_clients_lock:
+            entry.in_flight -= 1
+            entry.last_used = time.monotonic()
+
+    def _destroy_service_client(self, entry):
+        self._node.destroy_client(entry.client)
+        _count_entity('clients', -1)
+
+    def _schedule_eviction(self):
+        # Called with _service_clients_lock held.
+        if self._client_idle_timeout is None or self._eviction_scheduled:
+            return
+        self._eviction_scheduled = True
+        _call_later(self._client_idle_timeout / 2, self._evict_idle_service_clients)
+
+    def _evict_idle_service_clients(self):
+        now = time.monotonic()
+        evicted = []
+        with self._service_clients_lock:
+            self._eviction_scheduled = False
+            if self._closed:
+                return
+            for service_name, entry in list(self._service_clients.items()):
+                if entry.in_flight == 0 and \
+                        now - entry.last_used >= self._client_idle_timeout:
+                    evicted.append(self._service_clients.pop(service_name))
+            if self._service_clients:
+                self._schedule_eviction()
+        for entry in evicted:
+            self._destroy_service_client(entry)
+
+    def _call_service_async(self, service_name, request, transform=None, timeout=None,
+                            bypass_circuit_breaker=False, wait_timeout=None,
+                            num_items=1):
+        """
+        Call a service without blocking the calling thread.
 
-        # It is possible that a node has the parameter services but is not
-        # spinning. In that is the case, the client call will time out.
+        The returned future is resolved with the (optionally transformed)
+        response, or with AsyncServiceCallFailed if the service didn't show
+        up or didn't answer within ``timeout`` seconds.
+
+        :param timeout: None to derive it from the observed latency of the
+                        node.
+        :param bypass_circuit_breaker: send the request even if the node is
+                                       considered unresponsive.
+        :param wait_timeout: seconds to wait for the service to show up, None
+                             to wait as long as for the response.
+        :param num_items: number of parameters the request is about. Bulk
+                          requests get a longer timeout, and don't count for
+                          the health of the node if they time out.
+        """
+        result_future = Future()
+        if not bypass_circuit_breaker and not self._health.allow_request():
+            self._schedule_probe()
+            result_future.set_exception(AsyncServiceCallFailed(
+                hint='the target node is not responding, retrying in background'))
+            return result_future
+        entry = self._acquire_service_client(service_name)
+        if entry is None:
+            result_future.set_exception(AsyncServiceCallFailed(hint='client closed'))
+            return result_future
+        result_future.add_done_callback(lambda _: self._release_service_client(entry))
+        if timeout is None:
+            timeout = self._health.get_timeout(num_items)
+        bulk = is_bulk_request(num_items)
+
+        def _on_success(rtt):
+            self._health.record_success(None if bulk else rtt)
+
+        def _on_timeout():
+            if bulk:
+                return
+            self._health.record_failure()
+            if not self._health.allow_request():
+                self._schedule_probe()
+
+        _chain_future(
+            _call_service_with_deadlines(
+                entry.client, request, timeout,
+                wait_timeout if wait_timeout is not None else timeout,
+                _on_success, _on_timeout),
+            result_future, transform)
+        return result_future
+
+    def _schedule_probe(self):
+        with self._service_clients_lock:
+            if self._probe_scheduled or self._closed:
+                return
+            self._probe_scheduled = True
+        _call_later(self._health.next_probe_delay(), self._probe)
+
+    def _probe(self):
+        # Check in the background whether an unresponsive node answers again.
+        with self._service_clients_lock:
+            self._probe_scheduled = False
+            if self._closed or self._health.allow_request():
+                return
+
+        def _on_probe_done(future):
+            if future.exception() is not None and not self._health.allow_request():
+                self._schedule_probe()
+
+        self._call_service_async(
+            'list_parameters', ListParameters.Request(), timeout=MAX_TIMEOUT,
+            bypass_circuit_breaker=True).add_done_callback(_on_probe_done)
+
+    def get_health(self):
+        """
+        Get the health of the remote node as seen by this client.
+
+        :rtype: rqt_reconfigure.node_health.NodeHealth
+        """
+        return self._health
+
+    def _wait_for_future(self, future):
+        # Thin blocking wrapper around the asynchronous API. The future is
+        # always resolved by _call_service_async, either with the response
+        # or with a timeout error.
         event = Event()
-        future = client.call_async(request)
         future.add_done_callback(lambda _: event.set())
+        event.wait()
+        return future.result()
 
-        event.wait(timeout)
 
-        result = future.result()
-        if result is None:
-            raise AsyncServiceCallFailed(hint='the target node may not be spinning')
+class _PooledParamClient(object):
+    """
+    Handle on a ParamClient shared through ParamClientPool.
 
-        return future.result()
+    Behaves like the shared client, except that closing it only removes the
+    change callback of this user and releases its reference.
+    """
+
+    def __init__(self, pool, param_client, param_change_callback):
+        self._pool = pool
+        self._param_client = param_client
+        self._param_change_callback = param_change_callback
+        self._released = False
+        if param_change_callback is not None:
+            param_client.add_param_change_callback(param_change_callback)
+
+    def __getattr__(self, name):
+        return getattr(self._param_client, name)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        if self._param_change_callback is not None:
+            self._param_client.remove_param_change_callback(self._param_change_callback)
+        self._pool.release(self._param_client)
+
+
+class ParamClientPool(object):
+    """
+    Hand out one ParamClient per remote node to all of its users.
+
+    Clients are reference counted. Once the last user released a client it
+    is kept for ``release_delay`` seconds, so a node that is reopened right
+    away neither rebuilds its clients nor waits for service discovery and
+    its parameter store again, and closed afterwards. close_clients closes
+    the clients of an rclpy node at once, e.g. before the node goes away.
+    """
+
+    def __init__(self, release_delay=DEFAULT_CLIENT_IDLE_TIMEOUT):
+        self._release_delay = release_delay
+        self._lock = Lock()
+        # { (rclpy node, remote node name) : [ParamClient, reference count] }
+        self._clients = {}
+        # { ParamClient : (rclpy node, remote node name) }
+        self._keys = {}
+        # { ParamClient : handle of its delayed close, see _call_later }
+        self._pending_closes = {}
+
+    def acquire(self, node, remote_node_name, param_change_callback=None):
+        """
+        Get a handle on the shared client for the given remote node.
+
+        :rtype: ParamClient-like handle, to be closed when no longer used.
+        """
+        key = (node, remote_node_name)
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = [ParamClient(node, remote_node_name), 0]
+                self._clients[key] = entry
+                self._keys[entry[0]] = key
+            entry[1] += 1
+            param_client = entry[0]
+            pending_close = self._pending_closes.pop(param_client, None)
+        if pending_close is not None:
+            _cancel_call_later(pending_close)
+        return _PooledParamClient(self, param_client, param_change_callback)
+
+    def release(self, param_client):
+        with self._lock:
+            entry = self._get_entry(param_client)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            if self._release_delay:
+                self._pending_closes[param_client] = _call_later(
+                    self._release_delay,
+                    lambda: self._close_if_unused(param_client))
+                return
+        self._close_if_unused(param_client)
+
+    def close_clients(self, node):
+        """
+        Close all clients of the given rclpy node, whether in use or not.
+
+        Delayed closes of released clients are cancelled.
+        """
+        with self._lock:
+            param_clients = [
+                entry[0] for key, entry in self._clients.items()
+                if key[0] is node]
+            pending_closes = []
+            for param_client in param_clients:
+                del self._clients[self._keys.pop(param_client)]
+                pending_close = self._pending_closes.pop(param_client, None)
+                if pending_close is not None:
+                    pending_closes.append(pending_close)
+        for pending_close in pending_closes:
+            _cancel_call_later(pending_close)
+        for param_client in param_clients:
+            param_client.close()
+
+    def get_client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def invalidate_parameter_store(self, node, remote_node_name):
+        """
+        Drop the cached parameters of a remote node, e.g. once it restarted.
+
+        Nothing happens if there is no client for the node.
+        """
+        with self._lock:
+            entry = self._clients.get((node, remote_node_name))
+        if entry is not None:
+            entry[0].get_parameter_store().invalidate()
+
+    def _get_entry(self, param_client):
+        # Called with _lock held.
+        key = self._keys.get(param_client)
+        return self._clients.get(key) if key is not None else None
+
+    def _close_if_unused(self, param_client):
+        with self._lock:
+            entry = self._get_entry(param_client)
+            if entry is None or entry[1] > 0:
+                return
+            self._pending_closes.pop(param_client, None)
+            del self._clients[self._keys.pop(param_client)]
+        param_client.close()
+
+
+_param_client_pool = ParamClientPool()
 
 
 def create_param_client(node, remote_node_name, param_change_callback=None):
-    return ParamClient(node, remote_node_name, param_change_callback)
+    """
+    Get a client for the parameters of a remote node.
 
+    Clients are shared between all users of the same remote node. Closing
+    the returned client releases it.
+    """
+    return _param_client_pool.acquire(node, remote_node_name, param_change_callback)
 
-def _has_parameters(node, node_name, node_namespace):
-    # Get all of the services provided by a node (node_name)
-    for service_name, service_types in node.get_service_names_and_types_by_node(
-            node_name, node_namespace):
 
-        # Make sure the node supports the ListParameters service
-        if 'rcl_interfaces/srv/ListParameters' in service_types:
-            return True
-    return False
+def close_param_clients(node):
+    """Close all clients created for the given rclpy node, see ParamClientPool."""
+    _param_client_pool.close_clients(node)
+
+
+def invalidate_parameter_store(node, remote_node_name):
+    """Drop the cached parameters of a remote node, see ParamClientPool."""
+    _param_client_pool.invalidate_parameter_store(node, remote_node_name)
 
 
-def find_nodes_with_params(node):
-    names_and_namespaces = node.get_node_names_and_namespaces()
+def list_parameter_names_async(node, remote_node_name,
+                               timeout=DISCOVERY_PROBE_TIMEOUT,
+                               wait_timeout=MAX_TIMEOUT):
+    """
+    List the parameter names of a remote node through a throwaway client.
+
+    Unlike a ParamClient, nothing is kept for the node: no parameter event
+    callback, no parameter store, and the service client is destroyed as
+    soon as the call is over. Meant for nodes that were just discovered, so
+    the outcome is recorded in the health of the node. A node that doesn't
+    answer within ``timeout`` is considered unresponsive right away, the
+    service itself may take up to ``wait_timeout`` to show up.
+
+    :rtype: rclpy.task.Future resolving to a list of str
+    """
+    result_future = Future()
+    health = get_node_health(remote_node_name)
+    client = node.create_client(
+        ListParameters, '{}/list_parameters'.format(remote_node_name))
+    _count_entity('clients', 1)
+
+    def _on_done(future):
+        node.destroy_client(client)
+        _count_entity('clients', -1)
+        if future.exception() is not None:
+            health.mark_unresponsive()
+
+    call_future = _call_service_with_deadlines(
+        client, ListParameters.Request(), timeout, wait_timeout,
+        on_success=health.record_success)
+    call_future.add_done_callback(_on_done)
+    _chain_future(call_future, result_future,
+                  lambda response: response.result.names)
+    return result_future
+
+
+def match_node_name(node_name, namespaces=None, excludes=None):
+    """
+    Tell whether a node passes the namespace and exclusion patterns.
+
+    :param node_name: fully qualified node name
+    :param namespaces: glob patterns, the node has to be in one of these
+                       namespaces or below. Any namespace if None or empty.
+    :param excludes: glob patterns of nodes to leave out, matched against
+                     both the fully qualified and the bare node name.
+    """
+    if namespaces:
+        for namespace in namespaces:
+            namespace = '/' + namespace.strip('/')
+            if fnmatchcase(node_name, namespace.rstrip('/') + '/*'):
+                break
+        else:
+            return False
+    if excludes:
+        bare_name = node_name[node_name.rfind('/') + 1:]
+        for pattern in excludes:
+            if fnmatchcase(node_name, pattern) or \
+                    fnmatchcase(bare_name, pattern):
+                return False
+    return True
+
+
+def find_nodes_with_params(node, namespaces=None, excludes=None):
+    """
+    Find the nodes that provide the parameter services.
+
+    Takes a single snapshot of the services in the graph and picks the nodes
+    that offer ListParameters, instead of querying the graph per node.
+
+    Service names are also reported for mere clients, including those kept
+    by this tool to nodes that are gone, so only the names of nodes that
+    are alive are kept.
+
+    :param namespaces: see match_node_name
+    :param excludes: see match_node_name
+    :rtype: list of str, the fully qualified node names
+    """
+    live_nodes = set(
+        namespace.rstrip('/') + '/' + name
+        for name, namespace in node.get_node_names_and_namespaces())
     node_list = []
-    for node_name, node_namespace in names_and_namespaces:
-        if _has_parameters(node, node_name, node_namespace):
-            full_name = node_namespace.rstrip('/') + '/' + node_name
-            node_list.append(full_name)
+    suffix = '/list_parameters'
+    for service_name, service_types in node.get_service_names_and_types():
+        # Make sure the node supports the ListParameters service
+        if service_name.endswith(suffix) and \
+                'rcl_interfaces/srv/ListParameters' in service_types:
+            node_name = service_name[:-len(suffix)]
+            if node_name in live_nodes and \
+                    match_node_name(node_name, namespaces, excludes):
+                node_list.append(node_name)
     return node_list
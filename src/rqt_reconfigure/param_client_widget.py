@@ -28,6 +28,9 @@
 #
 # Author: Gonzalo de Pedro
 
+from collections import OrderedDict
+from functools import partial
+
 from python_qt_binding.QtCore import QMargins, QSize, Qt, Signal
 from python_qt_binding.QtGui import QFont, QIcon
 from python_qt_binding.QtWidgets import (QFileDialog, QHBoxLayout, QLabel,
@@ -35,6 +38,7 @@ from python_qt_binding.QtWidgets import (QFileDialog, QHBoxLayout, QLabel,
 
 from rclpy.parameter import Parameter
 from rqt_reconfigure import logging
+from rqt_reconfigure.gui_thread import add_gui_done_callback, call_in_gui_thread
 from rqt_reconfigure.param_api import create_param_client
 
 """
@@ -45,7 +49,8 @@ from rqt_reconfigure.param_editors import (BooleanEditor,  # noqa: F401
                                            DoubleEditor, EDITOR_TYPES,
                                            EditorWidget, IntegerEditor,
                                            StringEditor, EnumEditor)
-from rqt_reconfigure.text_filter import TextFilter
+from rqt_reconfigure.param_table import ParameterTableView
+from rqt_reconfigure.text_filter import fuzzy_match, TextFilter
 from rqt_reconfigure.text_filter_widget import TextFilterWidget
 from rqt_reconfigure.param_groups import GroupWidget
 
@@ -57,6 +62,10 @@ class ParamClientWidget(GroupWidget):
 
     sig_node_disabled_selected = Signal(str)
 
+    # Nodes with more parameters open in the table view, unless the view
+    # was picked by hand.
+    _TABLE_VIEW_THRESHOLD = 200
+
     def __init__(self, context, node_name):
         """
         Initializaze things.
@@ -65,7 +74,7 @@ class ParamClientWidget(GroupWidget):
         """
         super(ParamClientWidget, self).__init__(
             create_param_client(context.node, node_name,
-                                self._handle_param_event), node_name)
+                                self._on_param_event), node_name)
 
         self._node_grn = node_name
         self._toplevel_treenode_name = node_name
@@ -87,6 +96,14 @@ class ParamClientWidget(GroupWidget):
         save_button.clicked[bool].connect(self._handle_save_clicked)
         save_button.setFixedSize(QSize(36, 24))
         h_layout_nodeheader.addWidget(save_button)
+        self._table_view_button = QPushButton()
+        self._table_view_button.setIcon(QIcon.fromTheme('view-list-details'))
+        self._table_view_button.setToolTip('Show parameters in a table')
+        self._table_view_button.setCheckable(True)
+        self._table_view_button.toggled[bool].connect(
+            self._handle_table_view_toggled)
+        self._table_view_button.setFixedSize(QSize(36, 24))
+        h_layout_nodeheader.addWidget(self._table_view_button)
 
         nodename_qlabel = QLabel(self)
         font = QFont('Trebuchet MS, Bold')
@@ -121,12 +138,16 @@ class ParamClientWidget(GroupWidget):
         self.insert_widget_on_top(widget_nodeheader)
 
         # Again, these UI operation above needs to happen in .ui file.
-        try:
-            self.add_editor_widgets(self._param_client.get_parameters(
-                                        self._param_client.list_parameters()))
-        except Exception as e:
-            logging.warn(
-              f'Failed to retrieve parameters from node {self._node_grn}: {e}')
+        self._closed = False
+        # Incremented whenever the set of shown editors is rebuilt, so that
+        # replies to outdated requests can be discarded.
+        self._editors_generation = 0
+        # Set in table view mode, where it replaces the editor widgets.
+        self._table_view = None
+        self._table_view_picked = False
+        add_gui_done_callback(
+            self.get_parameters_async(),
+            partial(self._handle_parameters_received, self._editors_generation))
 
         self._text_filter.filter_changed_signal.connect(
             self._filter_key_changed)
@@ -137,7 +158,15 @@ class ParamClientWidget(GroupWidget):
         return self._node_grn
 
     def get_treenode_names(self):
-        return self._param_client.list_parameters()
+        return self._param_client.get_parameter_store().list_parameters()
+
+    def get_parameters_async(self):
+        """
+        Get all parameters of the node, from the local store once synced.
+
+        :rtype: rclpy.task.Future resolving to a list of Parameter
+        """
+        return self._param_client.get_parameter_store().get_all_parameters_async()
 
     def _handle_load_clicked(self):
         filename = QFileDialog.getOpenFileName(
@@ -148,16 +177,44 @@ class ParamClientWidget(GroupWidget):
 
     def load_param(self, filename):
         with open(filename, 'r') as f:
-            parameters = [Parameter(name=name, value=value)
-                          for doc in yaml.safe_load_all(f.read())
-                          for name, value in doc.items()]
+            # Later documents override parameters of earlier ones.
+            values = OrderedDict(
+                (name, value)
+                for doc in yaml.safe_load_all(f.read())
+                for name, value in doc.items())
+        parameters = [Parameter(name=name, value=value)
+                      for name, value in values.items()]
+        add_gui_done_callback(
+            self._param_client.load_parameters_async(parameters),
+            partial(self._handle_load_done, len(parameters)))
+
+    def _handle_load_done(self, num_parameters, future):
         try:
-            self._param_client.set_parameters(parameters)
+            results = future.result()
         except Exception as e:
             logging.warn(
                 "Parameter loading wasn't successful"
                 ' because: {}'.format(e)
             )
+            return
+        # Parameters of a rejected chunk share its result, report it once.
+        failures = OrderedDict()
+        for name, result in results.items():
+            if not result.successful:
+                failures.setdefault(result.reason, []).append(name)
+        for reason, names in failures.items():
+            if len(names) == 1:
+                logging.warn(
+                    "Failed to load parameter '{}': {}".format(names[0], reason))
+            else:
+                logging.warn(
+                    "Failed to load {} parameters ('{}', ...): {}".format(
+                        len(names), names[0], reason))
+        num_failures = sum(len(names) for names in failures.values())
+        if failures or len(results) < num_parameters:
+            logging.warn(
+                'Loaded {} of {} parameters into node {}'.format(
+                    len(results) - num_failures, num_parameters, self._node_grn))
 
     def _handle_save_clicked(self):
         filename = QFileDialog.getSaveFileName(
@@ -167,44 +224,137 @@ class ParamClientWidget(GroupWidget):
             self.save_param(filename[0])
 
     def save_param(self, filename):
+        add_gui_done_callback(
+            self.get_parameters_async(),
+            partial(self._handle_save_parameters_received, filename))
+
+    def _handle_save_parameters_received(self, filename, future):
         with open(filename, 'w') as f:
             try:
-                parameters = self._param_client.get_parameters(
-                                 self._param_client.list_parameters())
+                parameters = future.result()
                 yaml.dump({p.name: p.value for p in parameters}, f)
             except Exception as e:
                 logging.warn(
                     "Parameter saving wasn't successful because: " + str(e)
                 )
 
+    def _on_param_event(self, new_parameters,
+                        changed_parameters, deleted_parameters):
+        # Parameter events arrive on the executor thread.
+        call_in_gui_thread(self._handle_param_event, new_parameters,
+                           changed_parameters, deleted_parameters)
+
     def _handle_param_event(self, new_parameters,
                             changed_parameters, deleted_parameters):
         # TODO: Think about replacing callback architecture with signals.
+        if self._closed:
+            return
         if new_parameters:
-            try:
-                self.add_editor_widgets(new_parameters)
-            except Exception as e:
-                logging.warn(
-                    'Failed to get information about parameters: ' + str(e))
-
+            self.add_editor_widgets(new_parameters)
         if changed_parameters:
             self.update_editor_widgets(changed_parameters)
         if deleted_parameters:
             self.remove_editor_widgets(deleted_parameters)
 
+    def _handle_parameters_received(self, generation, future):
+        if self._closed or generation != self._editors_generation:
+            return
+        try:
+            parameters = future.result()
+        except Exception as e:
+            logging.warn(
+              f'Failed to retrieve parameters from node {self._node_grn}: {e}')
+            return
+        if not self._table_view_picked and \
+                len(parameters) > self._TABLE_VIEW_THRESHOLD:
+            self._table_view_button.blockSignals(True)
+            self._table_view_button.setChecked(True)
+            self._table_view_button.blockSignals(False)
+            self._set_table_view(True)
+        self.add_editor_widgets(parameters)
+
     def add_editor_widgets(self, parameters):
-        for parameter in parameters:
-            self.add_editor_widget(parameter)
+        # Descriptors for the whole set are fetched at once and handed down
+        # to the nested groups.
+        parameters = list(parameters)
+        if not parameters:
+            return
+        add_gui_done_callback(
+            self._param_client.get_parameter_store().get_descriptors_async(
+                [p.name for p in parameters]),
+            partial(self._handle_descriptors_received,
+                    self._editors_generation, parameters))
+
+    def _handle_descriptors_received(self, generation, parameters, future):
+        if self._closed or generation != self._editors_generation:
+            return
+        try:
+            descriptors = future.result()
+        except Exception as e:
+            logging.warn(
+                'Failed to get information about parameters: ' + str(e))
+            return
+        if self._table_view is not None:
+            self._table_view.get_model().add_parameters(parameters, descriptors)
+        else:
+            for parameter, descriptor in zip(parameters, descriptors):
+                self.add_editor_widget(parameter, descriptor)
+        if self._text_filter.get_text():
+            # Whether the filter falls back to fuzzy matching depends on the
+            # names, so it is applied again over the whole set.
+            self._apply_filter()
 
     def remove_editor_widgets(self, parameters):
+        if self._table_view is not None:
+            self._table_view.get_model().remove_parameters(parameters)
+            return
         for parameter in parameters:
             self.remove_editor_widget(parameter)
 
     def update_editor_widgets(self, parameters):
+        if self._table_view is not None:
+            self._table_view.get_model().update_parameters(parameters)
+            return
         for parameter in parameters:
             self.update_editor_widget(parameter)
 
+    def _handle_table_view_toggled(self, checked):
+        self._table_view_picked = True
+        self._set_table_view(checked)
+        self._reload_editors()
+
+    def _set_table_view(self, enabled):
+        if enabled == (self._table_view is not None):
+            return
+        self._editors_generation += 1
+        if enabled:
+            self.remove_editor_widgets(
+                [Parameter(name=name) for name in self.get_editor_names()])
+            self._grid_widget.hide()
+            self._table_view = ParameterTableView(self._param_client, self)
+            self._verticalLayout.addWidget(self._table_view)
+        else:
+            self._verticalLayout.removeWidget(self._table_view)
+            self._table_view.deleteLater()
+            self._table_view = None
+            self._grid_widget.show()
+        self._apply_filter()
+
+    def _reload_editors(self):
+        # Drop editors right away and rebuild them once the parameters have
+        # been fetched. Replies to requests issued before are ignored.
+        self._editors_generation += 1
+        if self._table_view is not None:
+            self._table_view.get_model().clear()
+        else:
+            self.remove_editor_widgets(
+                [Parameter(name=name) for name in self.get_editor_names()])
+        add_gui_done_callback(
+            self.get_parameters_async(),
+            partial(self._handle_parameters_received, self._editors_generation))
+
     def close(self):
+        self._closed = True
         super(ParamClientWidget, self).close()
         self._param_client.close()
         self.deleteLater()
@@ -214,15 +364,33 @@ class ParamClientWidget(GroupWidget):
         self.sig_node_disabled_selected.emit(self._toplevel_treenode_name)
 
     def _filter_key_changed(self):
-        filter_key = self._text_filter.get_text()
-        try:
-            param_names = self._param_client.list_parameters()
-            self.remove_editor_widgets(
-                self._param_client.get_parameters(param_names))
-
-            param_names_filtered = \
-                list(filter(lambda p: filter_key in p, param_names)) if filter_key else param_names
-            self.add_editor_widgets(
-                self._param_client.get_parameters(param_names_filtered))
-        except Exception as e:
-            logging.warn('Failed to retrieve parameters from node: ' + str(e))
+        self._apply_filter()
+
+    def _apply_filter(self):
+        # Filtering only hides and shows what is there already, the filter
+        # widget debounces typing.
+        if self._table_view is not None:
+            names = self._table_view.get_model().get_names()
+        else:
+            names = self.get_editor_names()
+        name_filter = self._get_name_filter(names)
+        if self._table_view is not None:
+            self._table_view.set_name_filter(name_filter)
+        else:
+            self.filter_editor_widgets(name_filter)
+
+    def _get_name_filter(self, names):
+        text = self._text_filter.get_text()
+        if not text:
+            return None
+        # The filter text is a regular expression, unless nothing matches
+        # it, in which case the names only need to contain its characters
+        # in order.
+        regexp = self._text_filter.get_regexp()
+
+        def regexp_filter(name):
+            return regexp.indexIn(name) >= 0
+
+        if any(regexp_filter(name) for name in names):
+            return regexp_filter
+        return partial(fuzzy_match, text)
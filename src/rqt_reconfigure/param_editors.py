@@ -30,13 +30,10 @@
 
 import array
 from decimal import Decimal
+from functools import partial
 import json
 import math
-import os
 
-from ament_index_python import get_resource
-
-from python_qt_binding import loadUi
 from python_qt_binding.QtCore import QEvent, QLocale, Qt, Signal
 from python_qt_binding.QtGui import QDoubleValidator, QIntValidator
 from python_qt_binding.QtWidgets import QMenu, QWidget
@@ -44,10 +41,76 @@ from python_qt_binding.QtWidgets import QMenu, QWidget
 from rclpy.parameter import Parameter
 
 from rqt_reconfigure import logging
+from rqt_reconfigure.ui_cache import load_ui
+
+
+def format_array_value(value):
+    if isinstance(value, array.array):
+        return str(value.tolist())
+    return str(value)
 
-# These .ui files are frequently loaded multiple times. Since file access
-# costs a lot, only load each file once.
-_, package_path = get_resource('packages', 'rqt_reconfigure')
+
+def queue_set_parameter(param_client, parameter):
+    """
+    Set a parameter edited in the GUI, logging if the node rejects it.
+
+    Values superseded while a write is in flight are never sent, see
+    ParamClient.queue_set_parameters.
+    """
+    # The name is bound now, the editor may show another parameter by the
+    # time the reply arrives.
+    param_client.queue_set_parameters([parameter]).add_done_callback(
+        partial(_handle_remote_updated, parameter.name))
+
+
+def _handle_remote_updated(name, future):
+    try:
+        result = future.result().get(name)
+    except Exception as e:
+        logging.warn('Failed to set parameters for node: ' + str(e))
+        return
+    if result is not None and not result.successful:
+        logging.warn("Failed to set parameter '{}': {}".format(
+            name, result.reason))
+
+
+def parse_array_value(parameter, text):
+    """
+    Parse the text of an array the way it is shown, for the given parameter.
+
+    :type parameter: rclpy.parameter.Parameter
+    :raises ValueError: if the text is not a valid array
+    """
+    if parameter.from_parameter_msg:
+        text = text.replace("'", '"')
+    values = json.loads(text)
+
+    if isinstance(parameter.value, array.array):
+        if parameter.value.typecode == 'q':
+            values = [int(val) for val in values]
+        else:
+            values = [float(val) for val in values]
+        return array.array(parameter.value.typecode, values)
+    if Parameter.Type.from_parameter_value(parameter.value) \
+            == Parameter.Type.BOOL_ARRAY:
+        return [bool(val) for val in values]
+    if Parameter.Type.from_parameter_value(parameter.value) \
+            == Parameter.Type.BYTE_ARRAY:
+        return [bytes(val) for val in values]
+    return [str(val) for val in values]
+
+
+def parse_enum_constraints(descriptor):
+    """
+    Get the names, values and description of an enum parameter.
+
+    :type descriptor: rcl_interfaces.msg.ParameterDescriptor
+    :returns: tuple of the list of names, the list of values and the
+              description
+    """
+    d = eval(descriptor.additional_constraints)
+    enum = d['enum']
+    return list(enum.keys()), list(enum.values()), d['enum_description']
 
 
 class EditorWidget(QWidget):
@@ -68,12 +131,33 @@ class EditorWidget(QWidget):
 
         self.cmenu = QMenu()
 
+    def rebind(self, param_client, parameter, descriptor):
+        """
+        Reuse the editor for another parameter of the same type.
+
+        The widgets are kept, only the value and the descriptor are applied
+        again, see EditorWidgetPool.
+
+        :type parameter: rclpy.parameter.Parameter
+        :type descriptor: rcl_interfaces.msg.ParameterDescriptor
+        """
+        self._param_client = param_client
+        self.parameter = parameter
+        self.descriptor = descriptor
+        self._bind()
+
+    def _bind(self):
+        # Show the value and apply the descriptor of the parameter, once the
+        # widgets are set up. To be overridden in subclass.
+        pass
+
+    def reset(self):
+        """Detach the editor from its node before it is pooled."""
+        self._param_client = None
+
     def update_remote(self, value):
-        # Update the value on Parameter Server.
-        try:
-            self._param_client.set_parameters([self.parameter])
-        except Exception as e:
-            logging.warn('Failed to set parameters for node: ' + str(e))
+        # Update the value on Parameter Server without waiting for the reply.
+        queue_set_parameter(self._param_client, self.parameter)
 
     def update_local(self, value):
         """
@@ -107,12 +191,24 @@ class EditorWidget(QWidget):
         self._paramname_label.setText(param_name)
         self._paramname_label.setMinimumWidth(100)
         grid.addRow(self._paramname_label, self)
+        # A recycled editor may have been hidden by a filter.
+        self.set_row_visible(True)
         self.setToolTip(self.descriptor.description)
         self._paramname_label.setToolTip(self.descriptor.description)
         self._paramname_label.contextMenuEvent = self.contextMenuEvent
 
     def hide(self, grid):
-        grid.removeRow(self)
+        # Take the row rather than remove it, which would delete the widgets
+        # and keep the editor from being reused.
+        grid.takeRow(self)
+        self._paramname_label.setParent(self)
+        self.setParent(None)
+
+    def set_row_visible(self, visible):
+        """Show or hide the editor along with its label, in place."""
+        if self.isHidden() == visible:
+            self.setVisible(visible)
+            self._paramname_label.setVisible(visible)
 
     def close(self):
         # Should be overridden in subclass.
@@ -127,21 +223,22 @@ class BooleanEditor(EditorWidget):
 
     def __init__(self, *args, **kwargs):
         super(BooleanEditor, self).__init__(*args, **kwargs)
-        ui_bool = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'editor_bool.ui')
-        loadUi(ui_bool, self)
-
-        # Set inital value
-        self._checkbox.setChecked(self.parameter.value)
+        load_ui('editor_bool.ui', self)
 
         # Make checkbox update param server
         self._checkbox.stateChanged.connect(self._box_checked)
 
         self._update_signal.connect(self._checkbox.setChecked)
 
-        if self.descriptor.read_only:
-            self._checkbox.setEnabled(False)
+        self._bind()
+
+    def _bind(self):
+        # Set inital value
+        self._checkbox.blockSignals(True)
+        self._checkbox.setChecked(self.parameter.value)
+        self._checkbox.blockSignals(False)
+
+        self._checkbox.setEnabled(not self.descriptor.read_only)
 
     def _box_checked(self, value):
         self.update(bool(value))
@@ -156,12 +253,7 @@ class StringEditor(EditorWidget):
 
     def __init__(self, *args, **kwargs):
         super(StringEditor, self).__init__(*args, **kwargs)
-        ui_str = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'editor_string.ui')
-        loadUi(ui_str, self)
-
-        self._paramval_lineedit.setText(self.parameter.value)
+        load_ui('editor_string.ui', self)
 
         # Update param server when cursor leaves the text field
         # or enter is pressed.
@@ -174,9 +266,13 @@ class StringEditor(EditorWidget):
         self.cmenu.addAction(self.tr('Set to Empty String')
                              ).triggered.connect(self._set_to_empty)
 
-        if self.descriptor.read_only:
-            self._paramval_lineedit.setReadOnly(True)
-            self.cmenu.setEnabled(False)
+        self._bind()
+
+    def _bind(self):
+        self._paramval_lineedit.setText(self.parameter.value)
+
+        self._paramval_lineedit.setReadOnly(self.descriptor.read_only)
+        self.cmenu.setEnabled(not self.descriptor.read_only)
 
     def update_local(self, value):
         super(StringEditor, self).update_local(value)
@@ -197,12 +293,42 @@ class IntegerEditor(EditorWidget):
 
     def __init__(self, *args, **kwargs):
         super(IntegerEditor, self).__init__(*args, **kwargs)
-        ui_int = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'editor_number.ui')
-        loadUi(ui_int, self)
+        load_ui('editor_number.ui', self)
+
+        # Make slider update text (locally)
+        self._slider_horizontal.sliderMoved.connect(self._slider_moved)
+
+        # Make slider update param server
+        # Turning off tracking means this isn't called during a drag
+        self._slider_horizontal.setTracking(False)
+        self._slider_horizontal.valueChanged.connect(self._slider_changed)
+
+        # Add special menu items, only shown for a range
+        self._set_to_max_action = self.cmenu.addAction(self.tr('Set to Maximum'))
+        self._set_to_max_action.triggered.connect(self._set_to_max)
+        self._set_to_min_action = self.cmenu.addAction(self.tr('Set to Minimum'))
+        self._set_to_min_action.triggered.connect(self._set_to_min)
+
+        # TODO: Fix that the naming of _paramval_lineEdit instance is not
+        #       consistent among Editor's subclasses.
+        self._validator = QIntValidator(self)
+        self._unbounded_range = (self._validator.bottom(), self._validator.top())
+        self._paramval_lineEdit.setValidator(self._validator)
+
+        # Make keyboard input change slider position and update param server
+        self._paramval_lineEdit.editingFinished.connect(self._text_changed)
+
+        # Make the param server update selection
+        self._update_signal.connect(self._update_gui)
 
-        if len(self.descriptor.integer_range) > 0:
+        # Don't process wheel events when not focused
+        self._slider_horizontal.installEventFilter(self)
+
+        self._bind()
+
+    def _bind(self):
+        has_range = len(self.descriptor.integer_range) > 0
+        if has_range:
             # Set ranges
             self._min = int(self.descriptor.integer_range[0].from_value)
             self._max = int(self.descriptor.integer_range[0].to_value)
@@ -213,51 +339,26 @@ class IntegerEditor(EditorWidget):
             self._slider_horizontal.setSingleStep(self._step)
             self._slider_horizontal.setTickInterval(self._step)
             self._slider_horizontal.setPageStep(self._step)
+            self._slider_horizontal.blockSignals(True)
             self._slider_horizontal.setRange(self._min, self._max)
+            self._slider_horizontal.blockSignals(False)
 
-            self._slider_horizontal.setValue(int(self.parameter.value))
-            self._slider_horizontal.setValue(int(self.parameter.value))
-
-            # Make slider update text (locally)
-            self._slider_horizontal.sliderMoved.connect(self._slider_moved)
-
-            # Make slider update param server
-            # Turning off tracking means this isn't called during a drag
-            self._slider_horizontal.setTracking(False)
-            self._slider_horizontal.valueChanged.connect(self._slider_changed)
-
-            # Add special menu items
-            self.cmenu.addAction(self.tr('Set to Maximum')
-                                 ).triggered.connect(self._set_to_max)
-            self.cmenu.addAction(self.tr('Set to Minimum')
-                                 ).triggered.connect(self._set_to_min)
-
-            # TODO: Fix that the naming of _paramval_lineEdit instance is not
-            #       consistent among Editor's subclasses.
-            self._paramval_lineEdit.setValidator(QIntValidator(self._min,
-                                                 self._max, self))
+            self._validator.setRange(self._min, self._max)
         else:
-            self._paramval_lineEdit.setValidator(QIntValidator())
-            self._min_val_label.setVisible(False)
-            self._max_val_label.setVisible(False)
-            self._slider_horizontal.setVisible(False)
-
-        # Make keyboard input change slider position and update param server
-        self._paramval_lineEdit.editingFinished.connect(self._text_changed)
+            self._validator.setRange(*self._unbounded_range)
+        self._min_val_label.setVisible(has_range)
+        self._max_val_label.setVisible(has_range)
+        self._slider_horizontal.setVisible(has_range)
+        self._set_to_max_action.setVisible(has_range)
+        self._set_to_min_action.setVisible(has_range)
 
         # Initialize to default
-        self._paramval_lineEdit.setText(str(self.parameter.value))
-
-        # Make the param server update selection
-        self._update_signal.connect(self._update_gui)
+        self._update_gui(int(self.parameter.value))
 
-        if self.descriptor.read_only:
-            self._paramval_lineEdit.setEnabled(False)
-            self._slider_horizontal.setEnabled(False)
-            self.cmenu.setEnabled(False)
-
-        # Don't process wheel events when not focused
-        self._slider_horizontal.installEventFilter(self)
+        read_only = self.descriptor.read_only
+        self._paramval_lineEdit.setEnabled(not read_only)
+        self._slider_horizontal.setEnabled(not read_only)
+        self.cmenu.setEnabled(not read_only)
 
     def eventFilter(self, obj, event):
         if event.type() == QEvent.Wheel and not obj.hasFocus():
@@ -305,13 +406,43 @@ class DoubleEditor(EditorWidget):
 
     def __init__(self, *args, **kwargs):
         super(DoubleEditor, self).__init__(*args, **kwargs)
-        ui_num = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'editor_number.ui'
-        )
-        loadUi(ui_num, self)
+        load_ui('editor_number.ui', self)
+
+        # Make slider update text (locally)
+        self._slider_horizontal.sliderMoved.connect(self._slider_moved)
 
-        if len(self.descriptor.floating_point_range) > 0:
+        # Make slider update param server
+        # Turning off tracking means this isn't called during a drag
+        self._slider_horizontal.setTracking(False)
+        self._slider_horizontal.valueChanged.connect(self._slider_changed)
+
+        self._validator = QDoubleValidator(self)
+        self._validator.setLocale(QLocale(QLocale.C))
+        self._unbounded_range = (self._validator.bottom(), self._validator.top(),
+                                 self._validator.decimals())
+        self._paramval_lineEdit.setValidator(self._validator)
+
+        # Make keyboard input change slider position and update param server
+        self._paramval_lineEdit.editingFinished.connect(self._text_changed)
+
+        # Make the param server update selection
+        self._update_signal.connect(self._update_gui)
+
+        # Add special menu items, only shown for a range
+        self._set_to_max_action = self.cmenu.addAction(self.tr('Set to Maximum'))
+        self._set_to_max_action.triggered.connect(self._set_to_max)
+        self._set_to_min_action = self.cmenu.addAction(self.tr('Set to Minimum'))
+        self._set_to_min_action.triggered.connect(self._set_to_min)
+
+        # Don't process wheel events when not focused
+        self._slider_horizontal.installEventFilter(self)
+
+        self._bind()
+
+    def _bind(self):
+        has_range = len(self.descriptor.floating_point_range) > 0
+        self._slider_horizontal.blockSignals(True)
+        if has_range:
             # Handle unbounded doubles nicely
             self._min = float(self.descriptor.floating_point_range[0].from_value)
             self._min_val_label.setText(str(self._min))
@@ -335,54 +466,30 @@ class DoubleEditor(EditorWidget):
             # Set ranges
             self._slider_horizontal.setRange(self._get_value_slider(self._min),
                                              self._get_value_slider(self._max))
-            validator = QDoubleValidator(self._min, self._max, 8, self)
-            validator.setLocale(QLocale(QLocale.C))
-            self._paramval_lineEdit.setValidator(validator)
+            self._validator.setRange(self._min, self._max, 8)
 
             self._slider_horizontal.setValue(
                 self._get_value_slider(self.parameter.value)
             )
-
-            # Make slider update text (locally)
-            self._slider_horizontal.sliderMoved.connect(self._slider_moved)
-
-            # Make slider update param server
-            # Turning off tracking means this isn't called during a drag
-            self._slider_horizontal.setTracking(False)
-            self._slider_horizontal.valueChanged.connect(self._slider_changed)
         else:
-            validator = QDoubleValidator()
-            validator.setLocale(QLocale(QLocale.C))
-            self._paramval_lineEdit.setValidator(validator)
-            self._min_val_label.setVisible(False)
-            self._max_val_label.setVisible(False)
-            self._slider_horizontal.setVisible(False)
+            self._validator.setRange(*self._unbounded_range)
             self._func = lambda x: math.atan(x)
             self._ifunc = lambda x: math.tan(x)
             self.scale = 0
+        self._slider_horizontal.blockSignals(False)
+        self._min_val_label.setVisible(has_range)
+        self._max_val_label.setVisible(has_range)
+        self._slider_horizontal.setVisible(has_range)
+        self._set_to_max_action.setVisible(has_range)
+        self._set_to_min_action.setVisible(has_range)
 
         # Initialize to defaults
         self._paramval_lineEdit.setText(str(self.parameter.value))
 
-        # Make keyboard input change slider position and update param server
-        self._paramval_lineEdit.editingFinished.connect(self._text_changed)
-
-        # Make the param server update selection
-        self._update_signal.connect(self._update_gui)
-
-        # Add special menu items
-        self.cmenu.addAction(self.tr('Set to Maximum')
-                             ).triggered.connect(self._set_to_max)
-        self.cmenu.addAction(self.tr('Set to Minimum')
-                             ).triggered.connect(self._set_to_min)
-
-        if self.descriptor.read_only:
-            self._paramval_lineEdit.setEnabled(False)
-            self._slider_horizontal.setEnabled(False)
-            self.cmenu.setEnabled(False)
-
-        # Don't process wheel events when not focused
-        self._slider_horizontal.installEventFilter(self)
+        read_only = self.descriptor.read_only
+        self._paramval_lineEdit.setEnabled(not read_only)
+        self._slider_horizontal.setEnabled(not read_only)
+        self.cmenu.setEnabled(not read_only)
 
     def eventFilter(self, obj, event):
         if event.type() == QEvent.Wheel and not obj.hasFocus():
@@ -445,15 +552,7 @@ class ArrayEditor(EditorWidget):
 
     def __init__(self, *args, **kwargs):
         super(ArrayEditor, self).__init__(*args, **kwargs)
-        ui_str = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'editor_string.ui')
-        loadUi(ui_str, self)
-
-        if isinstance(self.parameter.value, array.array):
-            self._paramval_lineedit.setText(str(self.parameter.value.tolist()))
-        else:
-            self._paramval_lineedit.setText(str(self.parameter.value))
+        load_ui('editor_string.ui', self)
 
         # Update param server when cursor leaves the text field
         # or enter is pressed.
@@ -466,9 +565,14 @@ class ArrayEditor(EditorWidget):
         self.cmenu.addAction(self.tr('Set to Empty String')
                              ).triggered.connect(self._set_to_empty)
 
-        if self.descriptor.read_only:
-            self._paramval_lineedit.setReadOnly(True)
-            self.cmenu.setEnabled(False)
+        self._bind()
+
+    def _bind(self):
+        self._paramval_lineedit.setText(
+            format_array_value(self.parameter.value))
+
+        self._paramval_lineedit.setReadOnly(self.descriptor.read_only)
+        self.cmenu.setEnabled(not self.descriptor.read_only)
 
     def update_local(self, value):
         super(ArrayEditor, self).update_local(value)
@@ -484,27 +588,8 @@ class ArrayEditor(EditorWidget):
     def edit_finished(self):
         logging.debug('ArrayEditor edit_finished val={}'.format(
             self._paramval_lineedit.text()))
-        params_string = self._paramval_lineedit.text()
-        if self.parameter.from_parameter_msg:
-            params_string = params_string.replace("'", '"')
-        params_list = json.loads(params_string)
-
-        if isinstance(self.parameter.value, array.array):
-            if self.parameter.value.typecode == 'q':
-                params_list = [int(val) for val in params_list]
-            else:
-                params_list = [float(val) for val in params_list]
-            self.update(array.array(self.parameter.value.typecode, params_list))
-        else:
-            if Parameter.Type.from_parameter_value(self.parameter.value) \
-                    == Parameter.Type.BOOL_ARRAY:
-                params_list = [bool(val) for val in params_list]
-            elif Parameter.Type.from_parameter_value(self.parameter.value) \
-                    == Parameter.Type.BYTE_ARRAY:
-                params_list = [bytes(val) for val in params_list]
-            else:
-                params_list = [str(val) for val in params_list]
-            self.update(params_list)
+        self.update(parse_array_value(
+            self.parameter, self._paramval_lineedit.text()))
 
     def _set_to_empty(self):
         self.update('[]')
@@ -516,22 +601,38 @@ class EnumEditor(EditorWidget):
 
     def __init__(self, *args, **kwargs):
         super(EnumEditor, self).__init__(*args, **kwargs)
-        ui_enum = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'editor_enum.ui')
-        loadUi(ui_enum, self)
+        load_ui('editor_enum.ui', self)
+
+        # Make selection update the param server
+        self._combobox.currentIndexChanged['int'].connect(self.selected)
+
+        # Make the param server update selection
+        self._update_signal.connect(self._update_gui)
+
+        # Bind the context menu
+        self._combobox.contextMenuEvent = self.contextMenuEvent
+
+        # Add the invalid value handler
+        self._invalid_value_signal.connect(self._handle_invalid_value)
+
+        # Don't process wheel events when not focused
+        self._combobox.installEventFilter(self)
+
+        self._bind()
+
+    def _bind(self):
+        # Block all signals so the items set up aren't taken as a selection
+        self._combobox.blockSignals(True)
+        self._combobox.clear()
         try:
-            d = eval(self.descriptor.additional_constraints)
-            enum = d['enum']
+            self.names, self.values, self.enum_description = \
+                parse_enum_constraints(self.descriptor)
         except:  # noqa: E722
             logging.error('reconfig EnumEditor) Malformed enum')
+            self.names, self.values = [], []
+            self._combobox.blockSignals(False)
             return
 
-        # Setup the enum items
-        self.names  = [name for name in enum.keys()]
-        self.values = [value for value in enum.values()]
-        self.enum_description = d['enum_description']
-
         items = ['%s (%s)' % (self.names[i], self.values[i])
                  for i in range(0, len(self.names))]
 
@@ -547,21 +648,7 @@ class EnumEditor(EditorWidget):
                                                self.parameter.value))
         else:
             self._combobox.setCurrentIndex(0)
-
-        # Make selection update the param server
-        self._combobox.currentIndexChanged['int'].connect(self.selected)
-
-        # Make the param server update selection
-        self._update_signal.connect(self._update_gui)
-
-        # Bind the context menu
-        self._combobox.contextMenuEvent = self.contextMenuEvent
-
-        # Add the invalid value handler
-        self._invalid_value_signal.connect(self._handle_invalid_value)
-
-        # Don't process wheel events when not focused
-        self._combobox.installEventFilter(self)
+        self._combobox.blockSignals(False)
 
     def eventFilter(self, obj, event):
         if event.type() == QEvent.Wheel and not obj.hasFocus():
@@ -616,3 +703,69 @@ EDITOR_TYPES = {
     Parameter.Type.DOUBLE_ARRAY: ArrayEditor,
     Parameter.Type.STRING_ARRAY: ArrayEditor,
 }
+
+
+class EditorWidgetPool(object):
+    """
+    Editors of parameters that are gone, kept per type for reuse.
+
+    Editors handed back are reset and rebound to the next parameter of the
+    same type rather than created again. Only used from the GUI thread.
+    """
+
+    # Editors kept per type by default.
+    DEFAULT_MAX_SIZE_PER_TYPE = 64
+
+    def __init__(self, max_size_per_type=DEFAULT_MAX_SIZE_PER_TYPE):
+        # { EditorWidget subclass : list of EditorWidget }
+        self._editor_widgets = {}
+        self._max_size_per_type = max_size_per_type
+
+    def set_max_size_per_type(self, max_size_per_type):
+        """Set how many editors are kept per type, 0 to keep none."""
+        self._max_size_per_type = max_size_per_type
+        for editor_widgets in self._editor_widgets.values():
+            while len(editor_widgets) > max_size_per_type:
+                editor_widgets.pop().deleteLater()
+
+    def acquire(self, editor_class, param_client, parameter, descriptor):
+        """
+        Get an editor for the parameter, reusing a pooled one if possible.
+
+        :type editor_class: type, subclass of EditorWidget
+        :type parameter: rclpy.parameter.Parameter
+        :type descriptor: rcl_interfaces.msg.ParameterDescriptor
+        :rtype: EditorWidget
+        """
+        editor_widgets = self._editor_widgets.get(editor_class)
+        if not editor_widgets:
+            return editor_class(param_client, parameter, descriptor)
+        editor_widget = editor_widgets.pop()
+        editor_widget.rebind(param_client, parameter, descriptor)
+        return editor_widget
+
+    def release(self, editor_widget):
+        """
+        Hand back an editor that is no longer displayed.
+
+        :type editor_widget: EditorWidget
+        """
+        editor_widget.reset()
+        editor_widgets = self._editor_widgets.setdefault(
+            type(editor_widget), [])
+        if len(editor_widgets) < self._max_size_per_type:
+            editor_widgets.append(editor_widget)
+        else:
+            editor_widget.deleteLater()
+
+    def get_size(self):
+        """Get the number of editors pooled, over all types."""
+        return sum(len(editor_widgets)
+                   for editor_widgets in self._editor_widgets.values())
+
+
+_editor_widget_pool = EditorWidgetPool()
+
+
+def get_editor_widget_pool():
+    return _editor_widget_pool
@@ -42,7 +42,7 @@ from rqt_reconfigure import logging
 # to be imported. They are invoked implicitly during runtime.
 from rqt_reconfigure.param_editors import (  # noqa: F401
     BooleanEditor, DoubleEditor, EDITOR_TYPES, EditorWidget, EnumEditor,
-    IntegerEditor, StringEditor
+    get_editor_widget_pool, IntegerEditor, StringEditor
 )
 
 
@@ -53,10 +53,12 @@ class GroupWidget(QWidget):
     a single node as a group.
     """
 
-    def __init__(self, param_client, node_name):
+    def __init__(self, param_client, node_name, materialized=True):
         """
         :param context:
         :type node_name: str
+        :param materialized: whether editors are created right away, or
+                             only once the group is shown, see materialize
         """
         super(GroupWidget, self).__init__()
         self._param_client = param_client
@@ -64,38 +66,41 @@ class GroupWidget(QWidget):
         self._editor_widgets = {}
         self._group_widgets = {}
         self._tab_bar = None  # Every group can have one tab bar
+        self._materialized = materialized
+        # { name : (Parameter, ParameterDescriptor) } of the editors to
+        # create once the group is materialized.
+        self._pending_editors = {}
+        # Tells whether to show the editor of a parameter name, or None to
+        # show all of them.
+        self._name_filter = None
 
         self._verticalLayout = QVBoxLayout(self)
         self._verticalLayout.setContentsMargins(QMargins(0, 0, 0, 0))
 
-        grid_widget = QWidget(self)
-        self._grid = QFormLayout(grid_widget)
-        self.insert_widget_on_top(grid_widget)
+        self._grid_widget = QWidget(self)
+        self._grid = QFormLayout(self._grid_widget)
+        self.insert_widget_on_top(self._grid_widget)
 
         logging.debug('Groups node name={}'.format(node_name))
 
     def insert_widget_on_top(self, widget):
         self._verticalLayout.insertWidget(0, widget)
 
-    def add_editor_widget(self, parameter, depth=0):
+    def add_editor_widget(self, parameter, descriptor, depth=0):
+        """
+        Add an editor for the parameter, creating nested groups as needed.
+
+        :type parameter: rclpy.parameter.Parameter
+        :type descriptor: rcl_interfaces.msg.ParameterDescriptor
+        """
         tokens = parameter.name.split('.', depth + 1)
         if len(tokens) == depth + 1:
-            if parameter.name not in self._editor_widgets:
-                descriptor = self._param_client.describe_parameters(
-                    [parameter.name])[0]
-                if descriptor.additional_constraints == '':
-                    if Parameter.Type(descriptor.type) not in EDITOR_TYPES:
-                        return
-                    editor_widget = EDITOR_TYPES[Parameter.Type(
-                                        descriptor.type)](self._param_client,
-                                                          parameter,
-                                                          descriptor)
-                else:
-                    editor_widget = EnumEditor(self._param_client,
-                                           parameter, descriptor)
-                logging.debug('Adding editor widget for {}'.format(parameter.name))
-                editor_widget.display(self._grid)
-                self._editor_widgets[parameter.name] = editor_widget
+            if parameter.name in self._editor_widgets:
+                return
+            if not self._materialized:
+                self._pending_editors[parameter.name] = (parameter, descriptor)
+                return
+            self._create_editor_widget(parameter, descriptor)
         else:
             group_name = tokens[depth]
             group_widget = self._group_widgets.get(group_name, None)
@@ -103,20 +108,95 @@ class GroupWidget(QWidget):
                 if self._tab_bar is None:
                     self._tab_bar = QTabWidget()
                     #self._tab_bar.tabBar().installEventFilter(self)
+                    self._tab_bar.currentChanged.connect(
+                        self._handle_tab_changed)
                     self._grid.addRow(self._tab_bar)
-                group_widget = GroupWidget(self._param_client, group_name)
-                self._tab_bar.addTab(group_widget, group_name)
+                group_widget = GroupWidget(
+                    self._param_client, group_name, materialized=False)
+                group_widget._name_filter = self._name_filter
                 self._group_widgets[group_name] = group_widget
-            group_widget.add_editor_widget(parameter, depth + 1)
+                self._tab_bar.addTab(group_widget, group_name)
+            group_widget.add_editor_widget(parameter, descriptor, depth + 1)
+
+    def _create_editor_widget(self, parameter, descriptor):
+        if descriptor.additional_constraints == '':
+            if Parameter.Type(descriptor.type) not in EDITOR_TYPES:
+                return
+            editor_class = EDITOR_TYPES[Parameter.Type(descriptor.type)]
+        else:
+            editor_class = EnumEditor
+        editor_widget = get_editor_widget_pool().acquire(
+            editor_class, self._param_client, parameter, descriptor)
+        logging.debug('Adding editor widget for {}'.format(parameter.name))
+        editor_widget.display(self._grid)
+        if self._name_filter is not None and \
+                not self._name_filter(parameter.name):
+            editor_widget.set_row_visible(False)
+        self._editor_widgets[parameter.name] = editor_widget
+
+    def filter_editor_widgets(self, name_filter):
+        """
+        Show only the editors of the matching parameters, and their groups.
+
+        Editors are hidden rather than removed, so filtering needs neither
+        a service call nor new widgets.
+
+        :param name_filter: callable telling whether to show the editor of a
+                            parameter name, or None to show all of them
+        :returns: whether any parameter of the group or below is shown
+        """
+        self._name_filter = name_filter
+
+        def is_shown(name):
+            return name_filter is None or name_filter(name)
+
+        shown = False
+        for name, editor_widget in self._editor_widgets.items():
+            visible = is_shown(name)
+            editor_widget.set_row_visible(visible)
+            shown = shown or visible
+        shown = shown or any(is_shown(name) for name in self._pending_editors)
+        if self._tab_bar is not None:
+            any_group_shown = False
+            for group_widget in self._group_widgets.values():
+                visible = group_widget.filter_editor_widgets(name_filter)
+                self._tab_bar.setTabVisible(
+                    self._tab_bar.indexOf(group_widget), visible)
+                any_group_shown = any_group_shown or visible
+            self._tab_bar.setVisible(any_group_shown)
+            shown = shown or any_group_shown
+        return shown
+
+    def materialize(self):
+        """
+        Create the editors of the group, and of the nested group shown.
+
+        Only one tab of a QTabWidget is visible at a time, so nested groups
+        keep their parameters until their tab is first shown.
+        """
+        if self._materialized:
+            return
+        self._materialized = True
+        pending_editors = self._pending_editors
+        self._pending_editors = {}
+        for parameter, descriptor in pending_editors.values():
+            self._create_editor_widget(parameter, descriptor)
+        if self._tab_bar is not None and self._tab_bar.currentWidget():
+            self._tab_bar.currentWidget().materialize()
+
+    def _handle_tab_changed(self, index):
+        group_widget = self._tab_bar.widget(index)
+        if self._materialized and group_widget is not None:
+            group_widget.materialize()
 
     def remove_editor_widget(self, parameter, depth=0):
         tokens = parameter.name.split('.', depth + 1)
         if len(tokens) == depth + 1:
+            self._pending_editors.pop(parameter.name, None)
             if parameter.name in self._editor_widgets:
                 logging.debug('Removing editor widget for {}'.format(parameter.name))
-                self._editor_widgets[parameter.name].hide(self._grid)
-                self._editor_widgets[parameter.name].close()
-                del self._editor_widgets[parameter.name]
+                self._release_editor_widget(
+                    self._editor_widgets.pop(parameter.name))
         else:
             group_name = tokens[depth]
             group_widget = self._group_widgets.get(group_name, None)
@@ -124,12 +204,15 @@ class GroupWidget(QWidget):
                group_widget.remove_editor_widget(parameter, depth + 1) == 0:
                 self._tab_bar.removeTab(self._tab_bar.indexOf(group_widget))
                 del self._group_widgets[group_name]
-        return len(self._editor_widgets)
+        return len(self._editor_widgets) + len(self._pending_editors)
 
     def update_editor_widget(self, parameter, depth=0):
         tokens = parameter.name.split('.', depth + 1)
         if len(tokens) == depth + 1:
-            if parameter.name in self._editor_widgets:
+            if parameter.name in self._pending_editors:
+                self._pending_editors[parameter.name] = (
+                    parameter, self._pending_editors[parameter.name][1])
+            elif parameter.name in self._editor_widgets:
                 logging.debug('Updating editor widget for {}'.format(parameter.name))
                 self._editor_widgets[parameter.name].update_local(parameter.value)
         else:
@@ -138,8 +221,23 @@ class GroupWidget(QWidget):
             if group_widget is not None:
                 group_widget.update_editor_widget(parameter, depth + 1)
 
+    def get_editor_names(self):
+        """Get the names of the parameters edited in this group and below."""
+        names = list(self._editor_widgets)
+        names.extend(self._pending_editors)
+        for group_widget in self._group_widgets.values():
+            names.extend(group_widget.get_editor_names())
+        return names
+
+    def _release_editor_widget(self, editor_widget):
+        # Editors are handed back to the pool for reuse rather than deleted.
+        editor_widget.hide(self._grid)
+        editor_widget.close()
+        get_editor_widget_pool().release(editor_widget)
+
     def close(self):
         for editor_widget in self._editor_widgets.values():
-            editor_widget.close()
+            self._release_editor_widget(editor_widget)
+        self._editor_widgets.clear()
         for group_widget in self._group_widgets.values():
             group_widget.close()
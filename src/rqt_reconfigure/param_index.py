@@ -0,0 +1,235 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from collections import deque
+from functools import partial
+from threading import Lock
+
+from rqt_reconfigure import logging
+from rqt_reconfigure.node_health import get_node_health_registry, NodeHealth
+from rqt_reconfigure.param_api import (
+    get_parameter_event_dispatcher, list_parameter_names_async)
+
+
+class ParameterNameIndex(object):
+    """
+    Inverted index of the parameter names of the nodes in the graph.
+
+    Nodes are listed in the background once they are added, a few at a
+    time, and kept up to date from parameter events afterwards. Lookups
+    only read the index, they never wait for a node.
+
+    Nodes are listed through throwaway clients, see
+    list_parameter_names_async, and listing doubles as their discovery
+    probe. Nodes that didn't answer are listed again once the graph
+    changed, see relist_unanswered, or once they are seen answering.
+
+    With content filtered parameter events, following the events of all
+    nodes would defeat the filtering, so the names are only listed.
+    """
+
+    # Nodes whose parameters are listed at the same time.
+    MAX_LISTS_IN_FLIGHT = 16
+
+    def __init__(self, node):
+        self._node = node
+        self._lock = Lock()
+        # { parameter name : set of node names }
+        self._nodes_by_name = {}
+        # { node name : set of parameter names }
+        self._names_by_node = {}
+        self._nodes_to_list = deque()
+        self._num_lists_in_flight = 0
+        self._listeners = []
+        self._closed = False
+        # Nodes whose parameters couldn't be listed.
+        self._unanswered_nodes = set()
+        get_node_health_registry().add_listener(self._on_node_health_changed)
+        self._dispatcher = get_parameter_event_dispatcher(node)
+        self._follow_events = not self._dispatcher.is_content_filter_enabled()
+        if self._follow_events:
+            self._dispatcher.add_event_callback(self._on_parameter_event)
+
+    def close(self):
+        get_node_health_registry().remove_listener(self._on_node_health_changed)
+        if self._follow_events:
+            self._dispatcher.remove_event_callback(self._on_parameter_event)
+        with self._lock:
+            self._closed = True
+            self._nodes_to_list.clear()
+            self._nodes_by_name.clear()
+            self._names_by_node.clear()
+            self._unanswered_nodes.clear()
+
+    def add_listener(self, listener):
+        """
+        Register a callable for changes of the index.
+
+        :param listener: called with the name of the node whose parameter
+                         names changed, from whichever thread changed them.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def add_node(self, node_name):
+        """Start indexing the parameters of a node."""
+        with self._lock:
+            if self._closed or node_name in self._names_by_node:
+                return
+            self._names_by_node[node_name] = set()
+            self._nodes_to_list.append(node_name)
+        self._list_next_nodes()
+
+    def remove_node(self, node_name):
+        with self._lock:
+            names = self._names_by_node.pop(node_name, None)
+            if names is None:
+                return
+            self._remove_names(node_name, names)
+            self._unanswered_nodes.discard(node_name)
+        self._notify(node_name)
+
+    def relist_unanswered(self):
+        """List the nodes that didn't answer again, e.g. after graph changes."""
+        with self._lock:
+            if not self._unanswered_nodes:
+                return
+            self._nodes_to_list.extend(self._unanswered_nodes)
+            self._unanswered_nodes.clear()
+        self._list_next_nodes()
+
+    def get_name_count(self):
+        """Get the number of distinct parameter names indexed."""
+        with self._lock:
+            return len(self._nodes_by_name)
+
+    def find_nodes(self, match):
+        """
+        Find the parameters whose name matches, by node.
+
+        :param match: callable telling whether a parameter name matches.
+        :rtype: dict { node name : list of matching parameter names }
+        """
+        with self._lock:
+            names = list(self._nodes_by_name)
+        matching_names = [name for name in names if match(name)]
+        nodes = {}
+        with self._lock:
+            for name in matching_names:
+                for node_name in self._nodes_by_name.get(name, ()):
+                    nodes.setdefault(node_name, []).append(name)
+        return nodes
+
+    def _list_next_nodes(self):
+        while True:
+            with self._lock:
+                if (self._num_lists_in_flight >= self.MAX_LISTS_IN_FLIGHT or
+                        not self._nodes_to_list):
+                    return
+                node_name = self._nodes_to_list.popleft()
+                if node_name not in self._names_by_node:
+                    continue
+                self._num_lists_in_flight += 1
+            try:
+                future = list_parameter_names_async(self._node, node_name)
+            except Exception as e:
+                logging.warn('Failed to create a client for node {}: {}'.format(
+                    node_name, e))
+                with self._lock:
+                    self._num_lists_in_flight -= 1
+                continue
+            future.add_done_callback(partial(self._handle_listed, node_name))
+
+    def _handle_listed(self, node_name, future):
+        try:
+            names = future.result()
+            answered = True
+        except Exception as e:
+            logging.debug('Failed to list parameters of node {}: {}'.format(
+                node_name, e))
+            names = []
+            answered = False
+        with self._lock:
+            self._num_lists_in_flight -= 1
+            indexed = node_name in self._names_by_node
+            if indexed:
+                self._add_names(node_name, names)
+            if indexed and not answered:
+                self._unanswered_nodes.add(node_name)
+        if indexed and names:
+            self._notify(node_name)
+        self._list_next_nodes()
+
+    def _on_node_health_changed(self, node_name, state):
+        # Called from whichever thread observed the change.
+        if state != NodeHealth.HEALTHY:
+            return
+        with self._lock:
+            if node_name not in self._unanswered_nodes:
+                return
+            self._unanswered_nodes.discard(node_name)
+            self._nodes_to_list.append(node_name)
+        self._list_next_nodes()
+
+    def _on_parameter_event(self, event):
+        # Called on the executor thread for every parameter event.
+        if not event.new_parameters and not event.deleted_parameters:
+            return
+        with self._lock:
+            if event.node not in self._names_by_node:
+                return
+            self._add_names(event.node, [p.name for p in event.new_parameters])
+            self._remove_names(
+                event.node, [p.name for p in event.deleted_parameters])
+        self._notify(event.node)
+
+    def _add_names(self, node_name, names):
+        # Called with _lock held.
+        self._names_by_node[node_name].update(names)
+        for name in names:
+            self._nodes_by_name.setdefault(name, set()).add(node_name)
+
+    def _remove_names(self, node_name, names):
+        # Called with _lock held.
+        node_names = self._names_by_node.get(node_name)
+        if node_names is not None:
+            node_names.difference_update(names)
+        for name in names:
+            nodes = self._nodes_by_name.get(name)
+            if nodes is None:
+                continue
+            nodes.discard(node_name)
+            if not nodes:
+                del self._nodes_by_name[name]
+
+    def _notify(self, node_name):
+        for listener in list(self._listeners):
+            listener(node_name)
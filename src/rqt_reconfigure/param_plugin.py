@@ -28,10 +28,13 @@
 #
 # Author: Isaac Saito
 
+import argparse
+
 from rqt_gui_py.plugin import Plugin
 
 from rqt_py_common.plugin_container_widget import PluginContainerWidget
 
+from rqt_reconfigure.param_editors import EditorWidgetPool
 from rqt_reconfigure.param_widget import ParamWidget
 
 
@@ -41,7 +44,8 @@ class ParamPlugin(Plugin):
         super(ParamPlugin, self).__init__(context)
         self.setObjectName('ParamPlugin')
 
-        self._plugin_widget = ParamWidget(context)
+        args = self._parse_args(context.argv())
+        self._plugin_widget = ParamWidget(context, args=args)
         self._widget = PluginContainerWidget(self._plugin_widget, True, False)
         if context.serial_number() > 1:
             self._widget.setWindowTitle(self._widget.windowTitle() +
@@ -57,8 +61,29 @@ class ParamPlugin(Plugin):
     def restore_settings(self, plugin_settings, instance_settings):
         self._widget.restore_settings(plugin_settings, instance_settings)
 
+    def _parse_args(self, argv):
+        parser = argparse.ArgumentParser(prog='rqt_reconfigure', add_help=False)
+        ParamPlugin.add_arguments(parser)
+        return parser.parse_args(argv)
+
     @staticmethod
     def add_arguments(parser):
         group = parser.add_argument_group('Options for rqt_reconfigure plugin')
         group.add_argument('node_name', nargs='*', default=[],
                            help='Node(s) to open automatically')
+        group.add_argument('--content-filter-events', action='store_true',
+                           help='Let the middleware filter parameter events by '
+                                'node name, if the RMW implementation supports it')
+        group.add_argument('--namespace', action='append', default=[],
+                           metavar='PATTERN',
+                           help='Only show the nodes in namespaces matching the '
+                                'glob pattern, can be given more than once')
+        group.add_argument('--exclude', action='append', default=[],
+                           metavar='PATTERN',
+                           help='Hide the nodes whose name matches the glob '
+                                'pattern, can be given more than once')
+        group.add_argument('--editor-pool-size', type=int,
+                           default=EditorWidgetPool.DEFAULT_MAX_SIZE_PER_TYPE,
+                           metavar='N',
+                           help='Keep up to N editors per parameter type for '
+                                'reuse once their parameters are closed')
@@ -0,0 +1,196 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from threading import Lock
+
+from rclpy.task import Future
+
+
+class ParameterStore(object):
+    """
+    In-memory copy of the parameters of a single remote node.
+
+    The store is filled once with a list and a get request and then kept
+    current by applying parameter events, so reads don't need any service
+    call in the steady state. Events may get lost while the node doesn't
+    answer, or when it restarts, so the owner resyncs or invalidates the
+    store then.
+
+    :type param_client: rqt_reconfigure.param_api.ParamClient
+    """
+
+    def __init__(self, param_client):
+        self._param_client = param_client
+        self._lock = Lock()
+        # { name : Parameter }, in the order reported by the node.
+        self._parameters = {}
+        self._synced = False
+        self._sync_future = None
+        # Parameters touched by events while a sync is in flight, which take
+        # precedence over the possibly older values in the sync reply.
+        # { name : Parameter, or None if deleted }
+        self._pending_changes = {}
+        # { name : ParameterDescriptor }
+        self._descriptors = {}
+
+    def is_synced(self):
+        return self._synced
+
+    def invalidate(self):
+        """Forget the cached parameters; the next read triggers a resync."""
+        with self._lock:
+            self._synced = False
+            self._sync_future = None
+            self._parameters = {}
+            self._pending_changes = {}
+            self._descriptors = {}
+
+    def resync_async(self):
+        """
+        Fetch all parameters of the node again.
+
+        :rtype: rclpy.task.Future resolving to a list of Parameter
+        """
+        with self._lock:
+            if self._sync_future is not None and not self._sync_future.done():
+                return self._sync_future
+            result_future = Future()
+            self._sync_future = result_future
+            self._pending_changes = {}
+        self._param_client.get_all_parameters_async().add_done_callback(
+            lambda future: self._handle_sync_done(result_future, future))
+        return result_future
+
+    def _handle_sync_done(self, result_future, future):
+        try:
+            parameters = future.result()
+        except Exception as e:
+            with self._lock:
+                if self._sync_future is result_future:
+                    self._sync_future = None
+            result_future.set_exception(e)
+            return
+        with self._lock:
+            if self._sync_future is not result_future:
+                # Invalidated while the request was in flight.
+                result_future.set_result(parameters)
+                return
+            self._parameters = {p.name: p for p in parameters}
+            for name, parameter in self._pending_changes.items():
+                if parameter is None:
+                    self._parameters.pop(name, None)
+                else:
+                    self._parameters[name] = parameter
+            self._pending_changes = {}
+            self._synced = True
+            parameters = list(self._parameters.values())
+        result_future.set_result(parameters)
+
+    def get_all_parameters_async(self):
+        """
+        Get all parameters, from memory once the store is synced.
+
+        :rtype: rclpy.task.Future resolving to a list of Parameter
+        """
+        with self._lock:
+            if self._synced:
+                future = Future()
+                future.set_result(list(self._parameters.values()))
+                return future
+        return self.resync_async()
+
+    def list_parameters(self):
+        """
+        Get the cached parameter names.
+
+        :rtype: list of str. Empty if the store isn't synced yet.
+        """
+        with self._lock:
+            return list(self._parameters)
+
+    def get_parameters(self, names):
+        """
+        Get the cached values of the given parameters.
+
+        Names that aren't known are skipped.
+
+        :rtype: list of Parameter
+        """
+        with self._lock:
+            return [self._parameters[name] for name in names
+                    if name in self._parameters]
+
+    def get_descriptors_async(self, names):
+        """
+        Get the descriptors of the given parameters.
+
+        Descriptors that aren't cached yet are fetched in one batch.
+
+        :rtype: rclpy.task.Future resolving to a list of ParameterDescriptor
+        """
+        names = list(names)
+        result_future = Future()
+        with self._lock:
+            known = {n: self._descriptors[n] for n in names if n in self._descriptors}
+        missing = [n for n in names if n not in known]
+        if not missing:
+            result_future.set_result([known[n] for n in names])
+            return result_future
+
+        def _on_done(future):
+            try:
+                descriptors = future.result()
+            except Exception as e:
+                result_future.set_exception(e)
+                return
+            fetched = dict(zip(missing, descriptors))
+            with self._lock:
+                self._descriptors.update(fetched)
+            known.update(fetched)
+            result_future.set_result([known[n] for n in names])
+
+        self._param_client.describe_parameters_async(missing).add_done_callback(_on_done)
+        return result_future
+
+    def apply_event(self, new_parameters, changed_parameters, deleted_parameters):
+        with self._lock:
+            # A redeclared parameter may come with a different descriptor.
+            for parameter in new_parameters + deleted_parameters:
+                self._descriptors.pop(parameter.name, None)
+            if self._sync_future is not None and not self._sync_future.done():
+                # Also while resyncing, as the reply replaces the cache.
+                for parameter in new_parameters + changed_parameters:
+                    self._pending_changes[parameter.name] = parameter
+                for parameter in deleted_parameters:
+                    self._pending_changes[parameter.name] = None
+            if not self._synced:
+                return
+            for parameter in new_parameters + changed_parameters:
+                self._parameters[parameter.name] = parameter
+            for parameter in deleted_parameters:
+                self._parameters.pop(parameter.name, None)
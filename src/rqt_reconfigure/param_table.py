@@ -0,0 +1,380 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+from bisect import bisect_left
+
+from python_qt_binding.QtCore import QAbstractTableModel, QLocale, QModelIndex, Qt
+try:
+    from python_qt_binding.QtCore import QSortFilterProxyModel  # Qt 5
+except ImportError:
+    from python_qt_binding.QtGui import QSortFilterProxyModel  # Qt 4
+from python_qt_binding.QtGui import QDoubleValidator, QIntValidator
+from python_qt_binding.QtWidgets import (QAbstractItemView, QComboBox,
+                                         QHeaderView, QLineEdit, QSpinBox,
+                                         QStyledItemDelegate, QTableView)
+
+from rclpy.parameter import Parameter
+from rqt_reconfigure import logging
+from rqt_reconfigure.param_editors import (
+    EDITOR_TYPES, format_array_value, parse_array_value, parse_enum_constraints,
+    queue_set_parameter)
+
+NAME_COLUMN = 0
+VALUE_COLUMN = 1
+
+# Roles under which the model hands out the Parameter and its descriptor.
+PARAMETER_ROLE = Qt.UserRole
+DESCRIPTOR_ROLE = Qt.UserRole + 1
+
+_ARRAY_TYPES = frozenset([
+    Parameter.Type.BOOL_ARRAY, Parameter.Type.BYTE_ARRAY,
+    Parameter.Type.INTEGER_ARRAY, Parameter.Type.DOUBLE_ARRAY,
+    Parameter.Type.STRING_ARRAY,
+])
+
+
+class _ParameterRow(object):
+    __slots__ = ('parameter', 'descriptor', 'type', 'enum')
+
+    def __init__(self, parameter, descriptor):
+        self.parameter = parameter
+        self.descriptor = descriptor
+        self.type = Parameter.Type(descriptor.type)
+        # ( list of names, list of values ) of enum parameters.
+        self.enum = None
+        if descriptor.additional_constraints != '':
+            try:
+                self.enum = parse_enum_constraints(descriptor)[:2]
+            except:  # noqa: E722
+                logging.error(
+                    'Malformed enum of parameter {}'.format(parameter.name))
+
+    def format_value(self):
+        value = self.parameter.value
+        if self.enum is not None and value in self.enum[1]:
+            return '{} ({})'.format(
+                self.enum[0][self.enum[1].index(value)], value)
+        if self.type in _ARRAY_TYPES:
+            return format_array_value(value)
+        return str(value)
+
+
+class ParameterTableModel(QAbstractTableModel):
+    """
+    Flat model of the parameters of a single node, sorted by name.
+
+    Rows hold nothing but the Parameter and its descriptor, so the model
+    stays cheap for nodes with many thousands of parameters. Edits are
+    written to the node right away.
+
+    :type param_client: rqt_reconfigure.param_api.ParamClient
+    """
+
+    def __init__(self, param_client, parent=None):
+        super(ParameterTableModel, self).__init__(parent)
+        self._param_client = param_client
+        # Sorted names, and the rows in the same order.
+        self._names = []
+        self._rows = []
+
+    def _find_row(self, name):
+        i = bisect_left(self._names, name)
+        if i < len(self._names) and self._names[i] == name:
+            return i
+        return -1
+
+    def get_names(self):
+        return list(self._names)
+
+    def add_parameters(self, parameters, descriptors):
+        """
+        Add rows for the parameters, or update them if already shown.
+
+        :type parameters: list of rclpy.parameter.Parameter
+        :type descriptors: list of rcl_interfaces.msg.ParameterDescriptor
+        """
+        rows = [_ParameterRow(parameter, descriptor)
+                for parameter, descriptor in zip(parameters, descriptors)
+                if descriptor.additional_constraints != '' or
+                Parameter.Type(descriptor.type) in EDITOR_TYPES]
+        if not self._rows:
+            # Fill an empty model in one go rather than row by row.
+            rows = sorted({row.parameter.name: row for row in rows}.items())
+            if not rows:
+                return
+            self.beginResetModel()
+            self._names = [name for name, _ in rows]
+            self._rows = [row for _, row in rows]
+            self.endResetModel()
+            return
+        for row in rows:
+            name = row.parameter.name
+            i = bisect_left(self._names, name)
+            if i < len(self._names) and self._names[i] == name:
+                self._rows[i] = row
+                self._emit_row_changed(i)
+                continue
+            self.beginInsertRows(QModelIndex(), i, i)
+            self._names.insert(i, name)
+            self._rows.insert(i, row)
+            self.endInsertRows()
+
+    def update_parameters(self, parameters):
+        for parameter in parameters:
+            i = self._find_row(parameter.name)
+            if i < 0:
+                continue
+            self._rows[i].parameter = parameter
+            self._emit_row_changed(i)
+
+    def remove_parameters(self, parameters):
+        for parameter in parameters:
+            i = self._find_row(parameter.name)
+            if i < 0:
+                continue
+            self.beginRemoveRows(QModelIndex(), i, i)
+            del self._names[i]
+            del self._rows[i]
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._names = []
+        self._rows = []
+        self.endResetModel()
+
+    def _emit_row_changed(self, i):
+        index = self.index(i, VALUE_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def rowCount(self, parent=QModelIndex()):  # noqa: N802
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):  # noqa: N802
+        return 0 if parent.isValid() else 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):  # noqa: N802
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ('Name', 'Value')[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == PARAMETER_ROLE:
+            return row.parameter
+        if role == DESCRIPTOR_ROLE:
+            return row.descriptor
+        if role == Qt.ToolTipRole:
+            return row.descriptor.description
+        if index.column() == NAME_COLUMN:
+            return row.parameter.name if role == Qt.DisplayRole else None
+        if row.type == Parameter.Type.BOOL and row.enum is None:
+            # Booleans are toggled in place by their check box.
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if row.parameter.value else Qt.Unchecked
+            return None
+        if role == Qt.DisplayRole:
+            return row.format_value()
+        if role == Qt.EditRole:
+            return row.parameter.value
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if not index.isValid() or index.column() != VALUE_COLUMN:
+            return flags
+        row = self._rows[index.row()]
+        if row.descriptor.read_only:
+            return flags
+        if row.type == Parameter.Type.BOOL and row.enum is None:
+            return flags | Qt.ItemIsUserCheckable
+        return flags | Qt.ItemIsEditable
+
+    def setData(self, index, value, role=Qt.EditRole):  # noqa: N802
+        if not index.isValid() or index.column() != VALUE_COLUMN:
+            return False
+        row = self._rows[index.row()]
+        if role == Qt.CheckStateRole:
+            value = value == Qt.Checked
+        elif role != Qt.EditRole:
+            return False
+        if value == row.parameter.value:
+            return False
+        row.parameter = Parameter(
+            name=row.parameter.name, type_=row.parameter.type_, value=value)
+        self._emit_row_changed(index.row())
+        queue_set_parameter(self._param_client, row.parameter)
+        return True
+
+
+class ParameterItemDelegate(QStyledItemDelegate):
+    """Creates the editor matching the type of a parameter for its cell."""
+
+    def createEditor(self, parent, option, index):  # noqa: N802
+        parameter = index.data(PARAMETER_ROLE)
+        descriptor = index.data(DESCRIPTOR_ROLE)
+        if descriptor.additional_constraints != '':
+            editor = QComboBox(parent)
+            try:
+                names, values, _ = parse_enum_constraints(descriptor)
+            except:  # noqa: E722
+                return None
+            editor.addItems(['{} ({})'.format(name, value)
+                             for name, value in zip(names, values)])
+            return editor
+        if parameter.type_ == Parameter.Type.INTEGER and \
+                len(descriptor.integer_range) > 0:
+            integer_range = descriptor.integer_range[0]
+            editor = QSpinBox(parent)
+            editor.setRange(int(integer_range.from_value),
+                            int(integer_range.to_value))
+            editor.setSingleStep(max(int(integer_range.step), 1))
+            return editor
+        editor = QLineEdit(parent)
+        if parameter.type_ == Parameter.Type.INTEGER:
+            editor.setValidator(QIntValidator(editor))
+        elif parameter.type_ == Parameter.Type.DOUBLE:
+            if len(descriptor.floating_point_range) > 0:
+                floating_point_range = descriptor.floating_point_range[0]
+                validator = QDoubleValidator(
+                    floating_point_range.from_value,
+                    floating_point_range.to_value, 8, editor)
+            else:
+                validator = QDoubleValidator(editor)
+            validator.setLocale(QLocale(QLocale.C))
+            editor.setValidator(validator)
+        return editor
+
+    def setEditorData(self, editor, index):  # noqa: N802
+        parameter = index.data(PARAMETER_ROLE)
+        if isinstance(editor, QComboBox):
+            _, values, _ = parse_enum_constraints(index.data(DESCRIPTOR_ROLE))
+            if parameter.value in values:
+                editor.setCurrentIndex(values.index(parameter.value))
+        elif isinstance(editor, QSpinBox):
+            editor.setValue(int(parameter.value))
+        elif parameter.type_ in _ARRAY_TYPES:
+            editor.setText(format_array_value(parameter.value))
+        else:
+            editor.setText(str(parameter.value))
+
+    def setModelData(self, editor, model, index):  # noqa: N802
+        parameter = index.data(PARAMETER_ROLE)
+        try:
+            if isinstance(editor, QComboBox):
+                _, values, _ = parse_enum_constraints(
+                    index.data(DESCRIPTOR_ROLE))
+                value = values[editor.currentIndex()]
+            elif isinstance(editor, QSpinBox):
+                value = editor.value()
+            elif parameter.type_ == Parameter.Type.INTEGER:
+                value = int(editor.text())
+            elif parameter.type_ == Parameter.Type.DOUBLE:
+                value = float(editor.text())
+            elif parameter.type_ in _ARRAY_TYPES:
+                value = parse_array_value(parameter, editor.text())
+            else:
+                value = editor.text()
+        except (IndexError, ValueError) as e:
+            logging.warn("Invalid value for parameter '{}': {}".format(
+                parameter.name, e))
+            return
+        model.setData(index, value, Qt.EditRole)
+
+
+class _ParameterFilterProxyModel(QSortFilterProxyModel):
+
+    def __init__(self, parent=None):
+        super(_ParameterFilterProxyModel, self).__init__(parent)
+        self._name_filter = None
+
+    def set_name_filter(self, name_filter):
+        self._name_filter = name_filter
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):  # noqa: N802
+        if self._name_filter is None:
+            return True
+        return self._name_filter(self.sourceModel().index(
+            source_row, NAME_COLUMN, source_parent).data())
+
+
+class ParameterTableView(QTableView):
+    """
+    Table editor of the parameters of a single node.
+
+    Only the visible rows are painted and only the cell being edited gets an
+    editor widget, unlike GroupWidget which keeps one editor per parameter.
+
+    :type param_client: rqt_reconfigure.param_api.ParamClient
+    """
+
+    def __init__(self, param_client, parent=None):
+        super(ParameterTableView, self).__init__(parent)
+        self._model = ParameterTableModel(param_client, self)
+        self._proxy_model = _ParameterFilterProxyModel(self)
+        self._proxy_model.setSourceModel(self._model)
+        self.setModel(self._proxy_model)
+        self.setItemDelegateForColumn(
+            VALUE_COLUMN, ParameterItemDelegate(self))
+
+        # Rows of a fixed height spare the view from measuring every row.
+        vertical_header = self.verticalHeader()
+        vertical_header.hide()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.fontMetrics().height() + 8)
+        horizontal_header = self.horizontalHeader()
+        horizontal_header.setStretchLastSection(True)
+        horizontal_header.resizeSection(NAME_COLUMN, 250)
+
+        self.setWordWrap(False)
+        self.setAlternatingRowColors(True)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.DoubleClicked |
+                             QAbstractItemView.SelectedClicked |
+                             QAbstractItemView.EditKeyPressed)
+        self.setMinimumHeight(300)
+
+    def get_model(self):
+        """
+        Get the model of the parameters shown.
+
+        :rtype: ParameterTableModel
+        """
+        return self._model
+
+    def set_name_filter(self, name_filter):
+        """
+        Only show the rows of the matching parameters.
+
+        :param name_filter: callable telling whether to show a parameter
+                            name, or None to show all of them
+        """
+        self._proxy_model.set_name_filter(name_filter)
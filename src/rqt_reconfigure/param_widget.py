@@ -37,8 +37,11 @@ from python_qt_binding.QtWidgets import (
     QHBoxLayout, QLabel, QSplitter, QVBoxLayout, QWidget
 )
 
-from rqt_reconfigure import logging
+from rqt_reconfigure.gui_thread import init_gui_thread_dispatcher
 from rqt_reconfigure.node_selector_widget import NodeSelectorWidget
+from rqt_reconfigure.param_api import (
+    close_param_clients, get_parameter_event_dispatcher)
+from rqt_reconfigure.param_editors import get_editor_widget_pool
 from rqt_reconfigure.paramedit_widget import ParameditWidget
 from rqt_reconfigure.text_filter import TextFilter
 from rqt_reconfigure.text_filter_widget import TextFilterWidget
@@ -54,7 +57,7 @@ class ParamWidget(QWidget):
     # To make selections from CLA
     sig_selected = Signal(str, bool)
 
-    def __init__(self, context, node=None):
+    def __init__(self, context, node=None, args=None):
         """
         Init param widget.
 
@@ -67,11 +70,25 @@ class ParamWidget(QWidget):
         (12/27/2012) Despite the pkg name is changed to rqt_reconfigure to
         reflect the available functionality, file & class names remain
         'param', expecting all the parameters will become handle-able.
+
+        :param args: parsed plugin arguments, see ParamPlugin.add_arguments
+        :type args: argparse.Namespace
         """
         super(ParamWidget, self).__init__()
         self.setObjectName(self._TITLE_PLUGIN)
         self.setWindowTitle(self._TITLE_PLUGIN)
 
+        # Replies to asynchronous service calls are handed over to the GUI
+        # thread through this dispatcher, so it has to live in this thread.
+        init_gui_thread_dispatcher()
+
+        self._node = context.node
+        if args is not None:
+            get_parameter_event_dispatcher(context.node).set_content_filter(
+                args.content_filter_events)
+            get_editor_widget_pool().set_max_size_per_type(
+                args.editor_pool_size)
+
         # TODO: .ui file needs to replace the GUI components declaration
         #       below. For unknown reason, referring to another .ui files
         #       from a .ui that is used in this class failed. So for now,
@@ -94,7 +111,9 @@ class ParamWidget(QWidget):
         _hlayout_filter.addWidget(self.filter_lineedit)
         _hlayout_filter_widget.setLayout(_hlayout_filter)
         self._nodesel_widget = NodeSelectorWidget(
-            self, context, self.sig_sysmsg
+            self, context, self.sig_sysmsg,
+            namespaces=args.namespace if args is not None else None,
+            excludes=args.exclude if args is not None else None
         )
         _vlayout_nodesel_side.addWidget(_hlayout_filter_widget)
         _vlayout_nodesel_side.addWidget(self._nodesel_widget)
@@ -133,12 +152,18 @@ class ParamWidget(QWidget):
         # Signal from widget to open a new editor widget
         self.sig_selected.connect(self._nodesel_widget.node_selected)
 
-        self._explicit_nodes_to_select = list(context.argv())
+        if args is not None:
+            self._explicit_nodes_to_select = list(args.node_name)
+        else:
+            self._explicit_nodes_to_select = list(context.argv())
 
     def shutdown(self):
         # TODO: Needs implemented. Trigger dynamic_reconfigure to unlatch
         #       subscriber.
-        pass
+        self._nodesel_widget.shutdown()
+        # Clients kept for reuse would otherwise be closed after the node is
+        # gone.
+        close_param_clients(self._node)
 
     def save_settings(self, plugin_settings, instance_settings):
         instance_settings.set_value('splitter', self._splitter.saveState())
@@ -163,14 +188,11 @@ class ParamWidget(QWidget):
             nodes_to_select = instance_settings.value('selected_nodes') or []
             explicit = False
 
+        # Nodes that aren't in the tree yet are selected once they show up.
         for rn in nodes_to_select:
-            if rn in self._nodesel_widget.get_nodeitems():
+            if explicit or rn in self._nodesel_widget.get_nodeitems() or \
+                    self._nodesel_widget.is_loading():
                 self.sig_selected.emit(rn, explicit)
-            elif explicit:
-                logging.warn(
-                    'Could not find a dynamic reconfigure client'
-                    " named '{}'".format(str(rn))
-                )
 
     def get_filter_text(self):
         return self.filter_lineedit.text()
@@ -29,16 +29,14 @@
 # Author: Isaac Saito, Ze'ev Klapow
 
 from collections import OrderedDict
-import os
 
-from ament_index_python import get_resource
-from python_qt_binding import loadUi
 from python_qt_binding.QtCore import Signal
 from python_qt_binding.QtWidgets import QVBoxLayout, QWidget, QWidgetItem
 
 from rqt_py_common.layout_util import LayoutUtil
 
 from rqt_reconfigure import logging
+from rqt_reconfigure.ui_cache import load_ui
 
 
 class ParameditWidget(QWidget):
@@ -56,10 +54,7 @@ class ParameditWidget(QWidget):
     def __init__(self):
         super(ParameditWidget, self).__init__()
 
-        _, package_path = get_resource('packages', 'rqt_reconfigure')
-        ui_file = os.path.join(package_path, 'share', 'rqt_reconfigure',
-                               'resource', 'paramedit_pane.ui')
-        loadUi(ui_file, self, {'ParameditWidget': ParameditWidget})
+        load_ui('paramedit_pane.ui', self, {'ParameditWidget': ParameditWidget})
 
         self._param_client_widgets = OrderedDict()
 
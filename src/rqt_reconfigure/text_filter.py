@@ -33,6 +33,16 @@ from python_qt_binding.QtCore import QRegExp, Qt
 from rqt_console.filters.message_filter import MessageFilter
 
 
+def fuzzy_match(query, text):
+    """
+    Tell whether the characters of the query appear in the text in order.
+
+    Case is ignored, so 'mxvel' matches 'max_velocity'.
+    """
+    text = iter(text.lower())
+    return all(c in text for c in query.lower())
+
+
 class TextFilter(MessageFilter):
     """
     Provides a filtering feature for text set by set_text.
@@ -44,6 +54,8 @@ class TextFilter(MessageFilter):
     def __init__(self, qregexp=None):
         super(TextFilter, self).__init__()
         self._regexp = qregexp
+        # Text self.regex was compiled from.
+        self._regex_text = None
 
     def test_message(self, text):
         """
@@ -74,15 +86,24 @@ class TextFilter(MessageFilter):
         """
         Setter for _text.
 
+        Unlike MessageFilter.set_text, the change is emitted right away: the
+        input widget already debounces typing, so delaying it once more
+        would only add up the delays.
+
         :param text: text to set ''str''
-        :emits filter_changed_signal: If _enabled is true
+        :emits filter_changed_signal: If _enabled is true and text changed
         """
-        super(TextFilter, self).set_text(text)
-
+        # The pattern is only compiled again if the text changed.
+        if text == self._regex_text:
+            return
+        self._text = text
+        self._regex_text = text
         syntax_nr = QRegExp.RegExp
         syntax = QRegExp.PatternSyntax(syntax_nr)
         self.regex = QRegExp(text, Qt.CaseInsensitive, syntax)
-        self.set_regex(self.regex)
+        self._regex = self.regex
+        if self.is_enabled():
+            self.filter_changed_signal.emit()
 
     def get_text(self):
         return self._text
@@ -26,13 +26,11 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-import os
-
-from ament_index_python import get_resource
-
-from python_qt_binding import loadUi
+from python_qt_binding.QtCore import QTimer
 from python_qt_binding.QtWidgets import QWidget
 
+from rqt_reconfigure.ui_cache import load_ui
+
 
 class TextFilterWidget(QWidget):
     """
@@ -40,8 +38,13 @@ class TextFilterWidget(QWidget):
 
     Only modification from it is .ui
     file in use that takes more generic form (only textfiedl).
+
+    The filter is only updated once typing pauses, or Return is pressed.
     """
 
+    # Changes of the text within this delay are handled at once.
+    _DEBOUNCE_DELAY_MS = 300
+
     def __init__(self, parentfilter, display_list_args=None):
         """
         Widget for displaying interactive data related to text filtering.
@@ -54,17 +57,17 @@ class TextFilterWidget(QWidget):
         :param display_list_args: empty list, ''list''
         """
         super(TextFilterWidget, self).__init__()
-        _, package_path = get_resource('packages', 'rqt_reconfigure')
-        ui_file = os.path.join(
-            package_path, 'share', 'rqt_reconfigure', 'resource',
-            'text_filter_widget.ui'
-        )
-        loadUi(ui_file, self)
+        load_ui('text_filter_widget.ui', self)
         self.setObjectName('TextFilterWidget')
         # When data is changed it is stored in the parent filter
         self._parentfilter = parentfilter
 
-        self.text_edit.textChanged.connect(self.handle_text_changed)
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(self._DEBOUNCE_DELAY_MS)
+        self._debounce_timer.timeout.connect(self.handle_text_changed)
+        self.text_edit.textChanged.connect(self._handle_text_edited)
+        self.text_edit.returnPressed.connect(self.handle_text_changed)
 
         self.handle_text_changed()
 
@@ -76,7 +79,11 @@ class TextFilterWidget(QWidget):
         """
         self.text_edit.setText(text)
 
+    def _handle_text_edited(self, text):
+        self._debounce_timer.start()
+
     def handle_text_changed(self):
+        self._debounce_timer.stop()
         self._parentfilter.set_text(self.text_edit.text())
 
     def repopulate(self):
@@ -27,46 +27,426 @@
 # POSSIBILITY OF SUCH DAMAGE.
 #
 # Author: Isaac Saito
-
 from __future__ import division
 
-from python_qt_binding.QtGui import QStandardItemModel
+from bisect import bisect_left
 
-from rqt_reconfigure import logging
+from python_qt_binding.QtCore import (
+    QAbstractItemModel, QModelIndex, QPersistentModelIndex, Qt)
+from python_qt_binding.QtGui import QBrush
 
+from rqt_reconfigure.treenode_qstditem import TreenodeQstdItem
 
-class TreenodeItemModel(QStandardItemModel):
-    """
-    This class is made only for this purpose.
 
-    To hold QStandardItem instances
-    associated with QModelIndex. QStandardItemModel has methods to return it
-    by index called itemFromIndex, but in some cases the method doesn't work
-    for unknown reasons. Ref. question asked:
-    http://stackoverflow.com/questions/14646979/strange-index-values-from-qstandarditemmodel
+class _Treenode(object):
+    """A namespace or a node in the tree, and its children sorted by name."""
+
+    __slots__ = ('name', 'path', 'parent', 'child_names', 'children',
+                 'fetched', 'is_ros_node', 'unresponsive', 'item',
+                 'param_rows')
+
+    def __init__(self, name, parent):
+        self.name = name
+        # GRN of the namespace or node.
+        self.path = parent.path + '/' + name if parent is not None else ''
+        self.parent = parent
+        # Sorted names of the children, to find and insert them by bisection.
+        self.child_names = []
+        # { str : _Treenode }
+        self.children = {}
+        # Number of leading children exposed to the views.
+        self.fetched = 0
+        self.is_ros_node = False
+        self.unresponsive = False
+        # TreenodeQstdItem, created once asked for.
+        self.item = None
+        # Parameter names shown below a terminal treenode while filtering.
+        self.param_rows = []
+
+
+class _ParamRow(object):
+
+    __slots__ = ('name', 'parent')
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+
 
-    :author: Isaac Saito
+class TreenodeItemModel(QAbstractItemModel):
     """
+    Model of the tree of namespaces and nodes, backed by a trie.
 
-    def __init__(self, parent=None):
+    Inserting or removing a node only touches the treenodes on its path, and
+    siblings are found by bisection, so building the tree scales with the
+    number of nodes. A namespace exposes its children in batches of
+    _FETCH_BATCH_SIZE, views fetch the rest on demand. The TreenodeQstdItem
+    that holds the editor of a node is only created once it is asked for.
+    """
+
+    _FETCH_BATCH_SIZE = 1000
+
+    def __init__(self, context, parent=None):
         super(TreenodeItemModel, self).__init__(parent)
         self._parent = parent
+        self._context = context
+
+        self._root = _Treenode('', None)
+        # { str : _Treenode } of the ROS nodes in the tree.
+        self._ros_nodes = {}
+        # { str : QPersistentModelIndex } of the treenodes looked up so far.
+        # Qt keeps them up to date as rows come and go.
+        self._indexes = {}
+
+    def add_node(self, grn):
+        """
+        Add the treenodes of a node and of the namespaces it is in.
+
+        :type grn: str
+        :return: False if the node was in the tree already.
+        """
+        if grn in self._ros_nodes:
+            return False
+        names = grn.split('/')[1:]
+        treenode = self._root
+        for depth, name in enumerate(names):
+            child = treenode.children.get(name)
+            if child is None:
+                # Build the missing part of the path first, so the views are
+                # told about a single new row.
+                top = child = _Treenode(name, treenode)
+                for name_below in names[depth + 1:]:
+                    grandchild = _Treenode(name_below, child)
+                    child.child_names.append(name_below)
+                    child.children[name_below] = grandchild
+                    child.fetched = 1
+                    child = grandchild
+                child.is_ros_node = True
+                self._insert_child(treenode, top)
+                treenode = child
+                break
+            treenode = child
+        else:
+            # The namespace of other nodes is a node on its own, too.
+            treenode.is_ros_node = True
+        self._ros_nodes[grn] = treenode
+        return True
+
+    def remove_node(self, grn):
+        """
+        Remove the treenode of a node, and the namespaces left empty.
 
-        self._indexes = {}  # { str : QPersistentModelIndex }
+        :type grn: str
+        :return: False if the node wasn't in the tree.
+        """
+        treenode = self._ros_nodes.pop(grn, None)
+        if treenode is None:
+            return False
+        self._indexes.pop(grn, None)
+        if treenode.item is not None:
+            treenode.item.reset()
+            treenode.item = None
+        treenode.is_ros_node = False
+        treenode.unresponsive = False
+        self._clear_param_rows(treenode)
+        if treenode.children:
+            # Still the namespace of other nodes.
+            return True
+        while (treenode.parent is not self._root and
+                len(treenode.parent.children) == 1 and
+                not treenode.parent.is_ros_node):
+            treenode = treenode.parent
+        self._remove_child(treenode.parent, treenode)
+        return True
+
+    def has_node(self, grn):
+        return grn in self._ros_nodes
+
+    def get_node_names(self):
+        """
+        Get the GRNs of the nodes in the tree.
+
+        :rtype: collection of str
+        """
+        return self._ros_nodes.keys()
+
+    def get_item(self, grn):
+        """
+        Get the item of a node, creating it if needed.
+
+        :rtype: TreenodeQstdItem. None if the node isn't in the tree.
+        """
+        treenode = self._ros_nodes.get(grn)
+        if treenode is None:
+            return None
+        if treenode.item is None:
+            treenode.item = TreenodeQstdItem(
+                self._context, grn, TreenodeQstdItem.NODE_FULLPATH)
+        return treenode.item
 
     def get_index_from_grn(self, grn):
         """
-        Get the index from grn.
+        Get the index of a node or a namespace.
+
+        The treenodes on its path are fetched if needed.
 
         :type grn: str
-        :rtype: QPersistentModelIndex. None if the corresponding item isn't
-                found.
+        :rtype: QModelIndex. Invalid if the treenode isn't in the tree.
+        """
+        qpindex = self._indexes.get(grn)
+        if qpindex is not None and qpindex.isValid():
+            return QModelIndex(qpindex)
+        treenode = self._find_treenode(grn)
+        if treenode is None:
+            self._indexes.pop(grn, None)
+            return QModelIndex()
+        self._expose(treenode)
+        index = self._index_of(treenode)
+        self._indexes[grn] = QPersistentModelIndex(index)
+        return index
+
+    def _find_treenode(self, grn):
+        treenode = self._ros_nodes.get(grn)
+        if treenode is not None:
+            return treenode
+        treenode = self._root
+        for name in grn.split('/')[1:]:
+            treenode = treenode.children.get(name)
+            if treenode is None:
+                return None
+        return treenode if treenode is not self._root else None
+
+    def get_filter_entry(self, index):
+        """
+        Get the entry behind an index, as used by the get_filter_* methods.
+
+        Entries stay the same as long as their row is in the model, unlike
+        indexes.
+        """
+        return index.internalPointer()
+
+    def get_filter_entry_from_grn(self, grn):
+        """:return: entry of a node, None if the node isn't in the tree."""
+        return self._ros_nodes.get(grn)
+
+    def iter_filter_entries(self, entry=None):
+        """
+        Iterate over the treenodes below an entry, including unfetched ones.
+
+        :param entry: the whole tree if None.
+        """
+        stack = [entry if entry is not None else self._root]
+        while stack:
+            treenode = stack.pop()
+            if isinstance(treenode, _ParamRow):
+                continue
+            for child in treenode.children.values():
+                yield child
+                stack.append(child)
+
+    def get_filter_parent(self, entry):
+        """:return: parent entry, None for top level entries."""
+        parent = entry.parent
+        return parent if parent is not self._root else None
+
+    def get_filter_target(self, entry):
+        """
+        Get the text that the filter query is matched against.
+
+        :return: GRN of a treenode. None for parameter rows, which are only
+                 there for parameter names that matched.
+        """
+        if isinstance(entry, _ParamRow):
+            return None
+        return entry.path
+
+    def set_node_unresponsive(self, grn, unresponsive):
+        """Grey out the treenode of a node that stopped answering."""
+        treenode = self._ros_nodes.get(grn)
+        if treenode is None or treenode.unresponsive == unresponsive:
+            return
+        treenode.unresponsive = unresponsive
+        if self._is_exposed(treenode):
+            index = self._index_of(treenode)
+            self.dataChanged.emit(index, index)
+
+    def set_param_names(self, grn, param_names):
+        """
+        Show parameter names of a terminal treenode below it.
+
+        :param param_names: sequence of str, replaces the names shown.
         """
-        logging.debug('get_index_from_grn all item={}'.format(self._indexes))
-        return self._indexes.get(grn)
+        treenode = self._ros_nodes.get(grn)
+        if treenode is None or treenode.children:
+            return
+        if [row.name for row in treenode.param_rows] == list(param_names):
+            return
+        self._clear_param_rows(treenode)
+        if not param_names:
+            return
+        exposed = self._is_exposed(treenode)
+        if exposed:
+            self.beginInsertRows(self._index_of(treenode),
+                                 0, len(param_names) - 1)
+        treenode.param_rows = [_ParamRow(name, treenode)
+                               for name in param_names]
+        if exposed:
+            self.endInsertRows()
+
+    def _clear_param_rows(self, treenode):
+        if not treenode.param_rows:
+            return
+        exposed = self._is_exposed(treenode)
+        if exposed:
+            self.beginRemoveRows(self._index_of(treenode),
+                                 0, len(treenode.param_rows) - 1)
+        treenode.param_rows = []
+        if exposed:
+            self.endRemoveRows()
+
+    def _insert_child(self, parent, child):
+        # Parameter rows are only shown below terminal treenodes.
+        self._clear_param_rows(parent)
+        row = bisect_left(parent.child_names, child.name)
+        # Children beyond the exposed ones are left to fetchMore, unless
+        # the namespace is small enough to be shown at once.
+        exposed = (row < parent.fetched or
+                   (parent.fetched == len(parent.children) and
+                    parent.fetched < self._FETCH_BATCH_SIZE))
+        notify = exposed and self._is_exposed(parent)
+        if notify:
+            self.beginInsertRows(self._index_of(parent), row, row)
+        parent.child_names.insert(row, child.name)
+        parent.children[child.name] = child
+        if exposed:
+            parent.fetched += 1
+        if notify:
+            self.endInsertRows()
+
+    def _remove_child(self, parent, child):
+        row = bisect_left(parent.child_names, child.name)
+        exposed = row < parent.fetched
+        notify = exposed and self._is_exposed(parent)
+        if notify:
+            self.beginRemoveRows(self._index_of(parent), row, row)
+        del parent.child_names[row]
+        del parent.children[child.name]
+        if exposed:
+            parent.fetched -= 1
+        if notify:
+            self.endRemoveRows()
+
+    def _row_of(self, treenode):
+        return bisect_left(treenode.parent.child_names, treenode.name)
+
+    def _index_of(self, treenode):
+        if treenode is self._root:
+            return QModelIndex()
+        return self.createIndex(self._row_of(treenode), 0, treenode)
+
+    def _is_exposed(self, treenode):
+        while treenode.parent is not None:
+            if self._row_of(treenode) >= treenode.parent.fetched:
+                return False
+            treenode = treenode.parent
+        return True
+
+    def _expose(self, treenode):
+        path = []
+        while treenode.parent is not None:
+            path.append(treenode)
+            treenode = treenode.parent
+        for treenode in reversed(path):
+            parent = treenode.parent
+            row = self._row_of(treenode)
+            if row >= parent.fetched:
+                self.beginInsertRows(self._index_of(parent),
+                                     parent.fetched, row)
+                parent.fetched = row + 1
+                self.endInsertRows()
+
+    def _entry_from_index(self, index):
+        if not index.isValid():
+            return self._root
+        return index.internalPointer()
+
+    def index(self, row, column, parent=QModelIndex()):
+        """Overridden."""
+        entry = self._entry_from_index(parent)
+        if column != 0 or row < 0 or isinstance(entry, _ParamRow):
+            return QModelIndex()
+        if row < entry.fetched:
+            child = entry.children[entry.child_names[row]]
+            return self.createIndex(row, 0, child)
+        if not entry.children and row < len(entry.param_rows):
+            return self.createIndex(row, 0, entry.param_rows[row])
+        return QModelIndex()
+
+    def parent(self, index):
+        """Overridden."""
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):  # noqa: N802
+        """Overridden."""
+        entry = self._entry_from_index(parent)
+        if isinstance(entry, _ParamRow):
+            return 0
+        if entry.children:
+            return entry.fetched
+        return len(entry.param_rows)
+
+    def columnCount(self, parent=QModelIndex()):  # noqa: N802
+        """Overridden."""
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):  # noqa: N802
+        """Overridden, so that unfetched children can be expanded."""
+        entry = self._entry_from_index(parent)
+        if isinstance(entry, _ParamRow):
+            return False
+        return bool(entry.children or entry.param_rows)
+
+    def canFetchMore(self, parent):  # noqa: N802
+        """Overridden."""
+        entry = self._entry_from_index(parent)
+        return (isinstance(entry, _Treenode) and
+                entry.fetched < len(entry.children))
+
+    def fetchMore(self, parent):  # noqa: N802
+        """Overridden."""
+        entry = self._entry_from_index(parent)
+        if not isinstance(entry, _Treenode):
+            return
+        count = min(len(entry.children) - entry.fetched,
+                    self._FETCH_BATCH_SIZE)
+        if count <= 0:
+            return
+        self.beginInsertRows(parent, entry.fetched,
+                             entry.fetched + count - 1)
+        entry.fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Overridden."""
+        if not index.isValid():
+            return None
+        entry = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return entry.name
+        if isinstance(entry, _ParamRow):
+            if role == Qt.BackgroundRole:
+                return QBrush(Qt.lightGray)
+        elif entry.unresponsive:
+            if role == Qt.ForegroundRole:
+                return QBrush(Qt.gray)
+            if role == Qt.ToolTipRole:
+                return '{} is not responding'.format(entry.path)
+        return None
 
-    def set_item_from_index(self, grn, qpindex):
-        logging.debug('set_item_from_index grn={} qpindex={}'.format(
-            grn, qpindex
-        ))
-        self._indexes[grn] = qpindex
+    def flags(self, index):
+        """Overridden. Treenodes are read-only."""
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
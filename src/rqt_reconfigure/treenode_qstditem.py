@@ -32,8 +32,7 @@ from __future__ import division
 
 import copy
 
-from python_qt_binding.QtCore import Qt
-from python_qt_binding.QtGui import QBrush, QStandardItem
+from python_qt_binding.QtGui import QStandardItem
 
 from rqt_py_common.data_items import ReadonlyItem
 
@@ -67,16 +66,11 @@ class TreenodeQstdItem(ReadonlyItem):
         super(TreenodeQstdItem, self).__init__(grn_current_treenode)
 
         self._context = context
-        self._param_client = None
         # ParamClientWidget
         self._param_client_widget = None
 
     def reset(self):
         self._param_client_widget = None
-        if self._param_client is not None:
-            self._param_client.close()
-            del self._param_client
-            self._param_client = None
 
     def get_param_client_widget(self):
         """
@@ -92,36 +86,15 @@ class TreenodeQstdItem(ReadonlyItem):
                 self._context, self._raw_param_name
             )
             """
-            Creating the ParamClientWidget transfers ownership of the
-            _param_client to it. If it is destroyed from Qt, we need to
-            clear our reference to it and stop the param server thread we
-            had.
+            The ParamClientWidget holds a reference to the shared param
+            client of the node. If it is destroyed from Qt, we need to
+            clear our reference to it.
             """
 
             self._param_client_widget.destroyed.connect(self.reset)
             logging.debug('In get_param_client_widget 5')
         return self._param_client_widget
 
-    def enable_param_items(self):
-        """
-        Create QStdItem per parameter and addColumn them to myself.
-
-        :rtype: None if _param_client is not initiated.
-        """
-        if not self._param_client_widget:
-            return None
-        param_names = self._param_client_widget.get_treenode_names()
-        param_names_items = []
-        brush = QBrush(Qt.lightGray)
-        for param_name in param_names:
-            item = ReadonlyItem(param_name)
-            item.setBackground(brush)
-            param_names_items.append(item)
-        logging.debug('enable_param_items len of param_names={}'.format(
-            len(param_names_items)
-        ))
-        self.appendColumn(param_names_items)
-
     def get_raw_param_name(self):
         return self._raw_param_name
 
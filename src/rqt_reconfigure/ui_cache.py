@@ -0,0 +1,92 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from ament_index_python import get_resource
+
+from python_qt_binding import loadUi, QT_BINDING
+
+from rqt_reconfigure import logging
+
+uic = None
+if QT_BINDING == 'pyqt':
+    try:
+        from PyQt5 import uic
+    except ImportError:
+        pass
+
+_, package_path = get_resource('packages', 'rqt_reconfigure')
+
+# { .ui file name : form class, or None if it couldn't be compiled }
+_form_classes = {}
+
+
+def get_ui_path(ui_name):
+    """Get the path of a .ui file installed with the package."""
+    return os.path.join(
+        package_path, 'share', 'rqt_reconfigure', 'resource', ui_name)
+
+
+def load_ui(ui_name, widget, custom_widgets=None):
+    """
+    Set up the user interface of a .ui file on the widget, like loadUi.
+
+    Each file is compiled into a form class the first time it is used, so
+    its XML is parsed once per process rather than once per widget. Where
+    the Qt binding can't compile .ui files, loadUi is used instead.
+
+    :param ui_name: name of the .ui file in the resource directory
+    :type widget: QWidget
+    :param custom_widgets: { class name : class } of the custom widgets,
+                           only needed by loadUi
+    """
+    if ui_name not in _form_classes:
+        _form_classes[ui_name] = _compile_ui(ui_name)
+    form_class = _form_classes[ui_name]
+    if form_class is None:
+        loadUi(get_ui_path(ui_name), widget, custom_widgets)
+        return
+    form = form_class()
+    form.setupUi(widget)
+    # loadUi makes the children attributes of the widget itself.
+    for name, child in vars(form).items():
+        setattr(widget, name, child)
+
+
+def _compile_ui(ui_name):
+    if uic is None:
+        return None
+    try:
+        form_class, _ = uic.loadUiType(get_ui_path(ui_name))
+    except Exception as e:
+        logging.warn(
+            'Failed to compile {}, falling back to loadUi: {}'.format(
+                ui_name, e))
+        return None
+    return form_class
@@ -0,0 +1,131 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Measure the construction cost of the parameter editors.
+
+Run it with a display, or with QT_QPA_PLATFORM=offscreen:
+
+    python3 test/benchmark_editors.py --count 200
+"""
+
+import argparse
+import sys
+import time
+
+from python_qt_binding import loadUi
+from python_qt_binding.QtWidgets import QApplication, QWidget
+
+from rcl_interfaces.msg import (
+    FloatingPointRange, IntegerRange, ParameterDescriptor)
+from rclpy.parameter import Parameter
+
+from rqt_reconfigure.param_editors import (
+    ArrayEditor, BooleanEditor, DoubleEditor, EnumEditor, IntegerEditor,
+    StringEditor)
+from rqt_reconfigure.ui_cache import get_ui_path, load_ui
+
+_UI_NAMES = [
+    'editor_bool.ui', 'editor_enum.ui', 'editor_number.ui',
+    'editor_string.ui', 'text_filter_widget.ui',
+]
+
+
+def _editor_cases():
+    enum = "{'enum': {'low': 0, 'high': 1}, 'enum_description': 'level'}"
+    return [
+        (BooleanEditor, Parameter('b', value=True), ParameterDescriptor(
+            type=Parameter.Type.BOOL.value)),
+        (IntegerEditor, Parameter('i', value=5), ParameterDescriptor(
+            type=Parameter.Type.INTEGER.value,
+            integer_range=[IntegerRange(from_value=0, to_value=10, step=1)])),
+        (DoubleEditor, Parameter('d', value=0.5), ParameterDescriptor(
+            type=Parameter.Type.DOUBLE.value,
+            floating_point_range=[FloatingPointRange(
+                from_value=0.0, to_value=1.0, step=0.1)])),
+        (StringEditor, Parameter('s', value='text'), ParameterDescriptor(
+            type=Parameter.Type.STRING.value)),
+        (ArrayEditor, Parameter('a', value=[1.0, 2.0]), ParameterDescriptor(
+            type=Parameter.Type.DOUBLE_ARRAY.value)),
+        (EnumEditor, Parameter('e', value=0), ParameterDescriptor(
+            type=Parameter.Type.INTEGER.value, additional_constraints=enum)),
+    ]
+
+
+def _time_per_call(count, create):
+    widgets = []
+    start = time.perf_counter()
+    for _ in range(count):
+        widgets.append(create())
+    elapsed = time.perf_counter() - start
+    for widget in widgets:
+        widget.deleteLater()
+    return elapsed / count * 1e6
+
+
+def _create_with_loadui(ui_name):
+    widget = QWidget()
+    loadUi(get_ui_path(ui_name), widget)
+    return widget
+
+
+def _create_with_load_ui(ui_name):
+    widget = QWidget()
+    load_ui(ui_name, widget)
+    return widget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=200,
+                        help='number of widgets constructed per case')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)  # noqa: F841
+
+    print('{:<24} {:>12} {:>12}'.format('.ui file', 'loadUi [us]', 'load_ui [us]'))
+    for ui_name in _UI_NAMES:
+        # The first load_ui call compiles the file, leave it out.
+        _create_with_load_ui(ui_name).deleteLater()
+        print('{:<24} {:>12.1f} {:>12.1f}'.format(
+            ui_name,
+            _time_per_call(args.count, lambda: _create_with_loadui(ui_name)),
+            _time_per_call(args.count, lambda: _create_with_load_ui(ui_name))))
+
+    print()
+    print('{:<24} {:>12}'.format('editor', 'build [us]'))
+    for editor_class, parameter, descriptor in _editor_cases():
+        print('{:<24} {:>12.1f}'.format(
+            editor_class.__name__,
+            _time_per_call(
+                args.count,
+                lambda: editor_class(None, parameter, descriptor))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from rqt_reconfigure.param_editors import EditorWidgetPool
+
+
+class _Editor(object):
+    # Stands in for an EditorWidget, which needs a running QApplication.
+
+    def __init__(self, param_client, parameter, descriptor):
+        self.bound = (param_client, parameter, descriptor)
+        self.deleted = False
+
+    def rebind(self, param_client, parameter, descriptor):
+        self.bound = (param_client, parameter, descriptor)
+
+    def reset(self):
+        self.bound = None
+
+    def deleteLater(self):  # noqa: N802
+        self.deleted = True
+
+
+class _OtherEditor(_Editor):
+    pass
+
+
+class TestEditorWidgetPool(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._pool = EditorWidgetPool(max_size_per_type=1)
+
+    def test_reuses_editor_of_same_type(self):
+        editor = self._pool.acquire(_Editor, 'client', 'a', 'desc_a')
+        self._pool.release(editor)
+        self.assertIsNone(editor.bound)
+
+        other = self._pool.acquire(_OtherEditor, 'client', 'b', 'desc_b')
+        self.assertIsNot(other, editor)
+        self.assertIs(self._pool.acquire(_Editor, 'client', 'c', 'desc_c'),
+                      editor)
+        self.assertEqual(editor.bound, ('client', 'c', 'desc_c'))
+        self.assertEqual(self._pool.get_size(), 0)
+
+    def test_cap_per_type(self):
+        editors = [self._pool.acquire(_Editor, None, name, None)
+                   for name in 'ab']
+        for editor in editors:
+            self._pool.release(editor)
+        self.assertEqual([editor.deleted for editor in editors], [False, True])
+        self.assertEqual(self._pool.get_size(), 1)
+
+        self._pool.set_max_size_per_type(0)
+        self.assertTrue(editors[0].deleted)
+        self.assertEqual(self._pool.get_size(), 0)
@@ -0,0 +1,129 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import itertools
+import unittest
+
+from python_qt_binding.QtCore import QModelIndex, QRegExp, Qt
+
+from rqt_reconfigure.filter_children_model import FilterChildrenModel
+from rqt_reconfigure.treenode_item_model import TreenodeItemModel
+
+
+class _Filter(object):
+
+    def __init__(self, text):
+        self._text = text
+        self._regexp = QRegExp(text, Qt.CaseInsensitive, QRegExp.RegExp)
+
+    def get_text(self):
+        return self._text
+
+    def get_regexp(self):
+        return self._regexp
+
+
+class _ParameterNameIndex(object):
+
+    def __init__(self, names_by_node):
+        self._names_by_node = names_by_node
+
+    def get_name_count(self):
+        return len(set(itertools.chain(*self._names_by_node.values())))
+
+    def find_nodes(self, match):
+        nodes = {}
+        for node_name, names in self._names_by_node.items():
+            matching_names = [name for name in names if match(name)]
+            if matching_names:
+                nodes[node_name] = matching_names
+        return nodes
+
+
+class TestFilterChildrenModel(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._src_model = TreenodeItemModel(None)
+        for grn in ['/robot1/arm/controller', '/robot1/base',
+                    '/robot2/arm/controller', '/talker']:
+            self._src_model.add_node(grn)
+        self._param_name_index = _ParameterNameIndex({
+            '/robot1/base': ['use_sim_time', 'wheel_radius'],
+            '/talker': ['use_sim_time', 'frequency'],
+        })
+        self._model = FilterChildrenModel(None, self._param_name_index)
+        self._model.setSourceModel(self._src_model)
+
+    def _names(self, parent):
+        return [self._model.index(row, 0, parent).data()
+                for row in range(self._model.rowCount(parent))]
+
+    def test_ancestors_of_hits_accepted(self):
+        self._model.set_filter(_Filter('arm'))
+        self.assertEqual(self._names(QModelIndex()),
+                         ['robot1', 'robot2'])
+        robot1_index = self._model.index(0, 0)
+        self.assertEqual(self._names(robot1_index), ['arm'])
+
+        self._model.set_filter(_Filter(''))
+        self.assertEqual(self._model.rowCount(), 3)
+
+    def test_rows_inserted_while_filtering(self):
+        self._model.set_filter(_Filter('arm'))
+        self._model.set_filter(_Filter('arm/con'))
+        self._src_model.add_node('/robot3/arm/controller')
+        self._src_model.add_node('/robot4/base')
+        self.assertEqual(self._names(QModelIndex()),
+                         ['robot1', 'robot2', 'robot3'])
+
+    def test_cached_hits_updated_by_inserted_rows(self):
+        self._model.set_filter(_Filter('arm'))
+        self._model.set_filter(_Filter('base'))
+        self._src_model.add_node('/robot3/arm/controller')
+        self.assertEqual(self._names(QModelIndex()), ['robot1'])
+
+        self._model.set_filter(_Filter('arm'))
+        self.assertEqual(self._names(QModelIndex()),
+                         ['robot1', 'robot2', 'robot3'])
+        self._model.set_filter(_Filter('arm/con'))
+        self.assertEqual(self._names(QModelIndex()),
+                         ['robot1', 'robot2', 'robot3'])
+
+    def test_parameter_names_hit(self):
+        self._model.set_filter(_Filter('wheel'))
+        self.assertEqual(self._names(QModelIndex()), ['robot1'])
+        robot1_index = self._model.index(0, 0)
+        self.assertEqual(self._names(robot1_index), ['base'])
+        base_index = self._model.index(0, 0, robot1_index)
+        self.assertEqual(self._names(base_index), ['wheel_radius'])
+
+        self._model.set_filter(_Filter('sim_time'))
+        self.assertEqual(self._names(QModelIndex()), ['robot1', 'talker'])
+        talker_index = self._model.index(1, 0)
+        self.assertEqual(self._names(talker_index), ['use_sim_time'])
@@ -0,0 +1,92 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from rqt_reconfigure.node_health import (
+    BULK_MAX_TIMEOUT, BULK_MIN_TIMEOUT, DEFAULT_TIMEOUT, FAILURE_THRESHOLD,
+    MAX_TIMEOUT, MIN_TIMEOUT, NodeHealth, NodeHealthRegistry)
+
+
+class TestNodeHealth(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._changes = []
+        self._registry = NodeHealthRegistry()
+        self._registry.add_listener(
+            lambda name, state: self._changes.append((name, state)))
+        self._health = self._registry.get('/talker')
+
+    def test_timeout_adapts_to_latency(self):
+        self.assertEqual(self._health.get_timeout(), DEFAULT_TIMEOUT)
+        for _ in range(20):
+            self._health.record_success(0.01)
+        self.assertEqual(self._health.get_timeout(), MIN_TIMEOUT)
+        for _ in range(20):
+            self._health.record_success(10.0)
+        self.assertEqual(self._health.get_timeout(), MAX_TIMEOUT)
+
+    def test_bulk_timeout_scales_with_size(self):
+        for _ in range(20):
+            self._health.record_success(0.01)
+        self.assertEqual(self._health.get_timeout(10), MIN_TIMEOUT)
+        self.assertEqual(self._health.get_timeout(512), BULK_MIN_TIMEOUT)
+        self.assertGreater(self._health.get_timeout(5000), BULK_MIN_TIMEOUT)
+        self.assertEqual(self._health.get_timeout(10 ** 6), BULK_MAX_TIMEOUT)
+
+        # Answers to bulk requests don't skew the round-trip time.
+        self._health.record_success()
+        self.assertEqual(self._health.get_timeout(), MIN_TIMEOUT)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        self._health.record_success(0.01)
+        for _ in range(FAILURE_THRESHOLD - 1):
+            self._health.record_failure()
+        self.assertTrue(self._health.allow_request())
+        self._health.record_failure()
+        self.assertFalse(self._health.allow_request())
+        self.assertEqual(self._changes, [
+            ('/talker', NodeHealth.HEALTHY), ('/talker', NodeHealth.UNRESPONSIVE)])
+
+        self._health.record_success(0.01)
+        self.assertTrue(self._health.allow_request())
+
+    def test_probe_delay_backs_off(self):
+        first = self._health.next_probe_delay()
+        self.assertEqual(self._health.next_probe_delay(), 2 * first)
+        self._health.record_success(0.01)
+        self.assertEqual(self._health.next_probe_delay(), first)
+
+    def test_forget(self):
+        self._health.mark_unresponsive()
+        self.assertIs(self._registry.get('/talker'), self._health)
+        self._registry.forget('/talker')
+        health = self._registry.get('/talker')
+        self.assertIsNot(health, self._health)
+        self.assertEqual(health.get_state(), NodeHealth.UNKNOWN)
@@ -0,0 +1,625 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import itertools
+import unittest
+from unittest import mock
+
+from rcl_interfaces.msg import ListParametersResult
+from rcl_interfaces.msg import Parameter as ParameterMsg
+from rcl_interfaces.msg import ParameterEvent
+from rcl_interfaces.msg import SetParametersResult
+from rcl_interfaces.srv import ListParameters
+from rcl_interfaces.srv import SetParameters
+from rcl_interfaces.srv import SetParametersAtomically
+from rclpy.parameter import Parameter
+from rclpy.task import Future
+
+from rqt_reconfigure import param_api
+from rqt_reconfigure.param_api import (
+    _call_service_with_deadlines, _ParameterWriteQueue, AsyncServiceCallFailed,
+    find_nodes_with_params, get_entity_counts, match_node_name, ParamClient,
+    ParamClientPool,
+    ParameterEventDispatcher, ServiceNotAvailable)
+
+_LIST_PARAMETERS_TYPES = ['rcl_interfaces/srv/ListParameters']
+
+
+class _FakeGraphNode(object):
+
+    def __init__(self, nodes, services):
+        self._nodes = nodes
+        self._services = services
+
+    def get_node_names_and_namespaces(self):
+        return self._nodes
+
+    def get_service_names_and_types(self):
+        return self._services
+
+
+class _FakeSubscription(object):
+
+    def __init__(self, callback, content_filter_options, cftopic_enabled):
+        self.callback = callback
+        self.content_filter_options = content_filter_options
+        self._cftopic_enabled = cftopic_enabled
+
+    def is_cftopic_enabled(self):
+        return self._cftopic_enabled
+
+
+class _FakeServiceClient(object):
+
+    def __init__(self, srv_type, srv_name):
+        self.srv_type = srv_type
+        self.srv_name = srv_name
+        self.ready = True
+        # (request, future) of every call, oldest first.
+        self.calls = []
+        self.removed = []
+
+    def service_is_ready(self):
+        return self.ready
+
+    def call_async(self, request):
+        future = Future()
+        self.calls.append((request, future))
+        return future
+
+    def remove_pending_request(self, future):
+        self.removed.append(future)
+
+
+class _FakeNode(object):
+    """Records the entities created through it."""
+
+    def __init__(self, content_filter_supported=False):
+        self.content_filter_supported = content_filter_supported
+        self.subscriptions = []
+        self.clients = []
+
+    def create_client(self, srv_type, srv_name):
+        client = _FakeServiceClient(srv_type, srv_name)
+        self.clients.append(client)
+        return client
+
+    def destroy_client(self, client):
+        self.clients.remove(client)
+
+    def create_subscription(self, msg_type, topic, callback, qos_profile,
+                            content_filter_options=None):
+        subscription = _FakeSubscription(
+            callback, content_filter_options,
+            content_filter_options is not None and self.content_filter_supported)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def destroy_subscription(self, subscription):
+        self.subscriptions.remove(subscription)
+
+
+class _FakeCallLater(object):
+    """Stand-in for param_api._call_later, run by the test."""
+
+    def __init__(self):
+        self._counter = itertools.count()
+        # { handle : (delay, callback) }
+        self.calls = {}
+
+    def call_later(self, delay, callback):
+        handle = next(self._counter)
+        self.calls[handle] = (delay, callback)
+        return handle
+
+    def cancel(self, handle):
+        self.calls.pop(handle, None)
+
+    def run_all(self):
+        calls, self.calls = self.calls, {}
+        for _, callback in calls.values():
+            callback()
+
+
+class _CallLaterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._call_later = _FakeCallLater()
+        for name, function in [('_call_later', self._call_later.call_later),
+                               ('_cancel_call_later', self._call_later.cancel)]:
+            patcher = mock.patch.object(param_api, name, function)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestMatchNodeName(unittest.TestCase):
+
+    def test_no_patterns(self):
+        self.assertTrue(match_node_name('/robot1/driver'))
+
+    def test_namespaces(self):
+        namespaces = ['/robot1', 'fleet/robot_*/']
+        self.assertTrue(match_node_name('/robot1/driver', namespaces))
+        self.assertTrue(match_node_name('/robot1/arm/driver', namespaces))
+        self.assertTrue(match_node_name('/fleet/robot_7/driver', namespaces))
+        self.assertFalse(match_node_name('/robot10/driver', namespaces))
+        self.assertFalse(match_node_name('/driver', namespaces))
+        self.assertTrue(match_node_name('/driver', ['/']))
+
+    def test_excludes(self):
+        excludes = ['_ros2cli_*', '/rqt_gui_py_node_*']
+        self.assertFalse(match_node_name('/_ros2cli_daemon_0', None, excludes))
+        self.assertFalse(
+            match_node_name('/ns/_ros2cli_daemon_0', None, excludes))
+        self.assertFalse(
+            match_node_name('/rqt_gui_py_node_1234', None, excludes))
+        self.assertTrue(match_node_name('/talker', None, excludes))
+        self.assertFalse(match_node_name('/robot1/talker', ['/robot1'],
+                                         ['/robot1/*']))
+
+
+class TestFindNodesWithParams(unittest.TestCase):
+
+    def test_ignores_services_of_gone_nodes(self):
+        # /ns/gone only shows up through a client still held to it.
+        node = _FakeGraphNode(
+            [('talker', '/'), ('driver', '/ns')],
+            [('/talker/list_parameters', _LIST_PARAMETERS_TYPES),
+             ('/ns/driver/list_parameters', _LIST_PARAMETERS_TYPES),
+             ('/ns/gone/list_parameters', _LIST_PARAMETERS_TYPES),
+             ('/ns/driver/get_parameters', ['rcl_interfaces/srv/GetParameters'])])
+        self.assertEqual(find_nodes_with_params(node),
+                         ['/talker', '/ns/driver'])
+
+
+class TestParamClientPool(_CallLaterTestCase):
+
+    def setUp(self):
+        _CallLaterTestCase.setUp(self)
+        self._node = _FakeNode()
+
+    def test_clients_are_shared_and_counted(self):
+        pool = ParamClientPool(release_delay=0)
+        first = pool.acquire(self._node, '/talker')
+        second = pool.acquire(self._node, '/talker')
+        other = pool.acquire(self._node, '/listener')
+        self.assertIs(first._param_client, second._param_client)
+        self.assertIsNot(first._param_client, other._param_client)
+        self.assertEqual(pool.get_client_count(), 2)
+
+        first.close()
+        self.assertEqual(pool.get_client_count(), 2)
+        second.close()
+        other.close()
+        self.assertEqual(pool.get_client_count(), 0)
+        # The event callbacks of the closed clients are gone as well.
+        self.assertEqual(self._node.subscriptions, [])
+
+    def test_close_is_idempotent_and_removes_callback(self):
+        pool = ParamClientPool(release_delay=0)
+        events = []
+        first = pool.acquire(self._node, '/talker', events.append)
+        second = pool.acquire(self._node, '/talker')
+        param_client = first._param_client
+        self.assertIn(events.append, param_client._param_change_callbacks)
+
+        first.close()
+        first.close()
+        self.assertNotIn(events.append, param_client._param_change_callbacks)
+        # The reference of the second user is still held.
+        self.assertEqual(pool.get_client_count(), 1)
+        second.close()
+        self.assertEqual(pool.get_client_count(), 0)
+
+    def test_released_client_closed_after_delay(self):
+        pool = ParamClientPool(release_delay=60.0)
+        handle = pool.acquire(self._node, '/talker')
+        param_client = handle._param_client
+        handle.close()
+        self.assertEqual(pool.get_client_count(), 1)
+        self.assertEqual([delay for delay, _ in self._call_later.calls.values()],
+                         [60.0])
+
+        # Reacquiring the client in time cancels its close.
+        handle = pool.acquire(self._node, '/talker')
+        self.assertIs(handle._param_client, param_client)
+        self.assertEqual(self._call_later.calls, {})
+
+        handle.close()
+        self._call_later.run_all()
+        self.assertEqual(pool.get_client_count(), 0)
+        self.assertTrue(param_client._closed)
+
+    def test_close_clients(self):
+        pool = ParamClientPool(release_delay=60.0)
+        other_node = _FakeNode()
+        in_use = pool.acquire(self._node, '/talker')
+        pool.acquire(self._node, '/listener').close()
+        pool.acquire(other_node, '/talker')
+
+        pool.close_clients(self._node)
+        self.assertTrue(in_use._param_client._closed)
+        self.assertEqual(pool.get_client_count(), 1)
+        self.assertEqual(self._call_later.calls, {})
+        self.assertEqual(self._node.subscriptions, [])
+        # Handles of closed clients can still be closed.
+        in_use.close()
+        self.assertEqual(pool.get_client_count(), 1)
+
+
+class _FakeSetParamClient(object):
+
+    def __init__(self):
+        # (parameters, future) of every request, oldest first.
+        self.requests = []
+
+    def set_parameters_async(self, parameters):
+        future = Future()
+        self.requests.append((parameters, future))
+        return future
+
+    def answer(self, index=-1):
+        parameters, future = self.requests[index]
+        future.set_result(SetParameters.Response(
+            results=[SetParametersResult(successful=True) for _ in parameters]))
+
+    def sent_values(self, index=-1):
+        return [(p.name, p.value) for p in self.requests[index][0]]
+
+
+class TestParameterWriteQueue(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._client = _FakeSetParamClient()
+        self._queue = _ParameterWriteQueue(self._client)
+
+    def test_only_newest_value_sent(self):
+        first = self._queue.enqueue([Parameter('gain', value=1.0)])
+        self._queue.enqueue([Parameter('gain', value=2.0)])
+        self._queue.enqueue([Parameter('gain', value=3.0)])
+        self.assertEqual(len(self._client.requests), 1)
+        self.assertEqual(self._client.sent_values(), [('gain', 1.0)])
+
+        self._client.answer()
+        self.assertTrue(first.result()['gain'].successful)
+        self.assertEqual(len(self._client.requests), 2)
+        self.assertEqual(self._client.sent_values(), [('gain', 3.0)])
+
+    def test_pending_changes_merged(self):
+        self._queue.enqueue([Parameter('gain', value=1.0)])
+        self._queue.enqueue([Parameter('offset', value=0.5)])
+        self._queue.enqueue([Parameter('gain', value=2.0),
+                             Parameter('enabled', value=True)])
+        self._client.answer()
+        self.assertEqual(self._client.sent_values(),
+                         [('offset', 0.5), ('gain', 2.0), ('enabled', True)])
+
+    def test_one_request_in_flight(self):
+        for value in range(5):
+            self._queue.enqueue([Parameter('gain', value=value)])
+        self.assertEqual(len(self._client.requests), 1)
+        self._client.answer()
+        self.assertEqual(len(self._client.requests), 2)
+        self._queue.enqueue([Parameter('gain', value=5)])
+        self.assertEqual(len(self._client.requests), 2)
+        self._client.answer()
+        self._client.answer()
+        self.assertEqual(len(self._client.requests), 3)
+
+        # Nothing left to send, the next value goes out right away.
+        self._queue.enqueue([Parameter('gain', value=6)])
+        self.assertEqual(len(self._client.requests), 4)
+
+    def test_futures_resolved_on_failure(self):
+        first = self._queue.enqueue([Parameter('gain', value=1.0)])
+        second = self._queue.enqueue([Parameter('gain', value=2.0)])
+        third = self._queue.enqueue([Parameter('offset', value=0.5)])
+        self.assertIs(second, third)
+
+        self._client.requests[0][1].set_exception(
+            AsyncServiceCallFailed(hint='the target node may not be spinning'))
+        self.assertIsInstance(first.exception(), AsyncServiceCallFailed)
+        # The pending values are still sent.
+        self.assertFalse(second.done())
+        self._client.requests[1][1].set_exception(AsyncServiceCallFailed())
+        self.assertIsInstance(second.exception(), AsyncServiceCallFailed)
+
+        # The queue keeps working afterwards.
+        fourth = self._queue.enqueue([Parameter('gain', value=3.0)])
+        self._client.answer()
+        self.assertEqual(list(fourth.result()), ['gain'])
+
+
+class TestCallServiceWithDeadlines(_CallLaterTestCase):
+
+    def setUp(self):
+        _CallLaterTestCase.setUp(self)
+        self._client = _FakeServiceClient(ListParameters, '/talker/list_parameters')
+        self._rtts = []
+        self._timeouts = []
+
+    def _call(self):
+        return _call_service_with_deadlines(
+            self._client, ListParameters.Request(), 1.0, 5.0,
+            self._rtts.append, lambda: self._timeouts.append(True))
+
+    def test_answered(self):
+        future = self._call()
+        response = ListParameters.Response()
+        self._client.calls[0][1].set_result(response)
+        self.assertIs(future.result(), response)
+        self.assertEqual(len(self._rtts), 1)
+        # The timeout finds the call answered.
+        self._call_later.run_all()
+        self.assertEqual(self._timeouts, [])
+
+    def test_not_answered(self):
+        future = self._call()
+        self._call_later.run_all()
+        self.assertIsInstance(future.exception(), AsyncServiceCallFailed)
+        self.assertEqual(self._timeouts, [True])
+        self.assertEqual(self._client.removed, [self._client.calls[0][1]])
+
+        # A late answer doesn't count as a success.
+        self._client.calls[0][1].set_result(ListParameters.Response())
+        self.assertEqual(self._rtts, [])
+
+    def test_service_not_available(self):
+        self._client.ready = False
+        with mock.patch.object(param_api.time, 'monotonic', return_value=0.0):
+            future = self._call()
+        self.assertEqual(len(self._call_later.calls), 1)
+        with mock.patch.object(param_api.time, 'monotonic', return_value=10.0):
+            self._call_later.run_all()
+        self.assertIsInstance(future.exception(), ServiceNotAvailable)
+        self.assertEqual(self._client.calls, [])
+        self.assertEqual(self._timeouts, [])
+
+
+class _FakeContentFilterOptions(object):
+
+    def __init__(self, filter_expression, expression_parameters):
+        self.filter_expression = filter_expression
+        self.expression_parameters = expression_parameters
+
+
+def _parameter_event(node_name, *names):
+    return ParameterEvent(
+        node=node_name,
+        changed_parameters=[ParameterMsg(name=name) for name in names])
+
+
+class TestParameterEventDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._events = {'/talker': [], '/listener': []}
+
+    def _add_callbacks(self, dispatcher):
+        callbacks = {}
+        for node_name, events in self._events.items():
+            callbacks[node_name] = \
+                lambda new, changed, deleted, events=events: events.append(
+                    [p.name for p in changed])
+            dispatcher.add_callback(node_name, callbacks[node_name])
+        return callbacks
+
+    def _patch_content_filter_options(self, options):
+        patcher = mock.patch.object(param_api, 'ContentFilterOptions', options)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_events_routed_by_node(self):
+        node = _FakeNode()
+        dispatcher = ParameterEventDispatcher(node)
+        callbacks = self._add_callbacks(dispatcher)
+        senders = []
+        dispatcher.add_sender_callback(senders.append)
+        # All nodes share one subscription.
+        self.assertEqual(len(node.subscriptions), 1)
+        on_event = node.subscriptions[0].callback
+
+        on_event(_parameter_event('/talker', 'a'))
+        on_event(_parameter_event('/listener', 'b'))
+        on_event(_parameter_event('/other', 'c'))
+        self.assertEqual(self._events, {'/talker': [['a']], '/listener': [['b']]})
+        self.assertEqual(senders, ['/talker', '/listener', '/other'])
+        statistics = dispatcher.get_statistics()
+        self.assertEqual(statistics['received'], 3)
+        self.assertEqual(statistics['dispatched'], 2)
+        self.assertEqual(statistics['dropped_in_python'], 1)
+        self.assertEqual(statistics['fallback_nodes'], 2)
+
+        dispatcher.remove_sender_callback(senders.append)
+        for node_name, callback in callbacks.items():
+            dispatcher.remove_callback(node_name, callback)
+        self.assertEqual(node.subscriptions, [])
+
+    def test_content_filtered_subscriptions(self):
+        self._patch_content_filter_options(_FakeContentFilterOptions)
+        node = _FakeNode(content_filter_supported=True)
+        dispatcher = ParameterEventDispatcher(node, content_filter=True)
+        self._add_callbacks(dispatcher)
+        self.assertEqual(
+            [s.content_filter_options.expression_parameters
+             for s in node.subscriptions],
+            [["'/talker'"], ["'/listener'"]])
+
+        node.subscriptions[0].callback(_parameter_event('/talker', 'a'))
+        self.assertEqual(self._events, {'/talker': [['a']], '/listener': []})
+        statistics = dispatcher.get_statistics()
+        self.assertEqual(statistics['content_filtered_nodes'], 2)
+        self.assertEqual(statistics['fallback_nodes'], 0)
+
+        # Reporting senders needs the shared subscription again, which
+        # leaves the events of filtered nodes to their own subscription.
+        dispatcher.add_sender_callback(lambda node_name: None)
+        node.subscriptions[-1].callback(_parameter_event('/talker', 'b'))
+        self.assertEqual(self._events, {'/talker': [['a']], '/listener': []})
+        self.assertEqual(dispatcher.get_statistics()['dropped_in_python'], 1)
+
+    def test_fallback_without_content_filter_support(self):
+        for content_filter_options, node in [
+                (None, _FakeNode(content_filter_supported=True)),
+                (_FakeContentFilterOptions, _FakeNode())]:
+            self._patch_content_filter_options(content_filter_options)
+            self._events = {'/talker': [], '/listener': []}
+            dispatcher = ParameterEventDispatcher(node, content_filter=True)
+            self._add_callbacks(dispatcher)
+            self.assertEqual(len(node.subscriptions), 1)
+            self.assertIsNone(node.subscriptions[0].content_filter_options)
+
+            node.subscriptions[0].callback(_parameter_event('/listener', 'a'))
+            self.assertEqual(self._events,
+                             {'/talker': [], '/listener': [['a']]})
+            statistics = dispatcher.get_statistics()
+            self.assertEqual(statistics['content_filtered_nodes'], 0)
+            self.assertEqual(statistics['fallback_nodes'], 2)
+
+
+class TestServiceClients(_CallLaterTestCase):
+
+    def setUp(self):
+        _CallLaterTestCase.setUp(self)
+        self._node = _FakeNode()
+        self._param_client = ParamClient(
+            self._node, '/service_clients_test', client_idle_timeout=60.0)
+        self.addCleanup(self._param_client.close)
+
+    def _client_names(self):
+        return sorted(client.srv_name for client in self._node.clients)
+
+    def test_clients_created_on_first_use(self):
+        num_clients = get_entity_counts()['clients']
+        self.assertEqual(self._node.clients, [])
+
+        self._param_client.list_parameters_async()
+        self._param_client.list_parameters_async()
+        self._param_client.get_parameters_async(['a'])
+        self.assertEqual(self._client_names(),
+                         ['/service_clients_test/get_parameters',
+                          '/service_clients_test/list_parameters'])
+        self.assertEqual(get_entity_counts()['clients'], num_clients + 2)
+
+        self._param_client.close()
+        self.assertEqual(self._node.clients, [])
+        self.assertEqual(get_entity_counts()['clients'], num_clients)
+
+    def test_idle_clients_evicted(self):
+        self._param_client.list_parameters_async()
+        self._param_client.get_parameters_async(['a'])
+        list_client = self._param_client._service_clients['list_parameters'].client
+        list_client.calls[0][1].set_result(
+            ListParameters.Response(result=ListParametersResult(names=['a'])))
+        for entry in self._param_client._service_clients.values():
+            entry.last_used -= 120.0
+
+        self._param_client._evict_idle_service_clients()
+        # The get_parameters call is still waiting for its response.
+        self.assertEqual(self._client_names(),
+                         ['/service_clients_test/get_parameters'])
+        # Eviction is scheduled again for the remaining client.
+        self.assertIn(
+            self._param_client._evict_idle_service_clients,
+            [callback for _, callback in self._call_later.calls.values()])
+
+
+class TestLoadParameters(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._param_client = ParamClient(_FakeNode(), '/load_test')
+        self.addCleanup(self._param_client.close)
+        # (service name, request, transform, future) of every call.
+        self._calls = []
+        self._param_client._call_service_async = self._call_service_async
+
+    def _call_service_async(self, service_name, request, transform=None,
+                            **kwargs):
+        future = Future()
+        self._calls.append((service_name, request, transform, future))
+        return future
+
+    def _sent(self, index=-1):
+        service_name, request = self._calls[index][:2]
+        return service_name, [p.name for p in request.parameters]
+
+    def _answer_atomically(self, index=-1, successful=True):
+        _, _, transform, future = self._calls[index]
+        future.set_result(transform(SetParametersAtomically.Response(
+            result=SetParametersResult(
+                successful=successful, reason='' if successful else 'rejected'))))
+
+    def _parameters(self, count):
+        return [Parameter('p{}'.format(i), value=i) for i in range(count)]
+
+    def test_chunks_sent_one_after_the_other(self):
+        future = self._param_client.load_parameters_async(self._parameters(8193))
+        self.assertEqual(len(self._calls), 1)
+        service_name, names = self._sent()
+        self.assertEqual(service_name, 'set_parameters_atomically')
+        self.assertEqual(len(names), 8192)
+
+        self._answer_atomically()
+        self.assertEqual(self._sent(), ('set_parameters_atomically', ['p8192']))
+        self.assertFalse(future.done())
+        self._answer_atomically()
+        self.assertEqual(len(future.result()), 8193)
+        self.assertTrue(all(r.successful for r in future.result().values()))
+
+    def test_stops_at_rejected_chunk(self):
+        future = self._param_client.load_parameters_async(
+            self._parameters(5), chunk_size=2)
+        self._answer_atomically()
+        self._answer_atomically(successful=False)
+        self.assertEqual(len(self._calls), 2)
+        results = future.result()
+        self.assertEqual(sorted(results), ['p0', 'p1', 'p2', 'p3'])
+        self.assertEqual([name for name, r in sorted(results.items())
+                          if not r.successful], ['p2', 'p3'])
+
+    def test_falls_back_to_parallel_requests(self):
+        future = self._param_client.load_parameters_async(
+            self._parameters(5), chunk_size=2)
+        self._calls[0][3].set_exception(ServiceNotAvailable())
+        self.assertEqual(
+            [self._sent(index) for index in range(1, len(self._calls))],
+            [('set_parameters', ['p0', 'p1']),
+             ('set_parameters', ['p2', 'p3']),
+             ('set_parameters', ['p4'])])
+
+        for _, request, _, call_future in self._calls[1:]:
+            call_future.set_result(SetParameters.Response(results=[
+                SetParametersResult(successful=p.name != 'p3')
+                for p in request.parameters]))
+        results = future.result()
+        self.assertEqual(len(results), 5)
+        self.assertEqual([name for name, r in sorted(results.items())
+                          if not r.successful], ['p3'])
@@ -0,0 +1,105 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from rclpy.parameter import Parameter
+from rclpy.task import Future
+
+from rqt_reconfigure.param_store import ParameterStore
+
+from .fake_param_client import FakeParamClient
+
+
+class TestParameterStore(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._client = FakeParamClient()
+        self._store = ParameterStore(self._client)
+
+    def test_reads_from_memory_once_synced(self):
+        future = self._store.get_all_parameters_async()
+        self._client.futures[0].set_result([Parameter('a', value=1)])
+        self.assertEqual([p.name for p in future.result()], ['a'])
+        self.assertTrue(self._store.is_synced())
+
+        self._store.get_all_parameters_async()
+        self.assertEqual(len(self._client.futures), 1)
+
+    def test_events_update_store(self):
+        self._store.resync_async()
+        self._client.futures[0].set_result(
+            [Parameter('a', value=1), Parameter('b', value=2)])
+        self._store.apply_event(
+            [Parameter('c', value=3)], [Parameter('a', value=4)],
+            [Parameter('b')])
+        self.assertEqual(self._store.list_parameters(), ['a', 'c'])
+        self.assertEqual(self._store.get_parameters(['a'])[0].value, 4)
+
+    def test_events_during_sync_take_precedence(self):
+        self._store.resync_async()
+        self._store.apply_event([], [Parameter('a', value=5)], [Parameter('b')])
+        self._client.futures[0].set_result(
+            [Parameter('a', value=1), Parameter('b', value=2)])
+        self.assertEqual(self._store.list_parameters(), ['a'])
+        self.assertEqual(self._store.get_parameters(['a'])[0].value, 5)
+
+    def test_events_during_resync_take_precedence(self):
+        self._store.resync_async()
+        self._client.futures[0].set_result([Parameter('a', value=1)])
+        self._store.resync_async()
+        self._store.apply_event([], [Parameter('a', value=5)], [])
+        self.assertEqual(self._store.get_parameters(['a'])[0].value, 5)
+        self._client.futures[1].set_result(
+            [Parameter('a', value=1), Parameter('b', value=2)])
+        self.assertEqual(self._store.list_parameters(), ['a', 'b'])
+        self.assertEqual(self._store.get_parameters(['a'])[0].value, 5)
+
+    def test_invalidate(self):
+        self._store.resync_async()
+        self._client.futures[0].set_result([Parameter('a', value=1)])
+        self._store.invalidate()
+        self.assertFalse(self._store.is_synced())
+        self._store.get_all_parameters_async()
+        self.assertEqual(len(self._client.futures), 2)
+
+    def test_descriptors_are_fetched_once(self):
+        requested = []
+
+        def describe_parameters_async(names):
+            requested.append(names)
+            future = Future()
+            future.set_result(['descriptor_' + n for n in names])
+            return future
+
+        self._client.describe_parameters_async = describe_parameters_async
+        self._store.get_descriptors_async(['a', 'b'])
+        future = self._store.get_descriptors_async(['b', 'c'])
+        self.assertEqual(future.result(), ['descriptor_b', 'descriptor_c'])
+        self.assertEqual(requested, [['a', 'b'], ['c']])
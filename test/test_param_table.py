@@ -0,0 +1,86 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from python_qt_binding.QtCore import Qt
+
+from rcl_interfaces.msg import ParameterDescriptor
+from rclpy.parameter import Parameter
+
+from rqt_reconfigure.param_table import (
+    NAME_COLUMN, ParameterTableModel, VALUE_COLUMN)
+
+from .fake_param_client import FakeParamClient
+
+
+def _descriptor(parameter, read_only=False):
+    return ParameterDescriptor(
+        name=parameter.name, type=parameter.type_.value, read_only=read_only)
+
+
+class TestParameterTableModel(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._client = FakeParamClient()
+        self._model = ParameterTableModel(self._client)
+
+    def _add(self, *parameters, read_only=False):
+        self._model.add_parameters(
+            parameters, [_descriptor(p, read_only) for p in parameters])
+
+    def _names(self):
+        return [self._model.index(row, NAME_COLUMN).data()
+                for row in range(self._model.rowCount())]
+
+    def test_rows_sorted_by_name(self):
+        self._add(Parameter('b', value=1), Parameter('a.x', value='x'))
+        self._add(Parameter('a.y', value=2.0), Parameter('b', value=3))
+        self.assertEqual(self._names(), ['a.x', 'a.y', 'b'])
+        self.assertEqual(self._model.index(2, VALUE_COLUMN).data(), '3')
+
+        self._model.remove_parameters([Parameter('a.y')])
+        self._model.update_parameters([Parameter('a.x', value='z')])
+        self.assertEqual(self._names(), ['a.x', 'b'])
+        self.assertEqual(self._model.index(0, VALUE_COLUMN).data(), 'z')
+
+    def test_edit_writes_parameter(self):
+        self._add(Parameter('gain', value=1.0), Parameter('enabled', value=False))
+        self.assertTrue(self._model.setData(
+            self._model.index(1, VALUE_COLUMN), 2.5, Qt.EditRole))
+        self.assertTrue(self._model.setData(
+            self._model.index(0, VALUE_COLUMN), Qt.Checked, Qt.CheckStateRole))
+        self.assertEqual([(p.name, p.value) for p in self._client.written],
+                         [('gain', 2.5), ('enabled', True)])
+        self.assertEqual(self._model.index(1, VALUE_COLUMN).data(), '2.5')
+
+    def test_read_only_not_editable(self):
+        self._add(Parameter('gain', value=1.0), read_only=True)
+        flags = self._model.flags(self._model.index(0, VALUE_COLUMN))
+        self.assertFalse(flags & Qt.ItemIsEditable)
@@ -32,7 +32,7 @@ import unittest
 
 from python_qt_binding.QtCore import QRegExp, Qt
 
-from rqt_reconfigure.text_filter import TextFilter
+from rqt_reconfigure.text_filter import fuzzy_match, TextFilter
 
 
 class MyTest(unittest.TestCase):
@@ -59,3 +59,8 @@ class MyTest(unittest.TestCase):
         self.assertEqual(result_regex,
                          True  # Both _query_text & filtered_text overlaps.
                          )
+
+    def test_fuzzy_match(self):
+        self.assertTrue(fuzzy_match('mxvel', 'controller.max_velocity'))
+        self.assertTrue(fuzzy_match('MaxV', 'max_velocity'))
+        self.assertFalse(fuzzy_match('velmax', 'max_velocity'))
@@ -0,0 +1,83 @@
+# Copyright (c) 2024 Open Source Robotics Foundation, Inc.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#
+#    * Redistributions in binary form must reproduce the above copyright
+#      notice, this list of conditions and the following disclaimer in the
+#      documentation and/or other materials provided with the distribution.
+#
+#    * Neither the name of the copyright holder nor the names of its
+#      contributors may be used to endorse or promote products derived from
+#      this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from python_qt_binding.QtCore import QModelIndex
+
+from rqt_reconfigure.treenode_item_model import TreenodeItemModel
+
+
+class TestTreenodeItemModel(unittest.TestCase):
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self._model = TreenodeItemModel(None)
+
+    def _names(self, parent=QModelIndex()):
+        return [self._model.index(row, 0, parent).data()
+                for row in range(self._model.rowCount(parent))]
+
+    def test_add_node_sorted(self):
+        for grn in ['/ns/talker', '/listener', '/ns/a_node', '/ns']:
+            self.assertTrue(self._model.add_node(grn))
+        self.assertFalse(self._model.add_node('/ns/talker'))
+
+        self.assertEqual(self._names(), ['listener', 'ns'])
+        ns_index = self._model.get_index_from_grn('/ns')
+        self.assertEqual(self._names(ns_index), ['a_node', 'talker'])
+        self.assertEqual(
+            self._model.get_index_from_grn('/ns/talker').parent(), ns_index)
+
+    def test_remove_node_prunes_namespaces(self):
+        self._model.add_node('/robot/arm/controller')
+        self._model.add_node('/robot')
+
+        arm_index = self._model.get_index_from_grn('/robot/arm')
+        self.assertEqual(arm_index.data(), 'arm')
+        self.assertTrue(self._model.remove_node('/robot/arm/controller'))
+        self.assertFalse(
+            self._model.get_index_from_grn('/robot/arm').isValid())
+        self.assertEqual(self._model.rowCount(
+            self._model.get_index_from_grn('/robot')), 0)
+        self.assertTrue(self._model.remove_node('/robot'))
+        self.assertEqual(self._model.rowCount(), 0)
+        self.assertFalse(self._model.remove_node('/robot'))
+
+    def test_fetch_more(self):
+        num_nodes = TreenodeItemModel._FETCH_BATCH_SIZE + 10
+        for i in range(num_nodes):
+            self._model.add_node('/ns/node_{:05d}'.format(i))
+        ns_index = self._model.index(0, 0)
+
+        self.assertTrue(self._model.canFetchMore(ns_index))
+        self.assertEqual(self._model.rowCount(ns_index),
+                         TreenodeItemModel._FETCH_BATCH_SIZE)
+        self._model.fetchMore(ns_index)
+        self.assertFalse(self._model.canFetchMore(ns_index))
+        self.assertEqual(self._model.rowCount(ns_index), num_nodes)